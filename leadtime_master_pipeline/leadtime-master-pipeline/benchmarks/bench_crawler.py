@@ -0,0 +1,167 @@
+"""
+Crawler throughput benchmark against the local mock ERP (benchmarks/mock_erp.py).
+
+For each endpoint type (TREATMENT, PURCHASEORDER, bulk_po, DEFAULT) the real
+`crawl_endpoint()` of erp_cralwer.py is run in its own child process, so
+peak RSS is measured per type. Reported per type:
+    rows, wall time, rows/s, response bytes/s, peak RSS
+
+Snapshots go to a temp folder (RAW_OUTPUT_PATH), never to the real ERP_RAW.
+
+Run:
+    python benchmarks/bench_crawler.py --rows 50000 --latency 0.02
+    python benchmarks/bench_crawler.py --rows 200000 --repeat 3 --json bench.json
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_ROOT = os.path.dirname(BENCH_DIR)
+CRAWLER_DIR = os.path.join(PIPELINE_ROOT, "ingestion", "crawler")
+sys.path.insert(0, PIPELINE_ROOT)
+
+from benchmarks import mock_erp
+
+# endpoint type -> (mock handler, extra MERCH_CONFIG keys)
+BENCH_ENDPOINTS = {
+    "TREATMENT":     ("ManagePrintingsOfMer", {"spec": "TREATMENT"}),
+    "PURCHASEORDER": ("ManagePurchaseOrder", {"spec": "PURCHASEORDER"}),
+    "bulk_po":       ("StyleProductOfPlanning", {"spec": "BULK_PO"}),
+    "DEFAULT":       ("ManageFabricDevelopmentsOfMer", {}),
+}
+
+
+# ==================== MEASUREMENT ====================
+
+def peak_rss_bytes():
+    """Peak resident set size of this process (None if not measurable)."""
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        if hasattr(info, "peak_wset"):        # Windows
+            return info.peak_wset
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def fmt_bytes(n):
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+# ==================== CHILD PROCESS ====================
+
+def crawl_once(base_url: str, kind: str) -> dict:
+    """Runs in a fresh process: log in to the mock, crawl one endpoint."""
+    sys.path.insert(0, CRAWLER_DIR)
+    import erp_cralwer
+
+    handler, extra = BENCH_ENDPOINTS[kind]
+    cfg = {
+        "name": f"bench_{kind.lower()}",
+        "group": "RAW_DATA",
+        "page_url": f"{base_url}/app",
+        "json_url": f"{base_url}/?_n=Core.Sites.Apps&_o=Mock.{handler}&_m=LoadData",
+        **extra,
+    }
+
+    session = requests.Session()
+    session.post(f"{base_url}/login", data={"RealUserName": "bench", "RealPassword": "bench"},
+                 allow_redirects=False)
+
+    t0 = time.perf_counter()
+    rows = erp_cralwer.crawl_endpoint(cfg, session, session_id=mock_erp.PAGE_SESSION_ID)
+    wall = time.perf_counter() - t0
+
+    return {
+        "rows": rows,
+        "wall_s": wall,
+        "snapshot_bytes": os.path.getsize(erp_cralwer.get_snapshot_path(cfg)),
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+# ==================== DRIVER ====================
+
+def served_bytes(base_url: str, handler: str) -> int:
+    stats = requests.get(f"{base_url}/__stats").json()
+    return stats.get(handler, {}).get("bytes", 0)
+
+
+def run_benchmark(rows, latency, bulk_rows=None, repeat=1, kinds=None):
+    server = mock_erp.serve(port=0, rows=rows, latency=latency, bulk_rows=bulk_rows)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+
+    try:
+        for kind in kinds or BENCH_ENDPOINTS:
+            handler = BENCH_ENDPOINTS[kind][0]
+            for run in range(repeat):
+                before = served_bytes(base_url, handler)
+                with ctx.Pool(1) as pool:
+                    res = pool.apply(crawl_once, (base_url, kind))
+                res["bytes"] = served_bytes(base_url, handler) - before
+                res["rows_per_s"] = res["rows"] / res["wall_s"] if res["wall_s"] else 0.0
+                res["bytes_per_s"] = res["bytes"] / res["wall_s"] if res["wall_s"] else 0.0
+                res.update(kind=kind, run=run + 1)
+                results.append(res)
+    finally:
+        server.shutdown()
+
+    return results
+
+
+def print_report(results):
+    print("\n===== CRAWLER BENCHMARK =====")
+    print(f"{'endpoint':<14}{'run':>4}{'rows':>10}{'wall s':>9}{'rows/s':>11}"
+          f"{'bytes/s':>14}{'peak RSS':>13}")
+    for r in results:
+        print(f"{r['kind']:<14}{r['run']:>4}{r['rows']:>10,}{r['wall_s']:>9.2f}"
+              f"{r['rows_per_s']:>11,.0f}{fmt_bytes(r['bytes_per_s']) + '/s':>14}"
+              f"{fmt_bytes(r['peak_rss']):>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawler throughput benchmark (mock ERP)")
+    parser.add_argument("--rows", type=int, default=20000, help="rows per endpoint")
+    parser.add_argument("--bulk-rows", type=int, default=None, help="rows for bulk_po")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per LoadData call")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--only", nargs="*", choices=list(BENCH_ENDPOINTS), default=None)
+    parser.add_argument("--json", default=None, help="also write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="erp_bench_") as raw_dir:
+        # Inherited by the spawned crawl processes (read at erp_cralwer import)
+        os.environ["RAW_OUTPUT_PATH"] = raw_dir
+        results = run_benchmark(args.rows, args.latency, args.bulk_rows, args.repeat, args.only)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+JSON codec benchmark on the snapshot shapes the crawler produces.
+
+Rows come from benchmarks/mock_erp.py (same columns / value mix as the
+real endpoints: TREATMENT, PURCHASEORDER, bulk_po, DEFAULT). Per shape:
+- decode one DataTables page response body
+- canonical encode of the rows (snapshot sink)
+- NDJSON snapshot -> DataFrame:
+    rows      list of row dicts, pd.DataFrame(rows)         (previous loader)
+    read_json pd.read_json(lines=True, dtype=str)            (previous phase-1 loader)
+    columns   decode straight into column arrays             (json_codec)
+    columns str + filter: values as str, a third of the columns (phase-1 loader)
+
+Each is timed with the stdlib json module and with orjson (if installed).
+
+Run:
+    python benchmarks/bench_json_codec.py --rows 50000
+    python benchmarks/bench_json_codec.py --rows 200000 --repeat 5 --json codec.json
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PIPELINE_ROOT)
+
+from benchmarks import mock_erp
+from ingestion.raw_storage.json_codec import rows_to_columns, _std_canonical
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SHAPES = ["TREATMENT", "PURCHASEORDER", "bulk_po", "DEFAULT"]
+
+
+def codecs():
+    """name -> (loads, canonical encode)"""
+    out = {"json": (json.loads, _std_canonical)}
+    if orjson is not None:
+        out["orjson"] = (orjson.loads, lambda r: orjson.dumps(r, option=orjson.OPT_SORT_KEYS))
+    return out
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return best
+
+
+def bench_shape(kind, n, repeat):
+    rows = mock_erp.make_rows(kind, n)
+    page = json.dumps({"draw": 1, "recordsTotal": n, "recordsFiltered": n, "data": rows}).encode()
+    ndjson = b"".join(_std_canonical(r) + b"\n" for r in rows)
+    keep = list(rows[0])[::3]
+    results = []
+
+    def add(op, codec, seconds, nbytes):
+        results.append({
+            "shape": kind, "op": op, "codec": codec, "rows": n, "seconds": seconds,
+            "rows_per_s": n / seconds if seconds else 0.0,
+            "mb_per_s": nbytes / seconds / 1e6 if seconds else 0.0,
+        })
+
+    for name, (loads, encode) in codecs().items():
+        add("decode page", name, best_of(lambda: loads(page), repeat), len(page))
+        add("encode rows", name, best_of(lambda: [encode(r) for r in rows], repeat), len(ndjson))
+        lines = ndjson.splitlines()
+        add("df rows", name,
+            best_of(lambda: pd.DataFrame([loads(l) for l in lines]), repeat), len(ndjson))
+        add("df columns", name,
+            best_of(lambda: pd.DataFrame(rows_to_columns(map(loads, lines))), repeat), len(ndjson))
+        add("df columns str", name,
+            best_of(lambda: pd.DataFrame(rows_to_columns(map(loads, lines), as_str=True),
+                                         dtype=object), repeat),
+            len(ndjson))
+        add("df columns str 1/3", name,
+            best_of(lambda: pd.DataFrame(rows_to_columns(map(loads, lines), keep, as_str=True),
+                                         dtype=object), repeat),
+            len(ndjson))
+
+    add("df read_json str", "pandas",
+        best_of(lambda: pd.read_json(io.BytesIO(ndjson), lines=True, dtype=str), repeat), len(ndjson))
+    return results
+
+
+def print_report(results):
+    print("\n===== JSON CODEC BENCHMARK =====")
+    print(f"{'shape':<15}{'op':<20}{'codec':<8}{'rows':>9}{'seconds':>10}{'rows/s':>13}{'MB/s':>9}")
+    for r in results:
+        print(f"{r['shape']:<15}{r['op']:<20}{r['codec']:<8}{r['rows']:>9,}{r['seconds']:>10.3f}"
+              f"{r['rows_per_s']:>13,.0f}{r['mb_per_s']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON codec benchmark (snapshot shapes)")
+    parser.add_argument("--rows", type=int, default=50000, help="rows per shape")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N")
+    parser.add_argument("--only", nargs="*", choices=SHAPES, default=None)
+    parser.add_argument("--json", default=None, help="also write results to this file")
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("[INFO] orjson not installed, timing the stdlib codec only")
+
+    results = []
+    for kind in args.only or SHAPES:
+        results.extend(bench_shape(kind, args.rows, args.repeat))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+normalize_brand on a whole BRAND_NAME column.
+
+The column mimics a PO table: `--distinct` customer spellings (brand_map
+keys in ERP casing, with "Ltd." / "LLC" suffixes, stray punctuation and
+spaces, plus unmapped names) repeated over `--rows` rows, ~5% nulls.
+- apply      column.apply(normalize_brand), row by row       (previous modules)
+- cold       helper.normalize_brand_column, empty LRU cache
+- warm       helper.normalize_brand_column, names already cached (next table / file)
+
+Results are checked against `apply` before timing.
+
+Run:
+    python benchmarks/bench_normalize_brand.py
+    python benchmarks/bench_normalize_brand.py --rows 5000000 --distinct 200 --json brand.json
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PIPELINE_ROOT)
+sys.path.append(os.path.join(PIPELINE_ROOT, "ingestion", "crawler"))
+
+from helper import brand_map, normalize_brand, normalize_brand_cached, normalize_brand_column
+
+SUFFIXES = ["", " Ltd.", " LLC", " Limited", " Co.", ", Inc.", "  "]
+
+
+def spellings(n: int, seed: int = 7) -> list:
+    """`n` distinct customer names as they come from the ERP."""
+    rnd = random.Random(seed)
+    names = []
+    for key in brand_map:
+        base = rnd.choice([key, key.title(), key.lower()])
+        names.append(f" {base}{rnd.choice(SUFFIXES)} ")
+    i = 0
+    while len(set(names)) < n:
+        names.append(f"Customer {i}{rnd.choice(SUFFIXES)}")
+        i += 1
+    return list(dict.fromkeys(names))[:n]
+
+
+def make_column(rows: int, distinct: int, seed: int = 7) -> pd.Series:
+    rnd = random.Random(seed)
+    names = spellings(distinct, seed)
+    # Skewed like real orders: a few customers own most rows
+    weights = [1.0 / (i + 1) for i in range(len(names))]
+    values = rnd.choices(names, weights=weights, k=rows)
+    for i in rnd.sample(range(rows), rows // 20):
+        values[i] = None
+    return pd.Series(values, dtype=object, name="BRAND_NAME")
+
+
+def best_of(fn, repeat, setup=None):
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return best
+
+
+def run(rows: int, distinct: int, repeat: int) -> list:
+    column = make_column(rows, distinct)
+    expected = column.apply(normalize_brand)
+    normalize_brand_cached.cache_clear()
+    got = normalize_brand_column(column)
+    if not got.equals(expected):
+        raise SystemExit("[ERROR] normalize_brand_column differs from apply(normalize_brand)")
+
+    timings = {
+        "apply": best_of(lambda: column.apply(normalize_brand), repeat),
+        "cold": best_of(lambda: normalize_brand_column(column), repeat,
+                        setup=normalize_brand_cached.cache_clear),
+        "warm": best_of(lambda: normalize_brand_column(column), repeat),
+    }
+    return [
+        {
+            "op": op, "rows": rows, "distinct": int(column.nunique()), "seconds": seconds,
+            "rows_per_s": rows / seconds if seconds else 0.0,
+            "speedup": timings["apply"] / seconds if seconds else 0.0,
+        }
+        for op, seconds in timings.items()
+    ]
+
+
+def print_report(results):
+    print("\n===== NORMALIZE_BRAND BENCHMARK =====")
+    print(f"{'op':<8}{'rows':>12}{'distinct':>10}{'seconds':>10}{'rows/s':>15}{'speedup':>9}")
+    for r in results:
+        print(f"{r['op']:<8}{r['rows']:>12,}{r['distinct']:>10}{r['seconds']:>10.3f}"
+              f"{r['rows_per_s']:>15,.0f}{r['speedup']:>8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Column-level normalize_brand benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=80, help="distinct customer spellings")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N")
+    parser.add_argument("--json", default=None, help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.distinct, args.repeat)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
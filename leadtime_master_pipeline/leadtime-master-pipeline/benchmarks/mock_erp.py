@@ -0,0 +1,218 @@
+"""
+Local ERP stand-in (no live ERP needed).
+
+Serves what erp_cralwer.py talks to:
+- GET  /                     login form (RealUserName / RealPassword)
+- POST /login                sets the session cookie, redirects to /app
+- GET  /app                  page with the search button + hidden sessionId
+- POST /?_o=<handler>&_m=LoadData
+    * DataTables contract when the body has start/length:
+      { draw, recordsTotal, recordsFiltered, data: rows[start:start+length] }
+    * single response otherwise, shape "data" or "Data.objects"
+- GET  /__stats              bytes / requests served per handler (JSON)
+
+Rows are synthetic and deterministic (seeded), sorted by UpdatedDate desc.
+
+Run:
+    python benchmarks/mock_erp.py --port 8765 --rows 20000 --latency 0.05
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SESSION_COOKIE = "ASP.NET_SessionId"
+SESSION_VALUE  = "mock-session"
+PAGE_SESSION_ID = "mock-page-session-id"
+
+PARTNERS = ["REISS LTD", "J. BARBOUR & SONS", "KITH", "STUSSY", "PALACE", "Golf Wang LLC"]
+WORK_TYPES = ["Bulk", "Sample", "Develop"]
+
+# handler (`_o` last segment) -> endpoint definition
+DEFAULT_ENDPOINTS = {
+    "ManagePrintingsOfMer":  {"kind": "TREATMENT",     "shape": "data"},
+    "ManagePurchaseOrder":   {"kind": "PURCHASEORDER", "shape": "data"},
+    "StyleProductOfPlanning": {"kind": "bulk_po",      "shape": "Data.objects"},
+    "ManageFabricDevelopmentsOfMer": {"kind": "DEFAULT", "shape": "data"},
+}
+
+
+# ==================== SYNTHETIC ROWS ====================
+
+def make_rows(kind: str, n: int, seed: int = 7):
+    rnd = random.Random(f"{kind}-{seed}")
+    base = datetime(2026, 1, 1)
+    rows = []
+    for i in range(n):
+        updated = base - timedelta(minutes=i * 7)
+        row = {
+            "Row": i + 1,
+            "Code": f"PO-260101-{i:06d}",
+            "RequestCode": f"REQ{i:08d}",
+            "PartnerName": rnd.choice(PARTNERS),
+            "PurchaseOrderCode": f"PO-{i % 5000:06d}",
+            "StyleNoInternal": f"ST{rnd.randint(1000, 9999)}",
+            "SkuNo": f"SKU{rnd.randint(10000, 99999)}",
+            "WorkTypeName": rnd.choice(WORK_TYPES),
+            "DropCodes": "Drop 1, Drop (2)",
+            "SeasonCode": rnd.choice(["SS26", "AW26"]),
+            "CreatedDate": (updated - timedelta(days=3)).isoformat(),
+            "UpdatedDate": updated.isoformat(),
+            "Note": "x" * rnd.randint(10, 120),
+        }
+        if kind == "bulk_po":
+            row["IPOFabricItemCodeCombined"] = ",".join(f"PO{j}" for j in range(rnd.randint(1, 4)))
+        rows.append(row)
+    return rows
+
+
+# ==================== SERVER ====================
+
+class MockERP:
+
+    def __init__(self, rows: int = 20000, latency: float = 0.05, endpoints=None,
+                 bulk_rows: int | None = None):
+        self.latency = latency
+        self.endpoints = {}
+        for handler, spec in (endpoints or DEFAULT_ENDPOINTS).items():
+            n = bulk_rows if (spec["kind"] == "bulk_po" and bulk_rows) else spec.get("rows", rows)
+            self.endpoints[handler] = {**spec, "rows": make_rows(spec["kind"], n)}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def count(self, handler: str, nbytes: int) -> None:
+        with self._lock:
+            st = self.stats.setdefault(handler, {"requests": 0, "bytes": 0})
+            st["requests"] += 1
+            st["bytes"] += nbytes
+
+
+def make_handler(erp: MockERP):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, code, body: bytes, ctype="application/json", headers=None):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _logged_in(self) -> bool:
+            return f"{SESSION_COOKIE}={SESSION_VALUE}" in (self.headers.get("Cookie") or "")
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/__stats":
+                self._send(200, json.dumps(erp.stats).encode())
+            elif path == "/app":
+                self._send(200, APP_PAGE.encode(), "text/html")
+            else:
+                self._send(200, LOGIN_PAGE.encode(), "text/html")
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+
+            if parsed.path == "/login":
+                self._send(
+                    303, b"", "text/html",
+                    {"Location": "/app", "Set-Cookie": f"{SESSION_COOKIE}={SESSION_VALUE}; Path=/"},
+                )
+                return
+
+            qs = parse_qs(parsed.query)
+            handler = (qs.get("_o") or [""])[0].split(".")[-1]
+            spec = erp.endpoints.get(handler)
+            if qs.get("_m") != ["LoadData"] or spec is None:
+                self._send(404, b'{"error": "unknown handler"}')
+                return
+            if not self._logged_in():
+                # The real ERP answers an expired session with the login page
+                self._send(200, LOGIN_PAGE.encode(), "text/html")
+                return
+            if spec["kind"] == "PURCHASEORDER" and form.get("sessionId") != PAGE_SESSION_ID:
+                self._send(500, b'{"error": "invalid sessionId"}')
+                return
+
+            time.sleep(erp.latency)
+            rows = spec["rows"]
+
+            if "start" in form and "length" in form:
+                start, size = int(form["start"]), int(form["length"])
+                js = {
+                    "draw": int(form.get("draw", 1)),
+                    "recordsTotal": len(rows),
+                    "recordsFiltered": len(rows),
+                    "data": rows[start:start + size],
+                }
+            elif spec["shape"] == "Data.objects":
+                js = {"Data": {"objects": rows}}
+            else:
+                js = {"data": rows}
+
+            body = json.dumps(js, ensure_ascii=False).encode("utf-8")
+            erp.count(handler, len(body))
+            self._send(200, body)
+
+    return Handler
+
+
+LOGIN_PAGE = """<!doctype html><html><body>
+<form method="post" action="/login">
+  <input name="RealUserName"><input name="RealPassword" type="password">
+  <button type="submit">Login</button>
+</form></body></html>"""
+
+APP_PAGE = f"""<!doctype html><html><body>
+<input type="hidden" name="sessionId" value="{PAGE_SESSION_ID}">
+<button data-hot-key="Ctrl_f" data-type-key="keyup"
+  onclick="fetch(location.origin + '/?_n=Core.Sites.Apps&_o=Mock.ManagePurchaseOrder&_m=LoadData',
+                 {{method: 'POST', body: 'sessionId={PAGE_SESSION_ID}&draw=1&start=0&length=1',
+                   headers: {{'Content-Type': 'application/x-www-form-urlencoded'}}}})">Search</button>
+</body></html>"""
+
+
+def serve(port: int = 8765, rows: int = 20000, latency: float = 0.05,
+          bulk_rows: int | None = None, endpoints=None) -> ThreadingHTTPServer:
+    """Start the mock in a background thread. Returns the server (call .shutdown())."""
+    erp = MockERP(rows=rows, latency=latency, endpoints=endpoints, bulk_rows=bulk_rows)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(erp))
+    server.daemon_threads = True
+    server.erp = erp
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ERP stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows", type=int, default=20000, help="rows per endpoint")
+    parser.add_argument("--bulk-rows", type=int, default=None, help="rows for bulk_po endpoints")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per LoadData call")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.rows, args.latency, args.bulk_rows)
+    print(f"[MOCK ERP] http://127.0.0.1:{server.server_address[1]}/  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Column registry shared by the crawler and the transformation modules.
+
+Every transformation module declares here the raw snapshots it reads and
+the columns it selects (cleaned names, see `clean_column_name`). From that:
+- transform specs (config/transform_specs.py) take their select list from
+  `module_columns(<module>)`
+- the crawler asks the ERP only for those columns (DataTables `columns[]`)
+  and drops every other field before writing the raw snapshot, unless
+  it runs with --full-fidelity
+
+Snapshots no module reads (PO_LIST, trim planning, ...) are kept whole.
+"""
+
+from __future__ import annotations
+import fnmatch
+import re
+
+
+def clean_column_name(col_name: str) -> str:
+    # 1. Uppercase
+    name = col_name.upper()
+
+    # 2. Replace by underscore
+    name = re.sub(r"[#()]", "", name)
+    name = re.sub(r"[^A-Z0-9]+", "_", name)
+
+    # 3. Strip
+    name = re.sub(r"_+", "_", name).strip("_")
+
+    return name
+
+
+# =========================================================
+# PHASE 1 (folder modules: fabric_trim, treatment, technical, costing, cuttingdocket)
+# =========================================================
+DATE_ALIAS_GROUPS = {
+    "SENT_DATE": ["SENTPURDATE","SENT_PRT_DATE","SENTTECHNICALDATE"],
+    "EXPECT_RECEIVE": ["EXPECTRECEIVEDATE","EXPECTEDRECEIVEDATE", "EXPECT RECEIVE"],
+    "CUSTOMER_APPROVED_DATE": ["CUSTOMERAPPROVEDDATE"],
+    "RESPONSE_DATE": ["UPDATEDDATE"],
+    "RECEIVE_DATE" : ["RECEIVEDATEOFPUR", "RECEIVEDATEOF_PRT","TECHNICALRECEIVEDDATE", "RECEIVEDATEOFTECHNICAL"],
+    "SENT_MER_DATE": ["PRT_SENTMERDATE","SENTMERDATE"],
+    "CREATED_DATE": ["CREATEDDATE", "CREATEDDATETOJSON"],
+    "CLIENT_SENT_DATE" : ["CLIENTSENTDATE"],
+    "FINANCE_APPROVED_DATE": ["FINANCEAPPROVEDDATE"],
+    "COSTING_READY": ["MERSENTDATE"],
+    "COSTING_CUSTOMER_STATUS": ["CUSTOMERSTATUSNAME"],
+}
+
+BASE_COLUMNS = [
+    "REQUESTCODE", "PURCHASEORDERCODE", "POPARTNERNAME", "SEASONNAME", "STYLECOLORCODE", "CFC", "DROPCODE",
+    "STYLENOINTERNAL", "SKUNO","SKUNOINTERNAL" ,"WORKTYPENAME", "PURREJECTEDREASON","CUTTING_DOCKET","STATUSNAME"
+]
+
+COLUMN_ALIAS_GROUPS = {
+    "POPARTNERNAME": ["PARTNERNAME", "PARNETNAME", "PO_PARTNER_NAME","CUSTOMERNAME"],
+    "REQUESTCODE": ["REQUEST", "REQUEST_CODE"],
+    "PURCHASEORDERCODE": ["POCODE", "ORDER_CODE", "PO_NO","ORDERINTERNALCODE"],
+    "STYLENOINTERNAL": ["STYLE_INTERNAL", "STYLE_NO", "STYLENO"],
+    "SKUNO": ["SKU", "SKU_NO", "SKU_EXTERNAL"],
+    "WORKTYPENAME": ["WORKTYPENAME"],
+    "PURREJECTEDREASON": ["REJECTREASON", "REASON_REJECTED", "REJECT_REASON","REJECTEDREASON","REASONOFREJECT"],
+    "CUTTING_DOCKET": ["CODE"],
+    "STATUS": ["STATUSNAME"],
+}
+
+
+def phase1_columns() -> list:
+    """Every raw column load_base_and_date_columns can map onto its output."""
+    names = list(BASE_COLUMNS)
+    for groups in (DATE_ALIAS_GROUPS, COLUMN_ALIAS_GROUPS):
+        for canon, aliases in groups.items():
+            names.append(canon)
+            names.extend(clean_column_name(a) for a in aliases)
+    return list(dict.fromkeys(names))
+
+
+# =========================================================
+# MODULES: snapshots read ("<GROUP>/<file>" globs) + selected columns
+# =========================================================
+PURCHASEORDER_SELECT = [
+    "PARTNERNAME",      # BRAND_NAME
+    "DROPCODES",        # DROP
+    "SEASONCODE",       # SEASON
+    "CODE",             # ORDER_INTERNAL (PO code grid column)
+    "CFC",              # ORDER_EXTERNAL
+    "RECEIVEDATE",      # EXPECT_EX_FACTORY
+    "WORKTYPENAME",     # WORK_TYPE
+]
+
+MODULE_COLUMNS = {
+    "manageliststyleoforder": {
+        "snapshots": ["RAW_DATA/manageliststyleoforder.json"],
+        "columns": [
+            "STYLENOINTERNAL", "POSEASONCODE", "COLORNAME", "SHIPDATE", "POPARTNERNAME",
+            "DROPCODE", "POCODE", "POCFC", "STYLENAME", "WORKTYPENAME", "SKUNO",
+            "SKUNOINTERNAL", "STYLECATEGORYNAME",
+        ],
+    },
+    "managepurchaseorder": {
+        "snapshots": ["RAW_DATA/managepurchaseorder.json"],
+        "columns": PURCHASEORDER_SELECT,
+    },
+    "styleproductofplanning": {
+        "snapshots": ["RAW_DATA/styleproductofplanning.json"],
+        "columns": [
+            "STYLENOINTERNAL",          # STYLE_INTERNAL
+            "POSEASONCODE",             # SEASON
+            "COLORNAME",                # COLOR
+            "SHIPDATE",                 # CUSTOMER_REQUEST_DATE
+            "POPARTNERNAME",            # CUSTOMER (BRAND_NAME)
+            "SHIPMENTDATEMAX",          # SHIPMENT_DATE (External)
+            "DROPCODE",                 # DROP
+            "POCODE",                   # ORDER_INTERNAL
+            "LASTCUTTINGDOCKET",        # CD
+            "CUTTINGDOCKETRELEASEDATE", # CD_RELEASED_DATE
+            "CUTTINGDOCKETSTATUSNAME",  # CD_STATUS
+            "SKUNOINTERNAL",            # SKU_INTERNAL
+            "WORKTYPENAME",             # WORK_TYPE
+        ],
+    },
+    "mastergroupfabricpotabsofplanning_mastergrouppoitems": {
+        "snapshots": ["RAW_DATA/mastergroupfabricpotabsofplanning_mastergrouppoitems.json"],
+        "columns": [
+            "CUSTOMERNAME",                 # BRAND_NAME
+            "ORDERINTERNALCODES",           # ORDER_INTERNAL
+            "IPOFABRICMASTERCODE",          # MASTER_PO
+            "IPOFABRICMASTERGROUPCODE",     # FABRIC_FAST_CODE
+            "SEASONNAMES",                  # SEASON
+            "IPOFABRICITEMCODECOMBINED",    # PO_COMBINED
+            "ORDEREXTERNALCODES",           # ORDER_EXTERNAL
+            "COLOREXTS",                    # FABRIC_COLOR_EXT
+            "FIRSTSTOCKINDATE",             # FIRST_STOCK_IN_DATE
+            "STOCKINDATE",                  # LAST_STOCK_IN_DATE
+            "SKUNOINTERNALS",               # SKU_INTERNAL
+            "WORKTYPE",                     # WORK_TYPE
+            "REVISEDSTOCKINDATEREASON",     # REVISED_STOCK_IN_DATE_REASON
+            "GROUPFABRICTYPES",             # FABRIC_TRIM_TYPE
+        ],
+    },
+    "fabric_trim":   {"snapshots": ["FABRIC_TRIM/*"],   "columns": phase1_columns()},
+    "treatment":     {"snapshots": ["TREATMENT/*"],     "columns": phase1_columns()},
+    "technical":     {"snapshots": ["TECHNICAL/*"],     "columns": phase1_columns()},
+    "costing":       {"snapshots": ["COSTING/*"],       "columns": phase1_columns()},
+    "cuttingdocket": {"snapshots": ["CUTTINGDOCKET/*"], "columns": phase1_columns()},
+    "managecostingsheetclient": {
+        "snapshots": ["RAW_DATA/managepurchaseorder.json"],
+        "columns": PURCHASEORDER_SELECT,
+    },
+}
+
+
+def module_columns(module: str) -> list:
+    """Select list of a transformation module (cleaned column names)."""
+    return list(MODULE_COLUMNS[module]["columns"])
+
+
+def module_snapshots(module: str) -> list:
+    return list(MODULE_COLUMNS[module]["snapshots"])
+
+
+def snapshot_columns(key: str):
+    """Cleaned columns any module reads from snapshot `key`, or None if none reads it."""
+    names = set()
+    used = False
+    for spec in MODULE_COLUMNS.values():
+        if any(fnmatch.fnmatch(key, p) for p in spec["snapshots"]):
+            used = True
+            names.update(spec["columns"])
+    return names if used else None
+
+
+class ColumnFilter:
+    """Keeps raw (ERP-cased) column names whose cleaned form is registered."""
+
+    def __init__(self, names):
+        self.names = {clean_column_name(n) for n in names}
+        self._decisions = {}
+
+    def __call__(self, raw_name: str) -> bool:
+        keep = self._decisions.get(raw_name)
+        if keep is None:
+            keep = clean_column_name(raw_name) in self.names
+            self._decisions[raw_name] = keep
+        return keep
+
+    def prune(self, rows) -> list:
+        return [{k: v for k, v in r.items() if self(k)} for r in rows]
+
+
+def snapshot_filter(key: str, extra=()):
+    """ColumnFilter for a snapshot (+ `extra` columns, e.g. keys), None to keep all."""
+    names = snapshot_columns(key)
+    if names is None:
+        return None
+    return ColumnFilter(names | {n for n in extra if n})
@@ -0,0 +1,14 @@
+"""
+Raw snapshot root shared by the crawler, helper, the transform engine and
+the supervisor, so they all read and write the same ERP_RAW folder (and
+the same run manifest in ERP_RAW/_state).
+
+RAW_OUTPUT_PATH overrides it; the default is where the crawler has always
+written: ingestion/crawler/ERP_RAW.
+"""
+
+import os
+
+PIPELINE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+RAW_ROOT = os.getenv("RAW_OUTPUT_PATH") or os.path.join(PIPELINE_ROOT, "ingestion", "crawler", "ERP_RAW")
@@ -0,0 +1,175 @@
+"""
+Transform specs: one entry per bronze table, executed by
+transformation/transform_engine.py.
+
+Every table goes through the same steps, each optional, in this order:
+
+    source      {"group": <ERP_RAW group>, "file": <snapshot>} (typed as
+                pd.DataFrame(rows), like the modules loaded it)
+                or {"group": <group>, "phase1": True} (every snapshot of the
+                group through helper_phase1.load_base_and_date_columns)
+    select      "registry" = module_columns(<spec name>), or a column list
+    rename      {raw column: standard column}
+    dates       columns parsed with pd.to_datetime(errors="coerce")
+    normalize   {column: normalizer}            see NORMALIZERS in the engine
+    explode     {column: splitter}              one row per part, in order
+    map         {column: {raw value: value}}    unknown values -> empty
+    constants   {column: value}
+    derive      {column: (deriver, source column)}
+    output      (group, table, file) in ERP_PARQUET, all columns as strings
+
+Spec names are the module names of the column registry
+(`module_columns(<name>)`, `module_snapshots(<name>)`) and the task names
+of the supervisor.
+"""
+
+# =========================================================
+# PHASE 1 (one folder of snapshots per group)
+# =========================================================
+
+PHASE1_RENAME = {
+    "REQUESTCODE": "REQUEST",
+    "PURCHASEORDERCODE": "ORDER_INTERNAL",
+    "POPARTNERNAME": "BRAND_NAME",
+    "STYLENOINTERNAL": "STYLE_INTERNAL",
+    "SKUNO": "SKU",
+    "SKUNOINTERNAL": "SKU_INTERNAL",
+    "WORKTYPENAME": "WORK_TYPE",
+    "PURREJECTEDREASON": "REJECT_REASON",
+    "SEASONNAME": "SEASON",
+    "CFC": "ORDER_EXTERNAL",
+    "DROPCODE": "DROP",
+    "STYLECOLORCODE": "COLOR",
+}
+
+
+def phase1_spec(group: str, file: str, rename=None) -> dict:
+    return {
+        "source": {"group": group, "phase1": True},
+        "rename": {**PHASE1_RENAME, **(rename or {})},
+        "normalize": {"BRAND_NAME": "brand", "COLOR": "drop", "DROP": "drop"},
+        "output": (group, f"{group}_REQUEST", file),
+    }
+
+
+# =========================================================
+# RAW_DATA (one snapshot per table)
+# =========================================================
+
+PURCHASEORDER_RENAME = {
+    "PARTNERNAME": "BRAND_NAME",
+    "DROPCODES": "DROP",
+    "SEASONCODE": "SEASON",
+    "CODE": "ORDER_INTERNAL",
+    "CFC": "ORDER_EXTERNAL",
+    "RECEIVEDATE": "EXPECT_EX_FACTORY",
+    "WORKTYPENAME": "WORK_TYPE",
+}
+
+
+def purchaseorder_spec() -> dict:
+    # managepurchaseorder / managecostingsheetclient: same snapshot, same file
+    return {
+        "source": {"group": "RAW_DATA", "file": "managepurchaseorder.json"},
+        "select": "registry",
+        "rename": PURCHASEORDER_RENAME,
+        "normalize": {"BRAND_NAME": "brand"},
+        "explode": {"DROP": "drop"},
+        "output": ("RAW_DATA", "PURCHASE_ORDER", "raw_managepurchaseorder"),
+    }
+
+
+WORK_TYPE_MAP = {
+    1: "Sample",
+    2: "Bulk",
+    3: "Develop",
+}
+
+# Same order as the supervisor used to run the modules
+TRANSFORM_SPECS = {
+    "manageliststyleoforder": {
+        "source": {"group": "RAW_DATA", "file": "manageliststyleoforder.json"},
+        "select": "registry",
+        "rename": {
+            "STYLENOINTERNAL": "STYLE_INTERNAL",
+            "POSEASONCODE": "SEASON",
+            "COLORNAME": "COLOR",
+            "SHIPDATE": "CUSTOMER_EXPECTED_DATE",
+            "POPARTNERNAME": "BRAND_NAME",
+            "DROPCODE": "DROP",
+            "POCODE": "ORDER_INTERNAL",
+            "POCFC": "ORDER_EXTERNAL",
+            "STYLENAME": "STYLE_NAME",
+            "WORKTYPENAME": "WORK_TYPE",
+            "SKUNO": "SKU",
+            "SKUNOINTERNAL": "SKU_INTERNAL",
+            "STYLECATEGORYNAME": "PRODUCT_TYPE",
+        },
+        "dates": ["CUSTOMER_EXPECTED_DATE"],
+        "normalize": {"BRAND_NAME": "brand", "DROP": "drop", "COLOR": "drop"},
+        # ORDER_INTERNAL "...-yymmdd-..." -> date the PO was submitted
+        "derive": {"PO_SUBMIT_DATE": ("yymmdd", "ORDER_INTERNAL")},
+        "output": ("RAW_DATA", "STYLE_OF_ORDER", "raw_manageliststyleoforder"),
+    },
+    "managepurchaseorder": purchaseorder_spec(),
+    "styleproductofplanning": {
+        "source": {"group": "RAW_DATA", "file": "styleproductofplanning.json"},
+        "select": "registry",
+        "rename": {
+            "STYLENOINTERNAL": "STYLE_INTERNAL",
+            "POSEASONCODE": "SEASON",
+            "SHIPDATE": "CUSTOMER_EXPECTED_DATE",
+            "POPARTNERNAME": "BRAND_NAME",
+            "SHIPMENTDATEMAX": "SHIPMENT_DATE",
+            "DROPCODE": "DROP",
+            "COLORNAME": "COLOR",
+            "POCODE": "ORDER_INTERNAL",
+            "WORKTYPENAME": "WORK_TYPE",
+            "SKUNOINTERNAL": "SKU_INTERNAL",
+            "LASTCUTTINGDOCKET": "CD",
+            "CUTTINGDOCKETRELEASEDATE": "CD_RELEASED_DATE",
+            "CUTTINGDOCKETSTATUSNAME": "CD_STATUS",
+        },
+        "normalize": {"BRAND_NAME": "brand", "DROP": "drop", "COLOR": "drop"},
+        "output": ("RAW_DATA", "PRODUCTION_PLANNING", "raw_styleproductofplanning"),
+    },
+    "mastergroupfabricpotabsofplanning_mastergrouppoitems": {
+        "source": {
+            "group": "RAW_DATA",
+            "file": "mastergroupfabricpotabsofplanning_mastergrouppoitems.json",
+        },
+        "select": "registry",
+        "rename": {
+            "CUSTOMERNAME": "BRAND_NAME",
+            "ORDERINTERNALCODES": "ORDER_INTERNAL",
+            "IPOFABRICMASTERCODE": "MASTER_PO",
+            "IPOFABRICMASTERGROUPCODE": "FABRIC_TRIM_FAST_CODE",
+            "SEASONNAMES": "SEASON",
+            "IPOFABRICITEMCODECOMBINED": "PO",
+            "ORDEREXTERNALCODES": "ORDER_EXTERNAL",
+            "COLOREXTS": "FABRIC_COLOR_EXT",
+            "FIRSTSTOCKINDATE": "FIRST_STOCK_IN_DATE",
+            "STOCKINDATE": "LAST_STOCK_IN_DATE",
+            "SKUNOINTERNALS": "SKU_INTERNAL",
+            "WORKTYPE": "WORK_TYPE",
+            "REVISEDSTOCKINDATEREASON": "REVISED_STOCK_IN_DATE_REASON",
+            "GROUPFABRICTYPES": "FABRIC_TRIM_TYPE",
+        },
+        # Comma separated PO / SKU lists: one row per PO x SKU
+        "explode": {"PO": "drop", "SKU_INTERNAL": "drop"},
+        "map": {"WORK_TYPE": WORK_TYPE_MAP},
+        "constants": {"CATEGORY": "FABRIC"},
+        "output": (
+            "RAW_DATA", "FABRIC_TRIM_PLANNING",
+            "raw_mastergroupfabricpotabsofplanningmastergrouppoitems",
+        ),
+    },
+    "fabric_trim": phase1_spec("FABRIC_TRIM", "raw_fabric_trim"),
+    "treatment": phase1_spec("TREATMENT", "raw_treatment"),
+    "technical": phase1_spec("TECHNICAL", "raw_technical"),
+    "costing": phase1_spec("COSTING", "raw_costing", {"CREATED_DATE": "COSTING_CREATED_DATE"}),
+    "cuttingdocket": phase1_spec(
+        "CUTTINGDOCKET", "raw_cuttingdocket", {"EXPECT_RECEIVE": "EXPECTED_RECEIVED_DATE"}
+    ),
+    "managecostingsheetclient": purchaseorder_spec(),
+}
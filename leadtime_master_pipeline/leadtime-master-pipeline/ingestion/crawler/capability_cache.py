@@ -0,0 +1,73 @@
+"""
+Per-endpoint capability cache.
+
+Records whether an endpoint answers correctly with the cookie-backed
+`requests.Session` alone (no Playwright page visit / search click).
+Stored on disk as JSON:
+
+    {
+      "fabric_development": {"http_only": true,  "probed_at": "2026-01-05T06:01:12"},
+      "purchaseorder":      {"http_only": false, "probed_at": "2026-01-05T06:02:40"}
+    }
+
+Entries older than `ttl_days` are stale and the endpoint is probed again.
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+
+class CapabilityCache:
+
+    def __init__(self, path: str, ttl_days: float = 7):
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            print("[WARN] capability cache unreadable, re-probing all:", e)
+            return {}
+
+    def _fresh_entry(self, name: str):
+        entry = self._entries.get(name)
+        if not entry:
+            return None
+        try:
+            probed_at = datetime.fromisoformat(entry["probed_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if datetime.now() - probed_at > self.ttl:
+            return None
+        return entry
+
+    def needs_browser(self, name: str) -> bool:
+        """True only when a fresh probe said the endpoint fails without a page visit."""
+        with self._lock:
+            entry = self._fresh_entry(name)
+        return entry is not None and not entry.get("http_only", False)
+
+    def record(self, name: str, http_only: bool) -> None:
+        with self._lock:
+            self._entries[name] = {
+                "http_only": bool(http_only),
+                "probed_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,97 @@
+"""
+Crawl checkpoint manifest (for `--resume`).
+
+One JSON file per crawl, rewritten atomically after every committed page:
+
+    {
+      "run_date": "2026-01-05",
+      "started_at": "2026-01-05T06:00:03",
+      "endpoints": {
+        "purchaseorder": {
+          "status": "in_progress",            # or "done"
+          "snapshot_path": ".../managepurchaseorder.json",
+          "pages_committed": 7,
+          "next_start": 14000,                # DataTables offset to continue from
+          "rows": 14000,
+          "part_bytes": 48211345              # committed size of <snapshot>.part
+        }
+      }
+    }
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class CrawlCheckpoint:
+
+    def __init__(self, path: str, run_date: str, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+
+        if resume and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print("[WARN] checkpoint unreadable, starting over:", e)
+
+            if self._data and self._data.get("run_date") != run_date:
+                # Pages of another day's crawl must not be stitched onto today's
+                print(f"[WARN] checkpoint is from {self._data.get('run_date')}, starting over")
+                self._data = None
+
+        if self._data is None:
+            self._data = {
+                "run_date": run_date,
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "endpoints": {},
+            }
+            self.save()
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return dict(self._data["endpoints"].get(name, {}))
+
+    def is_done(self, name: str) -> bool:
+        entry = self.get(name)
+        return entry.get("status") == "done" and os.path.exists(entry.get("snapshot_path", ""))
+
+    def start(self, name: str, snapshot_path: str) -> None:
+        self._update(name, {
+            "status": "in_progress",
+            "snapshot_path": snapshot_path,
+            "pages_committed": 0,
+            "next_start": 0,
+            "rows": 0,
+            "part_bytes": 0,
+        })
+
+    def page_committed(self, name: str, next_start: int, rows: int, part_bytes: int) -> None:
+        with self._lock:
+            entry = self._data["endpoints"].setdefault(name, {})
+            entry["pages_committed"] = entry.get("pages_committed", 0) + 1
+            entry["next_start"] = next_start
+            entry["rows"] = rows
+            entry["part_bytes"] = part_bytes
+        self.save()
+
+    def mark_done(self, name: str, rows: int) -> None:
+        self._update(name, {"status": "done", "rows": rows, "part_bytes": 0})
+
+    def _update(self, name: str, values: dict) -> None:
+        with self._lock:
+            self._data["endpoints"].setdefault(name, {}).update(values)
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
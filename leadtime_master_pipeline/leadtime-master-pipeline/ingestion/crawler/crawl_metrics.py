@@ -0,0 +1,264 @@
+"""
+Per-endpoint crawl metrics.
+
+Every HTTP attempt, decode, throttling wait, retry and browser navigation
+is attributed to the endpoint being crawled: `METRICS.endpoint(name)` binds
+the endpoint to the current context (a ContextVar, so threads started with
+`contextvars.copy_context()` - the page pool - inherit it), and
+`current()` returns its EndpointMetrics (None outside a crawl).
+
+After the run
+    ERP_RAW/_metrics/<RUN_DATE>/crawl_<RUN_TIME>.json    run report
+    ERP_RAW/_metrics/crawl.prom                          Prometheus textfile
+
+The textfile is rewritten atomically each run (point node_exporter's
+textfile collector at it, or set CRAWL_METRICS_TEXTFILE).
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+METRIC_PREFIX = "erp_crawl"
+
+_CURRENT: ContextVar["EndpointMetrics | None"] = ContextVar("crawl_endpoint", default=None)
+
+
+def percentile(values, q: float):
+    """Nearest-rank percentile of `values` (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[rank - 1]
+
+
+class EndpointMetrics:
+    """Counters of one endpoint; updated from the crawl and page threads."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = None
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = []
+        self.bytes = 0
+        self.decode_seconds = 0.0
+        self.throttled = 0
+        self.throttle_wait_seconds = 0.0
+        self.retry_wait_seconds = 0.0
+        self.browser_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.rows = 0
+        self.snapshot_bytes = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, latency: float, ok: bool = True) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def record_bytes(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes += nbytes
+
+    def record_decode(self, seconds: float) -> None:
+        with self._lock:
+            self.decode_seconds += seconds
+
+    def record_throttle(self, seconds: float) -> None:
+        if seconds > 0:
+            with self._lock:
+                self.throttled += 1
+                self.throttle_wait_seconds += seconds
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.retry_wait_seconds += delay
+
+    def record_browser(self, seconds: float) -> None:
+        with self._lock:
+            self.browser_seconds += seconds
+
+    def record_result(self, status: str, seconds: float, rows=None, snapshot_bytes=None) -> None:
+        with self._lock:
+            self.status = status
+            self.wall_seconds += seconds
+            if rows is not None:
+                self.rows = rows
+            if snapshot_bytes is not None:
+                self.snapshot_bytes = snapshot_bytes
+
+    def summary(self) -> dict:
+        with self._lock:
+            latency = {
+                f"p{int(q * 100)}": percentile(self.latencies, q) for q in LATENCY_QUANTILES
+            }
+            latency["max"] = max(self.latencies) if self.latencies else None
+            latency = {k: round(v, 4) if v is not None else None for k, v in latency.items()}
+            return {
+                "status": self.status,
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "latency_s": latency,
+                "request_seconds": round(sum(self.latencies), 3),
+                "bytes": self.bytes,
+                "decode_seconds": round(self.decode_seconds, 3),
+                "throttled": self.throttled,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "retry_wait_seconds": round(self.retry_wait_seconds, 3),
+                "browser_seconds": round(self.browser_seconds, 3),
+                "wall_seconds": round(self.wall_seconds, 3),
+                "rows": self.rows,
+                "snapshot_bytes": self.snapshot_bytes,
+            }
+
+
+class CrawlMetrics:
+    """EndpointMetrics by endpoint name, plus the run's wall clock."""
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def for_endpoint(self, name: str) -> EndpointMetrics:
+        with self._lock:
+            m = self._endpoints.get(name)
+            if m is None:
+                m = self._endpoints[name] = EndpointMetrics(name)
+            return m
+
+    @contextmanager
+    def endpoint(self, name: str):
+        """Attribute everything recorded in this context to `name`."""
+        token = _CURRENT.set(self.for_endpoint(name))
+        try:
+            yield _CURRENT.get()
+        finally:
+            _CURRENT.reset(token)
+
+    def report(self, run_date: str, run_time: str, status: str = "ok") -> dict:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {
+            "run_date": run_date,
+            "run_time": run_time,
+            "status": status,
+            "started": self.started,
+            "wall_seconds": round(time.time() - self.started, 3),
+            "endpoints": {name: m.summary() for name, m in sorted(endpoints.items())},
+        }
+
+
+def current():
+    """EndpointMetrics of the endpoint being crawled in this context, or None."""
+    return _CURRENT.get()
+
+
+# ==================== EXPORT ====================
+
+def _write_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_json_report(report: dict, path: str) -> None:
+    _write_atomic(path, json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# summary key -> (metric name, type, help)
+_PROM_ENDPOINT_METRICS = [
+    ("requests", "requests_total", "counter", "HTTP attempts"),
+    ("errors", "request_errors_total", "counter", "Failed or retryable HTTP attempts"),
+    ("retries", "retries_total", "counter", "Retried HTTP attempts"),
+    ("request_seconds", "request_seconds_total", "counter", "Time spent waiting on HTTP responses"),
+    ("bytes", "response_bytes_total", "counter", "Response bytes downloaded"),
+    ("decode_seconds", "decode_seconds_total", "counter", "JSON decode time"),
+    ("throttled", "throttled_total", "counter", "Requests delayed by the rate limiter"),
+    ("throttle_wait_seconds", "throttle_wait_seconds_total", "counter", "Rate limiter wait time"),
+    ("retry_wait_seconds", "retry_wait_seconds_total", "counter", "Retry backoff sleep time"),
+    ("browser_seconds", "browser_seconds_total", "counter", "Playwright page navigation time"),
+    ("wall_seconds", "wall_seconds", "gauge", "Wall time of the endpoint crawl"),
+    ("rows", "rows", "gauge", "Rows in the committed snapshot"),
+    ("snapshot_bytes", "snapshot_bytes", "gauge", "Size of the committed snapshot"),
+]
+
+
+def prometheus_text(report: dict) -> str:
+    """Prometheus text exposition format of a run report."""
+    p = METRIC_PREFIX
+    lines = []
+
+    def header(name, mtype, help_text):
+        lines.append(f"# HELP {p}_{name} {help_text}")
+        lines.append(f"# TYPE {p}_{name} {mtype}")
+
+    header("run_wall_seconds", "gauge", "Wall time of the crawl run")
+    lines.append(f"{p}_run_wall_seconds {report['wall_seconds']}")
+    header("run_success", "gauge", "1 if the crawl run finished without error")
+    lines.append(f"{p}_run_success {1 if report['status'] == 'ok' else 0}")
+    header("run_timestamp_seconds", "gauge", "Start of the crawl run (unix time)")
+    lines.append(f"{p}_run_timestamp_seconds {report['started']:.0f}")
+
+    endpoints = report["endpoints"]
+    header("endpoint_success", "gauge", "1 if the endpoint snapshot was committed")
+    for name, m in endpoints.items():
+        lines.append(f'{p}_endpoint_success{{endpoint="{_label(name)}"}} '
+                     f'{1 if m["status"] == "ok" else 0}')
+
+    header("request_latency_seconds", "summary", "HTTP response latency")
+    for name, m in endpoints.items():
+        ep = _label(name)
+        for q in LATENCY_QUANTILES:
+            v = m["latency_s"][f"p{int(q * 100)}"]
+            if v is not None:
+                lines.append(f'{p}_request_latency_seconds{{endpoint="{ep}",quantile="{q}"}} {v}')
+        lines.append(f'{p}_request_latency_seconds_sum{{endpoint="{ep}"}} {m["request_seconds"]}')
+        lines.append(f'{p}_request_latency_seconds_count{{endpoint="{ep}"}} {m["requests"]}')
+
+    for key, metric, mtype, help_text in _PROM_ENDPOINT_METRICS:
+        if key in ("requests", "request_seconds"):
+            continue   # exported as the latency summary's _count / _sum
+        header(metric, mtype, help_text)
+        for name, m in endpoints.items():
+            lines.append(f'{p}_{metric}{{endpoint="{_label(name)}"}} {m[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(report: dict, path: str) -> None:
+    _write_atomic(path, prometheus_text(report))
+
+
+def print_report(report: dict) -> None:
+    """Where the crawl time went, slowest endpoint first."""
+    print("\n===== CRAWL METRICS =====")
+    print(f"{'endpoint':<52}{'status':<14}{'req':>5}{'p50 s':>8}{'p99 s':>8}"
+          f"{'MB':>8}{'decode s':>10}{'wait s':>8}{'page s':>8}{'wall s':>8}{'rows':>10}")
+    endpoints = sorted(report["endpoints"].items(), key=lambda kv: -kv[1]["wall_seconds"])
+    for name, m in endpoints:
+        lat = m["latency_s"]
+        print(f"{name[:51]:<52}{str(m['status']):<14}{m['requests']:>5}"
+              f"{lat['p50'] or 0:>8.2f}{lat['p99'] or 0:>8.2f}{m['bytes'] / 1e6:>8.1f}"
+              f"{m['decode_seconds']:>10.2f}"
+              f"{m['throttle_wait_seconds'] + m['retry_wait_seconds']:>8.2f}"
+              f"{m['browser_seconds']:>8.2f}{m['wall_seconds']:>8.2f}{m['rows']:>10,}")
+    print(f"run: {report['wall_seconds']:.1f}s ({report['status']})")
@@ -0,0 +1,150 @@
+"""
+Crawl planner: size endpoints before downloading, schedule largest-first.
+
+Estimates per endpoint come from (in order of preference):
+- a `length=1` probe of paginated endpoints -> recordsTotal x bytes of one row
+- the last run's stats (rows, snapshot bytes, seconds) in crawl_stats.json
+
+Seconds are scaled from the endpoint's last run, or derived from bytes and
+the last run's overall throughput. Endpoints with no estimate at all are
+scheduled first (they may be the big ones).
+
+Stats file (rewritten after every crawl):
+
+    {
+      "purchaseorder": {"rows": 48211, "bytes": 61234567, "seconds": 42.7,
+                        "run_date": "2026-01-05"}
+    }
+"""
+
+from __future__ import annotations
+import heapq
+import json
+import os
+import threading
+
+DEFAULT_BYTES_PER_SECOND = 2_000_000
+
+
+class CrawlStats:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print("[WARN] crawl stats unreadable, planning without history:", e)
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return dict(self._entries.get(name, {}))
+
+    def record(self, name: str, rows: int, nbytes: int, seconds: float, run_date: str) -> None:
+        with self._lock:
+            self._entries[name] = {
+                "rows": rows,
+                "bytes": nbytes,
+                "seconds": round(seconds, 3),
+                "run_date": run_date,
+            }
+
+    def throughput(self) -> float:
+        """Bytes per second over all recorded endpoints (default if no history)."""
+        with self._lock:
+            entries = list(self._entries.values())
+        nbytes = sum(e.get("bytes") or 0 for e in entries)
+        seconds = sum(e.get("seconds") or 0 for e in entries)
+        return nbytes / seconds if nbytes and seconds else DEFAULT_BYTES_PER_SECOND
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def estimate_endpoint(cfg, stats: CrawlStats, probe=None, throughput=None) -> dict:
+    """
+    Estimated {rows, bytes, seconds, source} of one endpoint.
+    `probe(cfg)` returns (records_total, bytes_per_row) or None.
+    """
+    est = {"name": cfg["name"], "group": cfg["group"],
+           "rows": None, "bytes": None, "seconds": None, "source": "unknown"}
+    last = stats.get(cfg["name"])
+
+    if probe is not None:
+        try:
+            sized = probe(cfg)
+        except Exception as e:
+            print(f"[PLAN] {cfg['name']}: probe failed ({e})")
+            sized = None
+        if sized is not None:
+            rows, row_bytes = sized
+            est.update(rows=rows, bytes=rows * row_bytes, source="probe")
+
+    if est["rows"] is None and last:
+        est.update(rows=last.get("rows"), bytes=last.get("bytes"), source="last run")
+
+    if est["bytes"] is not None:
+        if last.get("seconds") and last.get("bytes"):
+            est["seconds"] = last["seconds"] * est["bytes"] / last["bytes"]
+        else:
+            est["seconds"] = est["bytes"] / (throughput or stats.throughput())
+    return est
+
+
+def plan_crawl(cfgs, stats: CrawlStats, probe=None) -> list:
+    """Estimates for `cfgs`, largest first (unknown sizes at the front)."""
+    throughput = stats.throughput()
+    estimates = [estimate_endpoint(cfg, stats, probe, throughput) for cfg in cfgs]
+    return sorted(estimates, key=lambda e: (e["seconds"] is not None, -(e["seconds"] or 0)))
+
+
+def order_largest_first(cfgs, estimates) -> list:
+    rank = {e["name"]: i for i, e in enumerate(estimates)}
+    return sorted(cfgs, key=lambda cfg: rank.get(cfg["name"], -1))
+
+
+def estimate_makespan(estimates, workers: int) -> float:
+    """Greedy longest-first schedule of the known estimates over `workers`."""
+    finish = [0.0] * max(1, workers)
+    for e in estimates:
+        t = heapq.heappop(finish)
+        heapq.heappush(finish, t + (e["seconds"] or 0.0))
+    return max(finish)
+
+
+def _fmt(value, unit=""):
+    if value is None:
+        return "?"
+    if unit == "B":
+        for u in ("B", "KB", "MB", "GB"):
+            if value < 1024 or u == "GB":
+                return f"{value:,.1f} {u}"
+            value /= 1024
+    if unit == "s":
+        return f"{value:,.1f} s"
+    return f"{value:,}"
+
+
+def print_plan(estimates, workers: int) -> None:
+    print("\n===== CRAWL PLAN (largest first) =====")
+    print(f"{'endpoint':<52}{'rows':>10}{'bytes':>13}{'est time':>11}  source")
+    for e in estimates:
+        print(f"{e['name']:<52}{_fmt(e['rows']):>10}{_fmt(e['bytes'], 'B'):>13}"
+              f"{_fmt(e['seconds'], 's'):>11}  {e['source']}")
+
+    known = [e for e in estimates if e["seconds"] is not None]
+    total_bytes = sum(e["bytes"] or 0 for e in known)
+    print(f"\nTotal (known): {_fmt(total_bytes, 'B')}, "
+          f"{_fmt(sum(e['seconds'] for e in known), 's')} sequential, "
+          f"~{_fmt(estimate_makespan(known, workers), 's')} with {workers} workers")
+    unknown = len(estimates) - len(known)
+    if unknown:
+        print(f"{unknown} endpoint(s) without estimate (no probe, no previous run)")
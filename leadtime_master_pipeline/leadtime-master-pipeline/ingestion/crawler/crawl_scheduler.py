@@ -0,0 +1,120 @@
+"""
+Concurrent crawl scheduler.
+
+Endpoints run in a bounded worker pool (global cap). Every HTTP request
+additionally takes a per-host slot of its scheduler, so the ERP never sees
+more than `per_host` requests in flight from one scheduler no matter how
+many endpoints and pages are being fetched at the same time.
+
+Browser work (Playwright) is NOT thread-safe and stays on the caller's
+thread; only the plain `requests` part of an endpoint is submitted here.
+"""
+
+from __future__ import annotations
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from urllib.parse import urlparse
+
+# ==================== PER-HOST SLOTS ====================
+
+DEFAULT_PER_HOST = 4
+
+
+class HostSlots:
+    """One BoundedSemaphore of `limit` request slots per host."""
+
+    def __init__(self, limit: int = DEFAULT_PER_HOST):
+        self.limit = max(1, int(limit))
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def slot_for(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.limit)
+            return slot
+
+    @contextmanager
+    def hold(self, url: str):
+        slot = self.slot_for(url)
+        slot.acquire()
+        try:
+            yield
+        finally:
+            slot.release()
+
+
+# Slots of the scheduler running the current endpoint (a ContextVar: the
+# page pool, started with copy_context(), shares them). Requests made
+# outside a scheduler (browser steps, tools) use the default slots.
+_ACTIVE_SLOTS: ContextVar["HostSlots | None"] = ContextVar("crawl_host_slots", default=None)
+_DEFAULT_SLOTS = HostSlots()
+
+
+def host_slot(url: str):
+    """Hold one of the per-host request slots for the duration of a request."""
+    return (_ACTIVE_SLOTS.get() or _DEFAULT_SLOTS).hold(url)
+
+
+# ==================== SCHEDULER ====================
+
+class CrawlScheduler:
+    """
+    Worker pool for endpoint crawls with stop-on-first-failure semantics.
+
+    Usage:
+        with CrawlScheduler(max_workers=4, per_host=4) as scheduler:
+            for cfg in configs:
+                scheduler.submit(cfg["name"], crawl_fn, cfg)
+            results = scheduler.join()
+    """
+
+    def __init__(self, max_workers: int = 4, per_host: int = DEFAULT_PER_HOST):
+        # Own slots: a second scheduler (the fallback pass) never resets
+        # the semaphores requests of this one may still hold
+        self.host_slots = HostSlots(per_host)
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="crawl"
+        )
+        self._futures = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # On error: drop queued endpoints, let in-flight requests finish
+        self._pool.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
+
+    def submit(self, name: str, fn, *args, **kwargs):
+        self.raise_if_failed()
+        ctx = copy_context()
+        ctx.run(_ACTIVE_SLOTS.set, self.host_slots)
+        fut = self._pool.submit(ctx.run, fn, *args, **kwargs)
+        self._futures[fut] = name
+        return fut
+
+    def raise_if_failed(self) -> None:
+        """Re-raise the first worker error without waiting for the others."""
+        for fut, name in self._futures.items():
+            if fut.done() and not fut.cancelled() and fut.exception() is not None:
+                self._cancel_pending()
+                raise RuntimeError(f"Crawl failed on endpoint: {name}") from fut.exception()
+
+    def join(self) -> dict:
+        """Wait for all endpoints. Returns {name: result}, raises on first failure."""
+        done, not_done = wait(self._futures, return_when=FIRST_EXCEPTION)
+        if not_done:
+            self._cancel_pending()
+        self.raise_if_failed()
+        wait(self._futures)
+        return {name: fut.result() for fut, name in self._futures.items()}
+
+    def _cancel_pending(self) -> None:
+        for fut in self._futures:
+            fut.cancel()
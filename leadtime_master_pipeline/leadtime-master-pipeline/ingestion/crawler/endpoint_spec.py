@@ -0,0 +1,181 @@
+"""
+Declarative request specs for ERP endpoints.
+
+Every MERCH_CONFIG entry names a spec (`"spec"`, default "DEFAULT"). A spec
+says how the endpoint is requested:
+
+    pagination      "datatables" (draw/start/length pages) or None (one response)
+    fields          static form fields, already in their wire form ("true", "2", ...)
+    path            send the page path as `path`
+    session_id      send the page's `sessionId` (endpoint needs it)
+    columns         DataTables columns[] (data names, in ERP order)
+    column_flags    [name]/[searchable]/... values sent for each column
+    order_by        default sort column, `order_dir` its direction
+
+`compile_endpoint()` turns a spec + endpoint into a CompiledEndpoint once per
+crawl: the whole form body except draw/start/length is urlencoded up front,
+so a page request is a string concatenation. Adding a paginated endpoint is
+a new spec entry, not a new payload builder.
+"""
+
+from __future__ import annotations
+from urllib.parse import urlencode, urlparse
+
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"}
+
+
+# ==================== SPECS ====================
+
+TREATMENT_COLUMNS = [
+    "Row","RequestCode","PurchaseOrderCode","PartnerName","StyleNoInternal",
+    "WorkTypeName","SkuNo","StyleName","ProcessTypeName","CustomerNote",
+    "Sent_PRT_Date","SentTo_PRT_ByUserName","ExpectReceiveDate","ReceiveDateOf_PRT",
+    "ReceivedByUserName","SentSupplierDate","SampleReceiveDate","SampleReceivedByUserName",
+    "PRT_SentMerDate","CreatedDate","CreatedByUserName","UpdatedDate","UpdatedByUserName",
+    "TreatmentSectionName","StateName",
+]
+
+PURCHASEORDER_COLUMNS = [
+    "Row", "CFC", "Code", "PartnerName", "SeasonCode",
+    "DropCodes", "WorkTypeName", "JobNumber", "ReceiveDate",
+    "StateName", "TotalOrderQty", "TotalSKU", "MerStatusName",
+    "AssignUserName", "PersonInChargeUserName", "RejectedReason",
+    "RejectedUserName", "RejectedDate", "ApprovedDate",
+    "ApprovedUserName", "CreatedDate", "CreatedByUserName",
+    "UpdatedDate", "UpdatedByUserName", "24", "25"
+]
+
+ENDPOINT_SPECS = {
+    # ------- TREATMENT forms (DataTables) -------
+    "TREATMENT": {
+        "pagination": "datatables",
+        "fields": {
+            "search[value]": "",
+            "search[regex]": "false",
+            "CompanyId": "2",
+            "PurchaseOrderId": "0",
+            "SentTo_PRT_ByUserId": "0",
+            "State": "0",
+            "KeySearch": "",
+            "ByTab": "true",
+        },
+        "path": True,
+        "columns": TREATMENT_COLUMNS,
+        "column_flags": {
+            "[name]": "", "[searchable]": "true", "[orderable]": "true",
+            "[search][value]": "", "[search][regex]": "false",
+        },
+        "order_by": "Sent_PRT_Date",
+        "order_dir": "desc",
+    },
+    # ------- PURCHASE ORDER (DataTables, page sessionId) -------
+    "PURCHASEORDER": {
+        "pagination": "datatables",
+        "fields": {
+            "search[value]": "",
+            "search[regex]": "False",
+            "CompanyId": "2",
+            "StateFromFilter": "0",
+            "SeasonId": "0",
+            "PartnerId": "0",
+            "WorkType": "0",
+            "KeySearch": "",
+        },
+        "path": True,
+        "session_id": True,
+        "columns": PURCHASEORDER_COLUMNS,
+        "column_flags": {
+            "[name]": "", "[searchable]": "True", "[orderable]": "True",
+            "[search][value]": "", "[search][regex]": "False",
+        },
+        "order_by": "CreatedDate",
+        "order_dir": "desc",
+    },
+    # ------- Planning / PO list tabs (one response) -------
+    "BULK_PO": {
+        "pagination": None,
+        "fields": {
+            "CompanyId": "2",
+            "KeySearch": "",
+            "IsWorkTypeBulk": "true",
+            "ByTab": "true",
+        },
+        "path": True,
+    },
+    # ------- Everything else: empty POST -------
+    "DEFAULT": {
+        "pagination": None,
+    },
+}
+
+
+def endpoint_spec(cfg) -> dict:
+    return ENDPOINT_SPECS[cfg.get("spec", "DEFAULT")]
+
+
+# ==================== COMPILE ====================
+
+class CompiledEndpoint:
+    """
+    Pre-encoded request of one endpoint. `body(draw, start, length)` only
+    prepends the paging fields to the static part.
+    """
+
+    def __init__(self, spec_name, spec, static_fields, columns=None, order_by=None):
+        self.spec_name = spec_name
+        self.paginated = spec.get("pagination") == "datatables"
+        self.columns = columns
+        self.order_by = order_by
+        self._static = urlencode(static_fields) if static_fields is not None else None
+
+    def body(self, draw=None, start=None, length=None) -> bytes | None:
+        if self._static is None:
+            return None
+        if not self.paginated:
+            return self._static.encode("ascii")
+        paging = f"draw={draw}&start={start}&length={length}"
+        return (f"{paging}&{self._static}" if self._static else paging).encode("ascii")
+
+    def request_kwargs(self, draw=None, start=None, length=None) -> dict:
+        """`data` / `headers` for erp_post (nothing for an empty POST)."""
+        body = self.body(draw, start, length)
+        if body is None:
+            return {}
+        return {"data": body, "headers": FORM_HEADERS}
+
+
+def requested_columns(all_columns, column_filter, order_by):
+    """DataTables columns[] to send: registry columns + the sort column."""
+    if column_filter is None:
+        return list(all_columns)
+    return [c for c in all_columns if column_filter(c) or c == order_by]
+
+
+def compile_endpoint(cfg, session_id=None, order_by=None, column_filter=None) -> CompiledEndpoint:
+    """
+    Compile the spec of `cfg` into its static form body. `order_by` overrides
+    the spec's sort column, `column_filter` limits the columns[] sent.
+    """
+    spec_name = cfg.get("spec", "DEFAULT")
+    spec = ENDPOINT_SPECS[spec_name]
+    if "fields" not in spec and not spec.get("path"):
+        return CompiledEndpoint(spec_name, spec, None)
+
+    fields = dict(spec.get("fields", {}))
+    if spec.get("session_id"):
+        fields["sessionId"] = session_id or ""
+    if spec.get("path"):
+        fields["path"] = urlparse(cfg["page_url"]).path
+
+    columns = None
+    if "columns" in spec:
+        order_by = order_by or spec["order_by"]
+        columns = requested_columns(spec["columns"], column_filter, order_by)
+        for i, col in enumerate(columns):
+            fields[f"columns[{i}][data]"] = col
+            for suffix, value in spec["column_flags"].items():
+                fields[f"columns[{i}]{suffix}"] = value
+        fields["order[0][column]"] = str(columns.index(order_by))
+        fields["order[0][dir]"] = spec.get("order_dir", "desc")
+
+    return CompiledEndpoint(spec_name, spec, fields, columns, order_by)
@@ -1,14 +1,43 @@
 import os
 import json
+import argparse
 import time
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
 
 import requests
 from playwright.sync_api import sync_playwright
+try:
+    import ijson
+except ImportError:
+    ijson = None
 import sys
 sys.stdout.reconfigure(encoding="utf-8")
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from ingestion.raw_storage.json_writer import SnapshotWriter, iter_snapshot_rows, canonical_json
+from ingestion.raw_storage.json_codec import response_json
+from ingestion.raw_storage.run_manifest import RunManifest, manifest_path, snapshot_key
+from config.paths import RAW_ROOT
+from ingestion.raw_storage.cdc import capture_changes
+from ingestion.raw_storage.history_store import archive_snapshot, apply_retention, compact
+
+from crawl_scheduler import CrawlScheduler, host_slot
+from capability_cache import CapabilityCache
+from session_cache import load_session, save_session, clear_session
+from watermarks import WatermarkStore, parse_erp_datetime, max_datetime
+from rate_limiter import AdaptiveRateLimiter, RETRYABLE_STATUS, retry_delay
+from checkpoint import CrawlCheckpoint
+from config.column_registry import snapshot_filter
+from crawl_planner import CrawlStats, plan_crawl, order_largest_first, print_plan
+from endpoint_spec import endpoint_spec, compile_endpoint
+from crawl_metrics import CrawlMetrics, current as current_metrics, write_json_report, \
+    write_prometheus, print_report as print_metrics
+
 # ==================== CONFIG ====================
 
 ERP_LOGIN_URL = "https://example-erp/"
@@ -22,11 +51,80 @@ SUBMIT_SELECTOR   = "button[type='submit'], input[type='submit']"
 
 SEARCH_BUTTON_SELECTOR = "button[data-hot-key='Ctrl_f'][data-type-key='keyup']"
 
+# Page readiness (event-driven, no fixed sleeps)
+READY_TIMEOUT_MS = 15000
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-BASE_DIR   = os.path.join(SCRIPT_DIR, "ERP_RAW")
+BASE_DIR   = RAW_ROOT
 
 
 RUN_DATE = datetime.now().strftime("%Y-%m-%d")
+RUN_TIME = datetime.now().strftime("%H%M%S")
+
+# Crawler state (capability cache, ...) lives next to the raw snapshots
+STATE_DIR = os.path.join(BASE_DIR, "_state")
+CAPABILITY_CACHE_PATH = os.path.join(STATE_DIR, "endpoint_capabilities.json")
+CAPABILITY_TTL_DAYS = 7   # re-probe cookie-only access after this many days
+BROWSER_REQUIRED_STATUS = {401, 403}   # cookie-only fetch refused outright
+
+# Login session cache (encrypted cookies + PURCHASEORDER sessionId)
+SESSION_CACHE_PATH = os.path.join(STATE_DIR, "erp_session.bin")
+SESSION_MAX_AGE_HOURS = 8
+
+# Incremental crawl (--incremental): per-endpoint UpdatedDate high-water mark
+WATERMARK_PATH = os.path.join(STATE_DIR, "watermarks.json")
+
+# Resumable crawl (--resume): per-endpoint committed pages / offsets
+CHECKPOINT_PATH = os.path.join(STATE_DIR, "checkpoint.json")
+
+# Crawl planner: last run's rows / bytes / seconds per endpoint
+CRAWL_STATS_PATH = os.path.join(STATE_DIR, "crawl_stats.json")
+
+# Content hash of every committed snapshot (read by supervisor / uploader)
+MANIFEST_PATH = manifest_path(BASE_DIR)
+
+# Change data capture: previous snapshot + dated insert/update/delete Parquet
+CDC_ENABLED = True
+CDC_DIR = os.path.join(BASE_DIR, "_cdc")
+CDC_PREVIOUS_DIR = os.path.join(CDC_DIR, "previous")
+
+# Dated, deduplicated snapshot history (ERP_RAW/_history)
+HISTORY_ENABLED = True
+HISTORY_KEEP_DAYS = 30      # every run date kept this long
+HISTORY_KEEP_MONTHS = 12    # then the last run of each month
+
+# DataTables pagination
+PAGE_SIZE = 2000
+PAGE_CONCURRENCY = 4   # concurrent page requests once recordsTotal is known (1 = sequential)
+
+# Single-response endpoints (BULK_PO / DEFAULT) are stream-parsed with ijson
+BULK_BATCH_ROWS = 1000
+ROW_ARRAY_PREFIXES = ("data.item", "Data.objects.item")
+
+# HTTP: adaptive per-host rate limit + retries for transient failures
+REQUEST_TIMEOUT = (10, 300)        # (connect, read) seconds
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RATE_LIMITER = AdaptiveRateLimiter(
+    rate=4.0,             # initial requests/s per host
+    burst=4,
+    min_rate=0.5,
+    max_rate=20.0,
+    target_latency=1.5,   # seconds; slower answers stop the rate from growing
+)
+RATE_STATS_PATH = os.path.join(STATE_DIR, "rate_limiter_stats.json")
+
+# Per-endpoint metrics: JSON run report + Prometheus textfile (node_exporter)
+METRICS = CrawlMetrics()
+METRICS_DIR = os.path.join(BASE_DIR, "_metrics")
+METRICS_REPORT_PATH = os.path.join(METRICS_DIR, RUN_DATE, f"crawl_{RUN_TIME}.json")
+METRICS_TEXTFILE = os.getenv("CRAWL_METRICS_TEXTFILE") or os.path.join(METRICS_DIR, "crawl.prom")
+
+# Endpoint scheduler
+CRAWL_WORKERS  = 4     # endpoints crawled at the same time (global cap)
+CRAWL_PER_HOST = 4     # HTTP requests in flight per ERP host
 
 
 # ==================== GROUP FOLDER STRUCTURE ====================
@@ -61,138 +159,51 @@ for g, paths in GROUP_DIRS.items():
     os.makedirs (json_root,exist_ok=True)
 
 
-# ==================== PAYLOAD DEFINITIONS ====================
-
-TREATMENT_COLUMNS = [
-    "Row","RequestCode","PurchaseOrderCode","PartnerName","StyleNoInternal",
-    "WorkTypeName","SkuNo","StyleName","ProcessTypeName","CustomerNote",
-    "Sent_PRT_Date","SentTo_PRT_ByUserName","ExpectReceiveDate","ReceiveDateOf_PRT",
-    "ReceivedByUserName","SentSupplierDate","SampleReceiveDate","SampleReceivedByUserName",
-    "PRT_SentMerDate","CreatedDate","CreatedByUserName","UpdatedDate","UpdatedByUserName",
-    "TreatmentSectionName","StateName",
-]
-
-def build_treatment_extra(page_url: str):
-    return {
-        "CompanyId": "2",
-        "PurchaseOrderId": "0",
-        "SentTo_PRT_ByUserId": "0",
-        "State": "0",
-        "KeySearch": "",
-        "ByTab": "true",
-        "path": urlparse(page_url).path,
-    }
-
-
-def build_treatment_payload(draw, start, length, page_url):
-    payload = {
-        "draw": str(draw),
-        "start": str(start),
-        "length": str(length),
-        "search[value]": "",
-        "search[regex]": "false",
-        **build_treatment_extra(page_url)
-    }
-
-    for i, col in enumerate(TREATMENT_COLUMNS):
-        payload[f"columns[{i}][data]"] = col
-        payload[f"columns[{i}][name]"] = ""
-        payload[f"columns[{i}][searchable]"] = "true"
-        payload[f"columns[{i}][orderable]"] = "true"
-        payload[f"columns[{i}][search][value]"] = ""
-        payload[f"columns[{i}][search][regex]"] = "false"
-
-    payload["order[0][column]"] = str(TREATMENT_COLUMNS.index("Sent_PRT_Date"))
-    payload["order[0][dir]"] = "desc"
-
-    return payload
-
-
-# -------- PURCHASE ORDER --------
-PURCHASEORDER_COLUMNS = [
-    "Row", "CFC", "Code", "PartnerName", "SeasonCode",
-    "DropCodes", "WorkTypeName", "JobNumber", "ReceiveDate",
-    "StateName", "TotalOrderQty", "TotalSKU", "MerStatusName",
-    "AssignUserName", "PersonInChargeUserName", "RejectedReason",
-    "RejectedUserName", "RejectedDate", "ApprovedDate",
-    "ApprovedUserName", "CreatedDate", "CreatedByUserName",
-    "UpdatedDate", "UpdatedByUserName", "24", "25"
-]
-
-
-def build_purchaseorder_payload(draw, start, length, page_url, session_id):
-    payload = {
-        "draw": draw,
-        "start": start,
-        "length": length,
-        "search[value]": "",
-        "search[regex]": False,
-
-        # ===== CONTEXT =====
-        "sessionId": session_id or "",
-        "CompanyId": 2,
-        "path": urlparse(page_url).path,
-
-        # ===== FILTERS (STRICT TYPE) =====
-        "StateFromFilter": 0,
-        "SeasonId": 0,
-        "PartnerId": 0,
-        "WorkType": 0,
-        "KeySearch": "",
-    }
-
-    for i, col in enumerate(PURCHASEORDER_COLUMNS):
-        payload[f"columns[{i}][data]"] = col
-        payload[f"columns[{i}][name]"] = ""
-        payload[f"columns[{i}][searchable]"] = True
-        payload[f"columns[{i}][orderable]"] = True
-        payload[f"columns[{i}][search][value]"] = ""
-        payload[f"columns[{i}][search][regex]"] = False
-
-    payload["order[0][column]"] = 20
-    payload["order[0][dir]"] = "desc"
-
-    return payload
-
-
 # ==================== MERCH CONFIG ====================
 
+# "spec": request shape in endpoint_spec.ENDPOINT_SPECS (default: empty POST)
 MERCH_CONFIG = [ 
     # ------- FABRIC + TRIM ------- 
     {   "name": "fabric_development",
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/",
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormFabricDevelopments.ManageFabricDevelopmentsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     {   
         "name": "fabric_swatch", 
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormFabricSwatchs.ManageFabricSwatchsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "fabric_labdip", 
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormFabricLabDips.ManageFabricLabDipOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "trim_development", 
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.Trims.FormTrimDevelop.ManageTrimDevelopOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "trim_swatch", 
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.Trims.FormTrimSwatch.ManageTrimSwatchOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "trim_labdip", 
         "group": "FABRIC_TRIM", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.Trims.FormTrimLabDip.ManageTrimLabDipOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     # ------- TREATMENT ------- 
     { 
@@ -200,28 +211,36 @@ MERCH_CONFIG = [
         "group": "TREATMENT", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormTreatments.ManagePrintingsOfMer&_m=LoadData", 
-        "payload_type": "TREATMENT",
+        "spec": "TREATMENT",
+        "primary_key": "RequestCode",
+        "watermark_column": "UpdatedDate",
     }, 
     { 
         "name": "treatment_emb", 
         "group": "TREATMENT", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormTreatments.ManageEMBsOfMer&_m=LoadData", 
-        "payload_type": "TREATMENT",
+        "spec": "TREATMENT",
+        "primary_key": "RequestCode",
+        "watermark_column": "UpdatedDate",
     }, 
     { 
         "name": "treatment_dyewash", 
         "group": "TREATMENT", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormTreatments.ManageDyewashsOfMer&_m=LoadData", 
-        "payload_type": "TREATMENT",
+        "spec": "TREATMENT",
+        "primary_key": "RequestCode",
+        "watermark_column": "UpdatedDate",
     }, 
     { 
         "name": "treatment_print_outsource", 
         "group": "TREATMENT", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormTreatments.ManagePrintOutsourcesOfMer&_m=LoadData", 
-        "payload_type": "TREATMENT",
+        "spec": "TREATMENT",
+        "primary_key": "RequestCode",
+        "watermark_column": "UpdatedDate",
     }, 
     # ------- TECHNICAL ------- 
     { 
@@ -229,24 +248,28 @@ MERCH_CONFIG = [
         "group": "TECHNICAL", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormFabricTechnicals.ManageFabricTechnicalsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "tech_trim", 
         "group": "TECHNICAL", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormTrimTechnicals.ManageTrimTechnicalsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "tech_cmp", 
         "group": "TECHNICAL", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormCMPs.ManageCMPsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     { 
         "name": "tech_pom", 
         "group": "TECHNICAL", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormPOMs.ManagePOMsOfMer&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     # ------- COSTING ------- 
     { 
@@ -254,6 +277,7 @@ MERCH_CONFIG = [
         "group": "COSTING", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.Costings.FormCostingSheet.ManageCostingSheetClient&_m=LoadData", 
+        "primary_key": "RequestCode",
     }, 
     # ------- CUTTINGDOCKET ------- 
     { 
@@ -261,6 +285,7 @@ MERCH_CONFIG = [
         "group": "CUTTINGDOCKET", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.CuttingDockets.FormCuttingDockets.ManageCuttingDockets&_m=LoadData", 
+        "primary_key": "Code",
     },
     # ------- RAW DATA ------- 
     { 
@@ -268,13 +293,16 @@ MERCH_CONFIG = [
         "group": "RAW_DATA", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormPurchaseOrder.ManageListStyleOfOrder&_m=LoadData", 
+        "primary_key": ["PoCode", "StyleNoInternal", "SkuNo", "ColorName"],
     }, 
     { 
         "name": "purchaseorder", 
         "group": "RAW_DATA", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.PO.FormPurchaseOrder.ManagePurchaseOrder&_m=LoadData", 
-        "payload_type": "PURCHASEORDER",
+        "spec": "PURCHASEORDER",
+        "primary_key": "Code",
+        "watermark_column": "UpdatedDate",
     }, 
     #-------- FABRIC PLANNING --------
     {
@@ -282,7 +310,8 @@ MERCH_CONFIG = [
         "group": "RAW_DATA",
         "page_url": "https://example-erp/",
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.IPO.For.ForPlanning.MasterGroupFabricPOTabsOfPlanning_MasterGroupPOItems&_m=LoadData",
-        "bulk_po": True,
+        "spec": "BULK_PO",
+        "primary_key": "IPOFabricMasterCode",
     },
     #-------- TRIM PLANNING --------
     {
@@ -290,7 +319,7 @@ MERCH_CONFIG = [
         "group": "RAW_DATA",
         "page_url": "https://example-erp/",
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.IPO.For.ForPlanning.TrimInspectionReportTabsOfPlanning_Items&_m=LoadData",
-        "bulk_po": True,
+        "spec": "BULK_PO",
     },
     # ------- PRODUCTION PLANNING -------
     { 
@@ -298,7 +327,8 @@ MERCH_CONFIG = [
         "group": "RAW_DATA", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.IPO.For.ForPlanning.StyleProductOfPlanning&_m=LoadData", 
-        "bulk_po": True,
+        "spec": "BULK_PO",
+        "primary_key": "PoCode",
     }, 
     # ------- PO LIST -------     
     {
@@ -306,14 +336,14 @@ MERCH_CONFIG = [
         "group": "PO_LIST", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.TrimPO.IPO.ForPur.TrimPOTabsOfPur_POItems&_m=LoadData", 
-        "bulk_po": True,
+        "spec": "BULK_PO",
     },
     { 
         "name": "fabricpotabsofpurpoitems", 
         "group": "PO_LIST", 
         "page_url": "https://example-erp/", 
         "json_url": "https://example-erp/?_n=Core.Sites.Apps&_o=Web.Projects.ERP.IPO.For.ForPur.FabricPOTabsOfPur_POItems&_m=LoadData", 
-        "bulk_po": True,
+        "spec": "BULK_PO",
     },     
 ]
 
@@ -341,158 +371,938 @@ def build_requests_session_from_cookies(cookies):
     return s
 
 
-def fetch_datatables_all(session, json_url, payload_builder, page_url, page_size=2000):
-    all_rows = []
-    start = 0
+class InvalidResponse(ValueError):
+    """ERP answer whose body is not the expected JSON (the response is kept)."""
+
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+
+def decode_json(resp):
+    """response_json(resp); a body that does not decode raises InvalidResponse."""
+    try:
+        return response_json(resp)
+    except ValueError as e:
+        raise InvalidResponse(f"Invalid JSON from {resp.url}: {e}", resp) from e
+
+
+def requires_browser(error) -> bool:
+    """
+    True when a failed cookie-only fetch is a definitive rejection: 401/403,
+    or a non-JSON answer that is the login page (redirected, or an HTML body).
+    Connection errors, timeouts, 5xx after the retries and truncated JSON
+    are transient and say nothing about the endpoint.
+    """
+    resp = getattr(error, "response", None)
+    if resp is None:
+        return False
+    if resp.status_code in BROWSER_REQUIRED_STATUS:
+        return True
+    if not isinstance(error, InvalidResponse):
+        return False
+    return bool(resp.history) or "html" in resp.headers.get("Content-Type", "").lower()
+
+
+def erp_post(session, url, **kwargs):
+    """
+    POST through the per-host slot and the adaptive rate limiter.
+    Timeouts, connection errors, 429 and 5xx are retried with jittered
+    exponential backoff (MAX_RETRIES); other HTTP errors raise at once.
+    Attempts, latency, throttling and backoff go to the endpoint's metrics.
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    limiter = RATE_LIMITER.for_url(url)
+    metrics = current_metrics()
+
+    for attempt in range(MAX_RETRIES + 1):
+        waited = limiter.acquire()
+        t0 = time.monotonic()
+        try:
+            with host_slot(url):
+                resp = session.post(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            limiter.record_error()
+            if metrics is not None:
+                metrics.record_throttle(waited)
+                metrics.record_request(time.monotonic() - t0, ok=False)
+            if attempt == MAX_RETRIES:
+                raise
+            delay = retry_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+            print(f"      [RETRY {attempt + 1}/{MAX_RETRIES}] {type(e).__name__}, sleep {delay:.1f}s")
+        else:
+            latency = time.monotonic() - t0
+            ok = resp.status_code not in RETRYABLE_STATUS
+            if metrics is not None:
+                metrics.record_throttle(waited)
+                metrics.record_request(latency, ok=ok and resp.ok)
+            if ok:
+                limiter.record_success(latency)
+                resp.raise_for_status()
+                return resp
+
+            limiter.record_error()
+            if attempt == MAX_RETRIES:
+                resp.raise_for_status()
+            delay = retry_delay(
+                attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+                resp.headers.get("Retry-After"),
+            )
+            resp.close()
+            print(f"      [RETRY {attempt + 1}/{MAX_RETRIES}] HTTP {resp.status_code}, sleep {delay:.1f}s")
+
+        limiter.record_retry()
+        if metrics is not None:
+            metrics.record_retry(delay)
+        time.sleep(delay)
+
+
+def stream_json_rows(resp, on_page, batch_size=BULK_BATCH_ROWS):
+    """
+    Parse a `stream=True` response incrementally and forward the rows of its
+    `data` / `Data.objects` array to `on_page` in batches of `batch_size`.
+    Memory stays at one batch regardless of the response size.
+    Falls back to decoding the whole body when ijson is not installed.
+
+    Decode time in the metrics is the parse loop minus `on_page`, so for a
+    streamed body it includes reading the body off the socket.
+    """
+    metrics = current_metrics()
+    if ijson is None:
+        t0 = time.perf_counter()
+        js = decode_json(resp)
+        if metrics is not None:
+            metrics.record_decode(time.perf_counter() - t0)
+            metrics.record_bytes(len(resp.content))
+        rows = js.get("data") or js.get("Data", {}).get("objects", [])
+        on_page(rows)
+        return len(rows)
+
+    resp.raw.decode_content = True   # let urllib3 undo gzip/deflate
+    batch = []
+    count = 0
+    builder = None
+    row_prefix = end_event = None
+    t0 = time.perf_counter()
+    in_callback = 0.0
+
+    def emit(rows):
+        nonlocal in_callback
+        t = time.perf_counter()
+        on_page(rows)
+        in_callback += time.perf_counter() - t
+
+    try:
+        for prefix, event, value in ijson.parse(resp.raw, use_float=True):
+            if builder is None:
+                if prefix not in ROW_ARRAY_PREFIXES:
+                    continue
+                if event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    row_prefix = prefix
+                    end_event = "end_map" if event == "start_map" else "end_array"
+                    continue
+                row = value   # scalar item
+            else:
+                builder.event(event, value)
+                if not (prefix == row_prefix and event == end_event):
+                    continue
+                row = builder.value
+                builder = None
+
+            batch.append(row)
+            if len(batch) >= batch_size:
+                emit(batch)
+                count += len(batch)
+                batch = []
+    except ijson.JSONError as e:
+        raise InvalidResponse(f"Invalid JSON from {resp.url}: {e}", resp) from e
+    finally:
+        if metrics is not None:
+            metrics.record_decode(time.perf_counter() - t0 - in_callback)
+            metrics.record_bytes(resp.raw.tell())   # bytes over the wire
+        resp.close()
+
+    on_page(batch)
+    return count + len(batch)
+
+
+def fetch_datatables_page(session, json_url, endpoint, draw, start, page_size):
+    resp = erp_post(session, json_url, **endpoint.request_kwargs(draw, start, page_size))
+
+    t0 = time.perf_counter()
+    js = decode_json(resp)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_decode(time.perf_counter() - t0)
+        metrics.record_bytes(len(resp.content))
+    rows = js.get("data") or js.get("Data", {}).get("objects", [])
+    return rows, js.get("recordsTotal", 0)
+
+
+def fetch_datatables_all(session, json_url, endpoint, on_page,
+                         page_size=PAGE_SIZE, concurrency=1, start_offset=0):
+    """
+    Stream every page to `on_page(rows)` in order, beginning at `start_offset`
+    (resume). Returns the number of rows fetched by this call.
+    """
+    if concurrency > 1:
+        return fetch_datatables_parallel(
+            session, json_url, endpoint, on_page,
+            page_size, concurrency, start_offset,
+        )
+
+    fetched = 0
+    start = start_offset
     draw = 1
 
     while True:
-        payload = payload_builder(draw, start, page_size, page_url)
-        resp = session.post(json_url, data=payload)
-        resp.raise_for_status()
-
-        js = resp.json()
-        rows = js.get("data") or js.get("Data", {}).get("objects", [])
+        rows, records_total = fetch_datatables_page(
+            session, json_url, endpoint, draw, start, page_size
+        )
 
         if not rows:
             break
 
-        all_rows.extend(rows)
+        on_page(rows)
+        fetched += len(rows)
 
-        records_total = js.get("recordsTotal", 0)
         start += page_size
         draw += 1
 
-        print(f"      fetched {len(all_rows)} / {records_total}")
+        print(f"      fetched {start_offset + fetched} / {records_total}")
 
         if start >= records_total:
             break
 
-        time.sleep(0.5)
+    return fetched
+
+
+def fetch_datatables_parallel(session, json_url, endpoint, on_page,
+                              page_size=PAGE_SIZE, concurrency=PAGE_CONCURRENCY,
+                              start_offset=0):
+    """
+    First page is fetched alone to learn recordsTotal, remaining `start`
+    offsets are fetched with at most `concurrency` requests in flight.
+    Pages are handed to `on_page` strictly by offset (out-of-order pages
+    wait in a small buffer), so row order matches the sequential mode.
+    Progress is printed once per page, as it is handed over. The first
+    failed page cancels the pages not yet started and is re-raised.
+    """
+    first_rows, records_total = fetch_datatables_page(
+        session, json_url, endpoint, 1, start_offset, page_size
+    )
+    if not first_rows:
+        return 0
+
+    on_page(first_rows)
+    fetched = len(first_rows)
+    print(f"      fetched {start_offset + fetched} / {records_total}")
+
+    pending = {}
+    next_start = start_offset + page_size
+    offsets = range(next_start, records_total, page_size)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # copy_context: page requests count towards this endpoint's metrics
+        futures = {
+            pool.submit(
+                copy_context().run, fetch_datatables_page,
+                session, json_url, endpoint,
+                draw, start, page_size,
+            ): start
+            for draw, start in enumerate(offsets, start=2)
+        }
+        try:
+            for fut in as_completed(futures):
+                rows, _ = fut.result()
+                pending[futures[fut]] = rows
+                while next_start in pending:
+                    page_rows = pending.pop(next_start)
+                    on_page(page_rows)
+                    fetched += len(page_rows)
+                    next_start += page_size
+                    print(f"      fetched {start_offset + fetched} / {records_total}")
+        except BaseException:
+            # Drop queued pages; only requests already in flight are awaited
+            for fut in futures:
+                fut.cancel()
+            raise
+
+    if start_offset + fetched != records_total:
+        raise RuntimeError(
+            f"Row count mismatch for {json_url}: "
+            f"got {start_offset + fetched}, recordsTotal={records_total}"
+        )
 
-    return all_rows
+    return fetched
 
 
 # ==================== MAIN FLOW ====================
 
-def run_crawl(page, session):
-    print(f"RUN_DATE = {RUN_DATE}")
+def block_static_assets(context):
+    """Abort images/fonts/stylesheets so pages reach networkidle faster."""
+    def _handle(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
 
-    for cfg in MERCH_CONFIG:
-        print(f"\n=== PAGE [{cfg['group']}] {cfg['name']} ===")
-        page.goto(cfg["page_url"], wait_until="networkidle")
-        time.sleep(1)
+    context.route("**/*", _handle)
 
-        # Click search button ERP init session/filter
-        try:
-            page.wait_for_selector(SEARCH_BUTTON_SELECTOR, timeout=10000)
+
+def is_load_data_response(cfg):
+    """Predicate matching the LoadData XHR of this endpoint (same `_o` handler)."""
+    target = parse_qs(urlparse(cfg["json_url"]).query).get("_o")
+
+    def _match(response):
+        qs = parse_qs(urlparse(response.url).query)
+        if qs.get("_m") != ["LoadData"]:
+            return False
+        return target is None or qs.get("_o") == target
+
+    return _match
+
+
+def prepare_page(page, cfg):
+    """
+    Browser part of an endpoint: open the page and click search so the ERP
+    initialises its session/filter. Returns the PURCHASEORDER sessionId
+    (None for other endpoints). Must run on the Playwright thread.
+
+    Readiness is event-driven: wait for the search button to be visible,
+    then for the endpoint's own LoadData response triggered by the click.
+    """
+    page.goto(cfg["page_url"], wait_until="networkidle")
+
+    # Click search button ERP init session/filter
+    try:
+        page.wait_for_selector(
+            SEARCH_BUTTON_SELECTOR, state="visible", timeout=READY_TIMEOUT_MS
+        )
+        with page.expect_response(is_load_data_response(cfg), timeout=READY_TIMEOUT_MS):
             page.click(SEARCH_BUTTON_SELECTOR)
-            print("  SEARCH clicked")
-        except Exception as e:
-            print("  SEARCH not found or click failed:", e)
-
-        page.wait_for_timeout(2000)
-
-        rows_all = []
-        payload_type = cfg.get("payload_type")
-
-        # ---- BULK PO ----
-        if cfg.get("bulk_po"):
-            payload = {
-                "CompanyId": "2",
-                "KeySearch": "",
-                "IsWorkTypeBulk": "true",
-                "ByTab": "true",
-                "path": urlparse(cfg["page_url"]).path
-            }
-            resp = session.post(cfg["json_url"], data=payload)
-            resp.raise_for_status()
-            js = resp.json()
-            rows_all = js.get("data") or js.get("Data", {}).get("objects", [])
-
-        # ---- TREATMENT ----
-        elif payload_type == "TREATMENT":
-            print("Fetching JSON (TREATMENT + pagination)")
-            rows_all = fetch_datatables_all(
-                session,
-                cfg["json_url"],
-                build_treatment_payload,
-                cfg["page_url"]
-            )
+        print("  SEARCH clicked, LoadData received")
+    except Exception as e:
+        print("  SEARCH not found or LoadData not observed:", e)
+
+    if not endpoint_spec(cfg).get("session_id"):
+        return None
+
+    session_id_js = """
+        () => {
+            const input = document.querySelector('input[name="sessionId"]');
+            if (input && input.value) return input.value;
+            if (window._sessionId) return window._sessionId;
+            return '';
+        }
+    """
+    try:
+        page.wait_for_function(session_id_js, timeout=READY_TIMEOUT_MS)
+    except Exception as e:
+        print("   sessionId not ready:", e)
+
+    session_id = page.evaluate(session_id_js)
+    print("   sessionId =", session_id)
+    return session_id
+
+
+def fetch_datatables_since(session, json_url, endpoint, on_page, since, column,
+                           page_size=PAGE_SIZE):
+    """
+    Incremental pagination. The payload must sort by `column` desc; paging
+    stops at the first page whose rows are all older than `since`.
+    Rows with an unparseable `column` value are always kept.
+    """
+    changed = 0
+    start = 0
+    draw = 1
 
-        # ---- PURCHASE ORDER ----
-        elif payload_type == "PURCHASEORDER":
-            print("Fetching JSON (PURCHASEORDER FULL)")
-            page.wait_for_timeout(2000)
-
-            session_id = page.evaluate("""
-                () => {
-                    const input = document.querySelector('input[name="sessionId"]');
-                    if (input && input.value) return input.value;
-                    if (window._sessionId) return window._sessionId;
-                    return '';
-                }
-            """)
-            print("   sessionId =", session_id)
-
-            rows_all = fetch_datatables_all(
-                session,
-                cfg["json_url"],
-                lambda d, s, l, p: build_purchaseorder_payload(
-                    d, s, l, p, session_id
-                ),
-                cfg["page_url"]
-            )
+    while True:
+        rows, records_total = fetch_datatables_page(
+            session, json_url, endpoint, draw, start, page_size
+        )
+        if not rows:
+            break
 
-        # ---- DEFAULT ----
-        else:
-            resp = session.post(cfg["json_url"])
-            resp.raise_for_status()
-            js = resp.json()
-            rows_all = js.get("data") or js.get("Data", {}).get("objects", [])
+        fresh = []
+        for r in rows:
+            d = parse_erp_datetime(r.get(column))
+            if d is None or d >= since:
+                fresh.append(r)
+        on_page(fresh)
+        changed += len(fresh)
+
+        print(f"      scanned {start + len(rows)} / {records_total}, "
+              f"{changed} changed since {since:%Y-%m-%d %H:%M:%S}")
+
+        if not fresh:
+            break
 
-        print(f"   received {len(rows_all)} rows")
+        start += page_size
+        draw += 1
+        if start >= records_total:
+            break
 
+    return changed
+
+
+def is_paginated(cfg):
+    return endpoint_spec(cfg)["pagination"] == "datatables"
+
+
+def endpoint_column_filter(cfg):
+    """Registry columns of the endpoint's snapshot + its keys (None = keep all)."""
+    keys = cfg.get("primary_key") or []
+    if isinstance(keys, str):
+        keys = [keys]
+    key = snapshot_key(cfg["group"], get_snapshot_path(cfg))
+    return snapshot_filter(key, [*keys, cfg.get("watermark_column")])
+
+
+def fetch_endpoint(cfg, session, on_page, session_id=None, since=None, start_offset=0,
+                   column_filter=None):
+    """
+    HTTP part of an endpoint. Thread-safe, runs inside the crawl scheduler.
+    Rows are streamed to `on_page(rows)`; returns the number of rows.
+    With `since`, paginated endpoints only yield rows changed after it.
+    `start_offset` resumes a full paginated fetch.
+    `column_filter` limits the DataTables columns[] requested.
+    """
+    # Compiled once per crawl: a page only adds draw/start/length
+    endpoint = compile_endpoint(
+        cfg, session_id, cfg.get("watermark_column") if since else None, column_filter
+    )
+
+    # ---- Single response (BULK_PO / DEFAULT) ----
+    if not endpoint.paginated:
+        resp = erp_post(session, cfg["json_url"], stream=True, **endpoint.request_kwargs())
+        return stream_json_rows(resp, on_page)
+
+    # ---- DataTables pagination (TREATMENT / PURCHASEORDER) ----
+    print(f"[{cfg['name']}] Fetching JSON ({endpoint.spec_name} + pagination)")
+    if since:
+        return fetch_datatables_since(
+            session, cfg["json_url"], endpoint, on_page, since, cfg["watermark_column"],
+        )
+    return fetch_datatables_all(
+        session,
+        cfg["json_url"],
+        endpoint,
+        on_page,
+        concurrency=PAGE_CONCURRENCY,
+        start_offset=start_offset,
+    )
+
+
+def get_snapshot_path(cfg):
+    json_root = GROUP_DIRS[cfg["group"]]["json_root"]
+    base_name = get_base_name_from_url(cfg["json_url"]).lower()
+    return os.path.join(json_root, f"{base_name}.json")
+
+
+def get_previous_snapshot_path(cfg):
+    return os.path.join(CDC_PREVIOUS_DIR, cfg["group"], os.path.basename(get_snapshot_path(cfg)))
+
+
+def get_change_set_path(cfg):
+    base_name = os.path.splitext(os.path.basename(get_snapshot_path(cfg)))[0]
+    return os.path.join(CDC_DIR, RUN_DATE, cfg["group"], f"{base_name}_{RUN_TIME}.parquet")
+
+
+def capture_endpoint_changes(cfg):
+    """Write today's insert/update/delete change set for one endpoint."""
+    counts = capture_changes(
+        get_previous_snapshot_path(cfg),
+        get_snapshot_path(cfg),
+        get_change_set_path(cfg),
+        cfg.get("primary_key"),
+    )
+    if counts is None:
+        print(f"[{cfg['name']}] CDC: no previous snapshot (full load)")
+    else:
+        print(f"[{cfg['name']}] CDC: {counts['I']} inserted, {counts['U']} updated, "
+              f"{counts['D']} deleted")
+    return counts
+
+
+def crawl_endpoint(cfg, session, session_id=None, probe=None, watermarks=None, checkpoint=None,
+                   manifest=None, full_fidelity=False):
+    """
+    Fetch one endpoint and stream it into its NDJSON snapshot (atomic: the
+    previous snapshot is kept if anything fails).
+
+    With `probe` (a CapabilityCache) the fetch is attempted WITHOUT a prior
+    page visit. A failed or empty fetch returns None so the caller can retry
+    through the Playwright page; only a definitive rejection (401/403, login
+    page, see requires_browser) is recorded as "needs browser". Transient
+    failures and empty results leave the cache as it is, so the endpoint is
+    probed again next run.
+
+    With `watermarks` (incremental mode) endpoints that declare a
+    `watermark_column` only fetch rows changed since the stored mark; the
+    untouched rows of the previous snapshot are streamed in after them
+    (deduplicated by `primary_key`).
+
+    With `checkpoint` every committed page of a full paginated fetch is made
+    durable and recorded; an endpoint left "in_progress" by a failed run
+    continues from its last committed `start` offset.
+
+    With `manifest` the committed snapshot's content hash is recorded so
+    downstream steps can skip it when unchanged. Changed snapshots get a
+    CDC change set (CDC_ENABLED) against the snapshot they replaced, and
+    every snapshot is archived in the dated history (HISTORY_ENABLED).
+
+    Unless `full_fidelity`, only the columns the transformation modules use
+    (config/column_registry.py) plus keys are requested and stored.
+    """
+    name = cfg["name"]
+    json_path = get_snapshot_path(cfg)
+    incremental = watermarks is not None and bool(cfg.get("watermark_column"))
+    since = watermarks.get(name) if incremental else None
+    if since and not os.path.exists(json_path):
+        since = None
+
+    new_keys = set()
+    max_mark = [None]
+    column_filter = None if full_fidelity else endpoint_column_filter(cfg)
+
+    # Only full paginated fetches are checkpointed page by page
+    page_checkpoints = checkpoint is not None and is_paginated(cfg) and since is None
+    resume = checkpoint.get(name) if page_checkpoints else {}
+    if resume.get("status") != "in_progress":
+        resume = {}
+
+    sink = SnapshotWriter(
+        json_path,
+        keep_partial=page_checkpoints,
+        resume_bytes=resume.get("part_bytes", 0),
+        resume_rows=resume.get("rows", 0),
+        previous_path=get_previous_snapshot_path(cfg) if CDC_ENABLED else None,
+    )
+
+    start_offset = 0
+    if sink.resumed:
+        start_offset = resume["next_start"]
+        print(f"[{name}] resuming at start={start_offset} ({sink.rows_written} rows committed)")
+    elif checkpoint is not None:
+        checkpoint.start(name, json_path)
+
+    with sink:
+
+        def write(rows):
+            if column_filter is not None:
+                rows = column_filter.prune(rows)
+            sink.write_rows(rows)
+            if incremental:
+                page_max = max_datetime(rows, cfg["watermark_column"])
+                if page_max is not None and (max_mark[0] is None or page_max > max_mark[0]):
+                    max_mark[0] = page_max
+
+        def on_page(rows):
+            if since is not None:
+                new_keys.update(r.get(cfg["primary_key"]) for r in rows)
+            write(rows)
+            if page_checkpoints and rows:
+                sink.flush()
+                checkpoint.page_committed(
+                    name, sink.rows_written, sink.rows_written, sink.bytes_written
+                )
+
+        if probe is None:
+            fetched = fetch_endpoint(
+                cfg, session, on_page, session_id, since, start_offset, column_filter
+            )
+        else:
+            try:
+                fetched = fetch_endpoint(
+                    cfg, session, on_page, session_id, since, start_offset, column_filter
+                )
+            except (requests.RequestException, ValueError) as e:
+                fetched, reason = None, e
+            else:
+                reason = "empty response"
+
+            # An empty delta is a valid incremental answer
+            if fetched is None or (fetched == 0 and since is None):
+                if fetched is None and requires_browser(reason):
+                    print(f"[{cfg['name']}] cookie-only fetch rejected ({reason}), needs browser")
+                    probe.record(cfg["name"], http_only=False)
+                else:
+                    print(f"[{cfg['name']}] cookie-only fetch inconclusive ({reason}), "
+                          f"browser for this run, not cached")
+                sink.abort()
+                return None
+            probe.record(cfg["name"], http_only=True)
+
+        if since is not None:
+            print(f"[{cfg['name']}] {fetched} rows changed since watermark")
+            new_keys.discard(None)
+            key = cfg["primary_key"]
+            batch = []
+            for r in iter_snapshot_rows(json_path):
+                if r.get(key) in new_keys:
+                    continue
+                batch.append(r)
+                if len(batch) >= PAGE_SIZE:
+                    write(batch)
+                    batch = []
+            write(batch)
+
+    print(f"[{name}] received {sink.rows_written} rows")
+    print(f"[{name}] JSON saved: {json_path}")
+
+    changed = True
+    if manifest is not None:
+        changed = manifest.record(
+            snapshot_key(cfg["group"], json_path), name, json_path,
+            sink.sha256, sink.rows_written, sink.bytes_written,
+        )
+        manifest.save()
+        print(f"[{name}] content {'changed' if changed else 'unchanged'} (sha256 {sink.sha256[:12]})")
+    if CDC_ENABLED and changed:
+        capture_endpoint_changes(cfg)
+    if HISTORY_ENABLED:
+        archive_snapshot(BASE_DIR, json_path, cfg["group"], RUN_DATE)
+
+    if checkpoint is not None:
+        checkpoint.mark_done(name, sink.rows_written)
+    if incremental:
+        watermarks.update(name, max_mark[0])
+    return sink.rows_written
+
+
+def save_rate_stats():
+    """Print + persist per-host throttling stats to tune concurrency vs ERP capacity."""
+    stats = RATE_LIMITER.stats()
+    print("\n===== RATE LIMITER =====")
+    for host, st in stats.items():
+        print(f"{host}: {st}")
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(RATE_STATS_PATH, "w", encoding="utf-8") as f:
+        json.dump({"run_date": RUN_DATE, "hosts": stats}, f, indent=2)
+
+
+def probe_endpoint_size(cfg, session, session_id=None, full_fidelity=False):
+    """
+    length=1 request -> (recordsTotal, bytes of one snapshot row).
+    Only paginated endpoints honour length; others return None.
+    The row is requested and pruned as the crawl will write it: registry
+    columns only, unless `full_fidelity`.
+    """
+    if not is_paginated(cfg):
+        return None
+    if endpoint_spec(cfg).get("session_id") and not session_id:
+        return None
+    column_filter = None if full_fidelity else endpoint_column_filter(cfg)
+    rows, records_total = fetch_datatables_page(
+        session, cfg["json_url"], compile_endpoint(cfg, session_id, column_filter=column_filter),
+        draw=1, start=0, page_size=1,
+    )
+    if not rows:
+        return None
+    if column_filter is not None:
+        rows = column_filter.prune(rows)
+    return records_total, len(canonical_json(rows[0]).encode("utf-8")) + 1
+
+
+def crawl_and_record(stats, cfg, session, **kwargs):
+    """
+    crawl_endpoint + record rows / snapshot bytes / seconds for the planner;
+    requests made meanwhile count towards the endpoint's METRICS.
+    """
+    with METRICS.endpoint(cfg["name"]) as metrics:
+        t0 = time.perf_counter()
+        try:
+            rows = crawl_endpoint(cfg, session, **kwargs)
+        except BaseException:
+            metrics.record_result("failed", time.perf_counter() - t0)
+            raise
+        seconds = time.perf_counter() - t0
+
+        if rows is None:
+            metrics.record_result("needs_browser", seconds)
+            return None
+        snapshot_bytes = os.path.getsize(get_snapshot_path(cfg))
+        metrics.record_result("ok", seconds, rows, snapshot_bytes)
+        stats.record(cfg["name"], rows, snapshot_bytes, seconds, RUN_DATE)
+    return rows
+
+
+def open_endpoint_page(browser, cfg):
+    """prepare_page with its navigation time (incl. a browser launch) in METRICS."""
+    with METRICS.endpoint(cfg["name"]) as metrics:
+        t0 = time.perf_counter()
+        try:
+            return prepare_page(browser.get_page(), cfg)
+        finally:
+            metrics.record_browser(time.perf_counter() - t0)
+
+
+def save_crawl_metrics(status="ok"):
+    """Write the run report (JSON) and the Prometheus textfile."""
+    report = METRICS.report(RUN_DATE, RUN_TIME, status)
+    print_metrics(report)
+    write_json_report(report, METRICS_REPORT_PATH)
+    write_prometheus(report, METRICS_TEXTFILE)
+    print(f"Metrics saved: {METRICS_REPORT_PATH}, {METRICS_TEXTFILE}")
+
+
+def plan_endpoints(configs, stats, session, session_id=None, probe_all=False,
+                   full_fidelity=False):
+    """
+    Size endpoints: length=1 probe (all with `probe_all`, otherwise only
+    those without last-run stats), then sort largest-first.
+    """
+    def probe(cfg):
+        if not probe_all and stats.get(cfg["name"]):
+            return None
+        with METRICS.endpoint(cfg["name"]):
+            return probe_endpoint_size(cfg, session, session_id, full_fidelity)
+
+    return plan_crawl(configs, stats, probe)
+
+
+def requires_page(cfg, capabilities, session_id=None):
+    # PURCHASEORDER needs the page only when no sessionId is known yet
+    if endpoint_spec(cfg).get("session_id"):
+        return not session_id
+    return capabilities.needs_browser(cfg["name"])
+
+
+def run_crawl(browser, session, session_id=None, incremental=False, resume=False,
+              full_fidelity=False):
+    """Crawl every endpoint; the metrics report is written even if a crawl fails."""
+    status = "failed"
+    try:
+        _run_crawl(browser, session, session_id, incremental, resume, full_fidelity)
+        status = "ok"
+    finally:
+        save_crawl_metrics(status)
+
+
+def _run_crawl(browser, session, session_id, incremental, resume, full_fidelity):
+    print(f"RUN_DATE = {RUN_DATE}")
 
-    # ================= SAVE JSON (OVERWRITE MODE, NO DATE) =================
-        json_root = GROUP_DIRS[cfg["group"]]["json_root"]
-        os.makedirs(json_root, exist_ok=True)
+    watermarks = WatermarkStore(WATERMARK_PATH) if incremental else None
+    checkpoint = CrawlCheckpoint(CHECKPOINT_PATH, RUN_DATE, resume=resume)
+    manifest   = RunManifest(MANIFEST_PATH, RUN_DATE)
 
-        base_name = get_base_name_from_url(cfg["json_url"]).lower()
-        json_path = os.path.join(json_root, f"{base_name}.json")
+    configs = []
+    for cfg in MERCH_CONFIG:
+        if resume and checkpoint.is_done(cfg["name"]):
+            print(f"[SKIP] {cfg['name']} already done (checkpoint)")
+            continue
+        configs.append(cfg)
+
+    # Largest endpoints first so the long ones do not start last
+    stats = CrawlStats(CRAWL_STATS_PATH)
+    estimates = plan_endpoints(configs, stats, session, session_id, full_fidelity=full_fidelity)
+    print_plan(estimates, CRAWL_WORKERS)
+    configs = order_largest_first(configs, estimates)
+
+    capabilities = CapabilityCache(CAPABILITY_CACHE_PATH, CAPABILITY_TTL_DAYS)
+    browser_cfgs = [cfg for cfg in configs if requires_page(cfg, capabilities, session_id)]
+    http_cfgs    = [cfg for cfg in configs if not requires_page(cfg, capabilities, session_id)]
+
+    common = {
+        "watermarks": watermarks,
+        "checkpoint": checkpoint,
+        "manifest": manifest,
+        "full_fidelity": full_fidelity,
+    }
 
+    # Browser steps stay serialized on the Playwright page (main thread);
+    # the HTTP fetch + save of each endpoint runs in the worker pool.
+    # The browser itself is only launched if some endpoint needs it.
+    with CrawlScheduler(CRAWL_WORKERS, CRAWL_PER_HOST) as scheduler:
+        # Cookie-only endpoints go straight to HTTP (this doubles as the probe)
+        for cfg in http_cfgs:
+            print(f"\n=== HTTP [{cfg['group']}] {cfg['name']} ===")
+            scheduler.submit(
+                cfg["name"], crawl_and_record, stats, cfg, session,
+                session_id=session_id, probe=capabilities, **common,
+            )
 
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(rows_all, f, ensure_ascii=False, indent=2)
+        for cfg in browser_cfgs:
+            print(f"\n=== PAGE [{cfg['group']}] {cfg['name']} ===")
+            page_session_id = open_endpoint_page(browser, cfg)
+            scheduler.submit(
+                cfg["name"], crawl_and_record, stats, cfg, session,
+                session_id=page_session_id, **common,
+            )
 
-        print(f"   JSON saved: {json_path}")
+        results = scheduler.join()
+
+    # Probe failed (or cached result went stale): fall back to the browser
+    fallback_cfgs = [cfg for cfg in http_cfgs if results.get(cfg["name"]) is None]
+    if fallback_cfgs:
+        with CrawlScheduler(CRAWL_WORKERS, CRAWL_PER_HOST) as scheduler:
+            for cfg in fallback_cfgs:
+                print(f"\n=== PAGE (fallback) [{cfg['group']}] {cfg['name']} ===")
+                page_session_id = open_endpoint_page(browser, cfg)
+                scheduler.submit(
+                    cfg["name"], crawl_and_record, stats, cfg, session,
+                    session_id=page_session_id, **common,
+                )
+            scheduler.join()
+
+    capabilities.save()
+    stats.save()
+    if watermarks is not None:
+        watermarks.save()
+    save_rate_stats()
+
+    if HISTORY_ENABLED:
+        apply_retention(BASE_DIR, HISTORY_KEEP_DAYS, HISTORY_KEEP_MONTHS)
+        compact(BASE_DIR)
 
     print("\n===== DONE CRAWLING JSON =====")
     print("==============================")
 
 
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-
-        # Login
+# ==================== BROWSER / LOGIN ====================
+
+class LazyBrowser:
+    """
+    Playwright is started only when something needs it: the login itself,
+    or an endpoint that cannot be fetched with cookies alone. A page opened
+    after login reuses the cookies instead of logging in again.
+    """
+
+    def __init__(self, cookies=None):
+        self.cookies = cookies or []
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page = None
+
+    def _launch(self):
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._context = self._browser.new_context()
+        block_static_assets(self._context)
+        if self.cookies:
+            self._context.add_cookies(self.cookies)
+        self._page = self._context.new_page()
+
+    def get_page(self):
+        if self._page is None:
+            print("Launching browser")
+            self._launch()
+        return self._page
+
+    def login(self):
+        """Log in, harvest cookies + PURCHASEORDER sessionId, close the browser."""
+        page = self.get_page()
         page.goto(ERP_LOGIN_URL, wait_until="networkidle")
         page.fill(USERNAME_SELECTOR, USERNAME)
         page.fill(PASSWORD_SELECTOR, PASSWORD)
         page.click(SUBMIT_SELECTOR)
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        page.wait_for_selector(USERNAME_SELECTOR, state="detached", timeout=READY_TIMEOUT_MS)
         print("Logged in")
 
-        # Build requests session from cookies
-        cookies = context.cookies()
-        session = build_requests_session_from_cookies(cookies)
+        po_cfg = next(c for c in MERCH_CONFIG if c.get("spec") == "PURCHASEORDER")
+        session_id = prepare_page(page, po_cfg)
+
+        self.cookies = self._context.cookies()
+        self.close()
+        return self.cookies, session_id
+
+    def close(self):
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._playwright = self._browser = self._context = self._page = None
+
+
+def validate_session(session, session_id):
+    """Cheap check (length=1 PURCHASEORDER page) that cookies + sessionId are accepted."""
+    po_cfg = next(c for c in MERCH_CONFIG if c.get("spec") == "PURCHASEORDER")
+    endpoint = compile_endpoint(po_cfg, session_id)
+    try:
+        js = response_json(erp_post(session, po_cfg["json_url"], **endpoint.request_kwargs(1, 0, 1)))
+    except (requests.RequestException, ValueError):
+        return False
+    return isinstance(js, dict) and ("recordsTotal" in js or "data" in js or "Data" in js)
+
+
+def open_erp_session(browser):
+    """Warm start from the session cache; log in with Playwright only if it is rejected."""
+    cached = load_session(SESSION_CACHE_PATH)
+    if cached:
+        session = build_requests_session_from_cookies(cached["cookies"])
+        if validate_session(session, cached["session_id"]):
+            print("Warm start: reusing cached ERP session")
+            browser.cookies = cached["cookies"]
+            return session, cached["session_id"]
+        print("Cached ERP session rejected, logging in again")
+        clear_session(SESSION_CACHE_PATH)
+
+    t0 = time.perf_counter()
+    cookies, session_id = browser.login()
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_browser(time.perf_counter() - t0)
+    save_session(
+        SESSION_CACHE_PATH, cookies, session_id,
+        SESSION_MAX_AGE_HOURS * 3600,
+    )
+    return build_requests_session_from_cookies(cookies), session_id
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl ERP endpoints into raw JSON snapshots")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="fetch only rows changed since the stored UpdatedDate watermark "
+             "(paginated endpoints) and merge them into the existing snapshot",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="skip endpoints finished by the previous (failed) run and continue "
+             "paginated endpoints from their last committed page",
+    )
+    parser.add_argument(
+        "--full-fidelity", action="store_true",
+        help="request and store every ERP column, not only those listed in "
+             "config/column_registry.py",
+    )
+    parser.add_argument(
+        "--plan", action="store_true",
+        help="print the estimated rows / bytes / time per endpoint "
+             "(length=1 probes + last run stats) and exit without crawling",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    browser = LazyBrowser()
+    try:
+        # Build requests session from cookies (cached or fresh login)
+        with METRICS.endpoint("_session"):
+            session, session_id = open_erp_session(browser)
+
+        if args.plan:
+            stats = CrawlStats(CRAWL_STATS_PATH)
+            estimates = plan_endpoints(MERCH_CONFIG, stats, session, session_id, probe_all=True,
+                                       full_fidelity=args.full_fidelity)
+            print_plan(estimates, CRAWL_WORKERS)
+            return
 
         # Run crawl
-        run_crawl(page, session)
-
+        run_crawl(
+            browser, session, session_id,
+            incremental=args.incremental,
+            resume=args.resume,
+            full_fidelity=args.full_fidelity,
+        )
+    finally:
         browser.close()
 
 
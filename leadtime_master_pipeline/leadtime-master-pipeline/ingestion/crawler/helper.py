@@ -1,19 +1,33 @@
 from pathlib import Path
 import pandas as pd
 import os
+import sys
 try:
     import grp
 except ImportError:
     grp = None
 
 import re
-from functools import reduce
+from functools import reduce, lru_cache
+import numpy as np
 from pandas import to_datetime
 import json  
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-BASE_DIR   = os.path.join(SCRIPT_DIR, "ERP_RAW")
+
+# Pipeline root (for ingestion.raw_storage)
+PIPELINE_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+if PIPELINE_ROOT not in sys.path:
+    sys.path.insert(0, PIPELINE_ROOT)
+
+from ingestion.raw_storage.json_writer import iter_snapshot_rows
+from ingestion.raw_storage.snapshot_cache import read_frame
+from ingestion.raw_storage.history_store import locate_snapshot, iter_rows_as_of
+from config.column_registry import clean_column_name, module_columns
+from config.paths import RAW_ROOT
+
+BASE_DIR = RAW_ROOT
 
 GROUP_DIRS = {
     "FABRIC_TRIM": {
@@ -65,18 +79,8 @@ def get_parquet_output_path(group_name: str,
     return str(base_dir / file_name)
 
 #---------- Clean column ----------
-def clean_column_name(col_name: str) -> str:
-    # 1. Uppercase
-    name = col_name.upper()
-
-    # 2. Replace by underscore
-    name = re.sub(r"[#()]", "", name)
-    name = re.sub(r"[^A-Z0-9]+", "_", name)
-
-    # 3. Strip
-    name = re.sub(r"_+", "_", name).strip("_")
-
-    return name
+# clean_column_name + module select lists live in the shared column registry
+# (config/column_registry.py), also used by the crawler to prune columns.
 
 #---------- Load clean excel ----------
 def load_clean_excel(path, skiprows=11):
@@ -230,6 +234,10 @@ brand_map = {
 }
 
 #-------- Normalize ----------
+REMOVE_WORDS_RE = re.compile(r"\b(LTD|LIMITED|LLC|COMPANY|CO\.?|CORP\.?|INC\.?|AND SONS|& SONS)\b")
+NON_NAME_CHARS_RE = re.compile(r"[^A-Z0-9\s\-&]")
+SPACES_RE = re.compile(r"\s+")
+
 def normalize_raw(name: str) -> str:
     if not isinstance(name, str):
         return name
@@ -237,11 +245,10 @@ def normalize_raw(name: str) -> str:
     name = name.upper().strip()
 
     # Remove
-    remove_words = r"\b(LTD|LIMITED|LLC|COMPANY|CO\.?|CORP\.?|INC\.?|AND SONS|& SONS)\b"
-    name = re.sub(remove_words, "", name)
+    name = REMOVE_WORDS_RE.sub("", name)
 
-    name = re.sub(r"[^A-Z0-9\s\-&]", " ", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    name = NON_NAME_CHARS_RE.sub(" ", name)
+    name = SPACES_RE.sub(" ", name).strip()
 
     return name
 
@@ -259,44 +266,78 @@ def normalize_brand(name: str) -> str:
     # Not Mapping -> Return Raw
     return raw
 
+#--------- Normalize whole columns -------------
+# Distinct brand names seen by this process (all tables, all calls). Call
+# normalize_brand_cached.cache_clear() after changing brand_map at runtime.
+BRAND_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=BRAND_CACHE_SIZE)
+def normalize_brand_cached(name: str) -> str:
+    return normalize_brand(name)
+
+def map_unique(values: pd.Series, fn) -> pd.Series:
+    """`values.apply(fn)` with one call per distinct value; nulls are kept as they are."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    for i, value in enumerate(uniques):
+        mapped[i] = fn(value)
+    out = mapped[codes]   # code -1 (null) -> last slot, filled below
+    nulls = codes < 0
+    if nulls.any():
+        out[nulls] = values.to_numpy(dtype=object)[nulls]
+    return pd.Series(out, index=values.index, name=values.name, dtype=object)
+
+def normalize_brand_column(values: pd.Series) -> pd.Series:
+    """`values.apply(normalize_brand)`: factorized, each distinct name normalized once (LRU)."""
+    return map_unique(
+        values, lambda v: normalize_brand_cached(v) if isinstance(v, str) else normalize_brand(v)
+    )
+
+def clean_drop_column(values: pd.Series) -> pd.Series:
+    """`values.apply(clean_drop)`, once per distinct value."""
+    return map_unique(values, clean_drop)
+
 
 # =========================================================
 
-def load_raw_json(path: str):
+def iter_raw_json(path: str, as_of=None):
     """
+    Lazily yield rows of a raw snapshot.
+    With `as_of` (date or "YYYY-MM-DD") the rows come from the snapshot
+    history (ERP_RAW/_history): the latest run on or before that date.
 
     Support format ERP:
+    0) NDJSON, one row per line (crawler snapshot sink)
     1) [ {...}, {...}, ... ]
     2) { "data": [ {...}, ... ] }
     3) { "Data": { "objects": [ {...}, ... ] } }
     """
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # Case 1: JSON is list
-    if isinstance(data, list):
-        return data
-
-    # Case 2: JSON is dict have key "data"
-    if isinstance(data, dict) and "data" in data:
-        return data["data"]
+    if as_of is not None:
+        root, group, file_name = locate_snapshot(path)
+        yield from iter_rows_as_of(root, group, file_name, as_of)
+        return
+    yield from iter_snapshot_rows(path)
 
-    # Case 3: JSON dict have key "Data" -> { "objects": [...] }
-    if isinstance(data, dict) and "Data" in data:
-        inner = data["Data"]
-        if isinstance(inner, dict) and "objects" in inner:
-            return inner["objects"]
 
-    # Fallback: list null
-    return []
+def load_raw_json(path: str, as_of=None):
+    """
+    Read all rows of a raw snapshot (see iter_raw_json for formats).
+    Unknown shapes -> list null.
+    """
+    return list(iter_raw_json(path, as_of))
 
 
-def load_json_to_df(path: str, clean_columns: bool = True) -> pd.DataFrame:
+def load_json_to_df(path: str, clean_columns: bool = True, as_of=None) -> pd.DataFrame:
     """
     Read JSON RAW from ERP and load DataFrame.
+    Values are typed as pd.DataFrame(rows) types them (an int column with
+    nulls is float: 12345.0), from the run's typed snapshot cache when
+    there is one.
     """
-    rows = load_raw_json(path)
-    df = pd.DataFrame(rows)
+    if as_of is None:
+        df = read_frame(path)
+    else:
+        df = pd.DataFrame(load_raw_json(path, as_of))
 
     if clean_columns and not df.empty:
         df.columns = [clean_column_name(c) for c in df.columns]
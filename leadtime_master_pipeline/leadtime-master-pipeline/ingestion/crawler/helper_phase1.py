@@ -11,6 +11,12 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
 
 sys.path.insert(0, PROJECT_ROOT)
 
+PIPELINE_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+if PIPELINE_ROOT not in sys.path:
+    sys.path.insert(0, PIPELINE_ROOT)
+
+from ingestion.raw_storage.snapshot_cache import read_frame
+
 print("TRY IMPORT HELPER FROM:", PROJECT_ROOT)
 helper = importlib.import_module("helper")
 print("HELPER ACTUAL FILE:", helper.__file__)
@@ -74,49 +80,19 @@ def classify_category_subcategory(source: str) -> tuple[str, str]:
 
 
 # =========================================================
-# CLEAN COLUMN NAME
+# CLEAN COLUMN NAME + ALIAS GROUPS (shared column registry)
 # =========================================================
-def clean_column_name(col_name: str) -> str:
-    name = col_name.upper()
-    name = re.sub(r"[#()]", "", name)
-    name = re.sub(r"[^A-Z0-9]+", "_", name)
-    name = re.sub(r"_+", "_", name).strip("_")
-    return name
-
+from config.column_registry import (
+    clean_column_name,
+    DATE_ALIAS_GROUPS,
+    BASE_COLUMNS,
+    COLUMN_ALIAS_GROUPS,
+    ColumnFilter,
+    phase1_columns,
+)
 
-# =========================================================
-# ALIAS GROUPS
-# =========================================================
-DATE_ALIAS_GROUPS = {
-    "SENT_DATE": ["SENTPURDATE","SENT_PRT_DATE","SENTTECHNICALDATE"],
-    "EXPECT_RECEIVE": ["EXPECTRECEIVEDATE","EXPECTEDRECEIVEDATE", "EXPECT RECEIVE"],
-    "CUSTOMER_APPROVED_DATE": ["CUSTOMERAPPROVEDDATE"],
-    "RESPONSE_DATE": ["UPDATEDDATE"],
-    "RECEIVE_DATE" : ["RECEIVEDATEOFPUR", "RECEIVEDATEOF_PRT","TECHNICALRECEIVEDDATE", "RECEIVEDATEOFTECHNICAL"],
-    "SENT_MER_DATE": ["PRT_SENTMERDATE","SENTMERDATE"],
-    "CREATED_DATE": ["CREATEDDATE", "CREATEDDATETOJSON"],
-    "CLIENT_SENT_DATE" : ["CLIENTSENTDATE"],
-    "FINANCE_APPROVED_DATE": ["FINANCEAPPROVEDDATE"],
-    "COSTING_READY": ["MERSENTDATE"],
-    "COSTING_CUSTOMER_STATUS": ["CUSTOMERSTATUSNAME"],
-}
-
-BASE_COLUMNS = [
-    "REQUESTCODE", "PURCHASEORDERCODE", "POPARTNERNAME", "SEASONNAME", "STYLECOLORCODE", "CFC", "DROPCODE",
-    "STYLENOINTERNAL", "SKUNO","SKUNOINTERNAL" ,"WORKTYPENAME", "PURREJECTEDREASON","CUTTING_DOCKET","STATUSNAME"
-]
-
-COLUMN_ALIAS_GROUPS = {
-    "POPARTNERNAME": ["PARTNERNAME", "PARNETNAME", "PO_PARTNER_NAME","CUSTOMERNAME"],
-    "REQUESTCODE": ["REQUEST", "REQUEST_CODE"],
-    "PURCHASEORDERCODE": ["POCODE", "ORDER_CODE", "PO_NO","ORDERINTERNALCODE"],
-    "STYLENOINTERNAL": ["STYLE_INTERNAL", "STYLE_NO", "STYLENO"],
-    "SKUNO": ["SKU", "SKU_NO", "SKU_EXTERNAL"],
-    "WORKTYPENAME": ["WORKTYPENAME"],
-    "PURREJECTEDREASON": ["REJECTREASON", "REASON_REJECTED", "REJECT_REASON","REJECTEDREASON","REASONOFREJECT"],
-    "CUTTING_DOCKET": ["CODE"],
-    "STATUS": ["STATUSNAME"],
-}
+# Raw columns whose cleaned name the loader maps (others are never decoded)
+PHASE1_COLUMN_FILTER = ColumnFilter(phase1_columns())
 
 
 # =========================================================
@@ -141,7 +117,11 @@ def load_base_and_date_columns(
         rel = str(p.relative_to(root))
 
         try:
-            df = pd.read_json(p, dtype=str, lines=False)
+            # Run's typed cache, else the NDJSON snapshot (legacy list/dict
+            # files still load; only columns this loader can map are decoded).
+            # Typed as pd.DataFrame(rows), then str, as pd.read_json(dtype=str)
+            # gave it (nulls "None"/"nan", ints of a column with nulls "30001.0").
+            df = read_frame(p, PHASE1_COLUMN_FILTER).astype(str)
             raw_count = len(df)
             df.columns = [clean_column_name(c) for c in df.columns]
 
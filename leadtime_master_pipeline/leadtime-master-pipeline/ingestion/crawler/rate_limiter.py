@@ -0,0 +1,127 @@
+"""
+Adaptive per-host rate limiter + retry backoff for ERP requests.
+
+Each host gets a token bucket. Its refill rate adapts AIMD-style:
+- success with smoothed latency under target -> rate + increase_step
+- smoothed latency over 2x target           -> rate * 0.9
+- 5xx / 429 / timeout / connection error    -> rate * 0.5
+clamped to [min_rate, max_rate]. Counters are kept per host so the ERP's
+real capacity can be read back from `stats()`.
+"""
+
+from __future__ import annotations
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostLimiter:
+
+    def __init__(self, rate=4.0, burst=4, min_rate=0.5, max_rate=20.0,
+                 target_latency=1.5, increase_step=0.25):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.target_latency = float(target_latency)
+        self.increase_step = float(increase_step)
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._latency = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if the bucket is empty. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token even if it is not there yet (tokens may go
+            # negative) so concurrent callers queue up behind each other.
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            self.requests += 1
+            if wait > 0:
+                self.throttled += 1
+                self.wait_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency = 0.8 * self._latency + 0.2 * latency
+
+            if self._latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+            elif self._latency > 2 * self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self.rate = max(self.min_rate, self.rate * 0.5)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_s": round(self.rate, 3),
+                "latency_ewma_s": round(self._latency, 3) if self._latency is not None else None,
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+class AdaptiveRateLimiter:
+    """One HostLimiter per URL host, created on first use with `defaults`."""
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self._hosts: dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = HostLimiter(**self.defaults)
+                self._hosts[host] = limiter
+            return limiter
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limiter.stats() for host, limiter in hosts.items()}
+
+
+def retry_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0,
+                retry_after=None) -> float:
+    """Full-jitter exponential backoff; a server Retry-After (seconds) wins if larger."""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, min(max_delay, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
@@ -0,0 +1,124 @@
+"""
+Encrypted ERP login session cache.
+
+Persists the authenticated cookies and the PURCHASEORDER `sessionId`
+so the next run can crawl through plain `requests` without launching
+Chromium and logging in again.
+
+Encryption: Fernet (cryptography). The key (urlsafe base64, 32 bytes,
+`Fernet.generate_key()`) is read from env var ERP_SESSION_KEY, else from
+the OS keyring (`keyring`, service KEYRING_SERVICE / user KEYRING_USER).
+It is never written next to the cache: whoever can read the _state
+folder must not be able to decrypt the session. Without a key, or
+without `cryptography`, nothing is cached (every run logs in).
+"""
+
+from __future__ import annotations
+import json
+import os
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = Exception
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+KEY_ENV = "ERP_SESSION_KEY"
+KEYRING_SERVICE = "leadtime-erp-crawler"
+KEYRING_USER = "session-cache-key"
+
+
+def _keyring_key():
+    if keyring is None:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, KEYRING_USER)
+    except Exception as e:   # no backend / locked keyring
+        print("[WARN] session cache key: keyring unavailable:", e)
+        return None
+
+
+def _cipher():
+    """Fernet of the configured key, or None (session cache disabled)."""
+    if Fernet is None:
+        print("[SKIP] session cache (cryptography not installed)")
+        return None
+    key = os.getenv(KEY_ENV) or _keyring_key()
+    if not key:
+        print(f"[SKIP] session cache (no key: set {KEY_ENV} or the "
+              f"'{KEYRING_SERVICE}' keyring entry)")
+        return None
+    try:
+        return Fernet(key.strip().encode("ascii"))
+    except ValueError as e:
+        print("[SKIP] session cache (invalid key):", e)
+        return None
+
+
+def session_expiry(cookies, max_age_seconds: float) -> float:
+    """
+    Earliest expiry of the persistent cookies, capped at now + max_age_seconds.
+    Session cookies (expires = -1) only get the cap.
+    """
+    expiry = time.time() + max_age_seconds
+    for c in cookies:
+        expires = c.get("expires") or -1
+        if expires > 0:
+            expiry = min(expiry, expires)
+    return expiry
+
+
+def save_session(cache_path: str, cookies, session_id: str, max_age_seconds: float) -> None:
+    cipher = _cipher()
+    if cipher is None:
+        return
+
+    payload = {
+        "cookies": cookies,
+        "session_id": session_id or "",
+        "expires_at": session_expiry(cookies, max_age_seconds),
+        "saved_at": time.time(),
+    }
+    token = cipher.encrypt(
+        json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    )
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(token)
+    os.replace(tmp_path, cache_path)
+
+
+def load_session(cache_path: str):
+    """Return {"cookies", "session_id", "expires_at"} or None if missing/expired/unreadable."""
+    if not os.path.exists(cache_path):
+        return None
+    cipher = _cipher()
+    if cipher is None:
+        return None
+
+    try:
+        with open(cache_path, "rb") as f:
+            token = f.read()
+        payload = json.loads(cipher.decrypt(token))
+    except (OSError, ValueError, InvalidToken) as e:
+        print("[WARN] session cache unreadable:", e)
+        return None
+
+    if payload.get("expires_at", 0) <= time.time():
+        print("Session cache expired")
+        return None
+
+    return payload
+
+
+def clear_session(cache_path: str) -> None:
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
@@ -0,0 +1,93 @@
+"""
+Per-endpoint high-water marks for the incremental crawl.
+
+Stored on disk as JSON: { "<endpoint name>": "<ISO datetime of max UpdatedDate>" }.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+_MS_DATE = re.compile(r"/Date\((-?\d+)([+-]\d{4})?\)/")
+
+_DATE_FORMATS = [
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+]
+
+
+def parse_erp_datetime(value):
+    """
+    Parse the date shapes the ERP returns:
+    "/Date(1704441600000)/", ISO "2024-01-05T10:11:12(.fff)", "05/01/2024 10:11".
+    Returns a naive datetime or None.
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    m = _MS_DATE.fullmatch(value.strip())
+    if m:
+        ts = int(m.group(1)) / 1000
+        return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+    s = value.strip()
+    try:
+        return datetime.fromisoformat(s).replace(tzinfo=None)
+    except ValueError:
+        pass
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def max_datetime(rows, column):
+    """Largest parseable `column` value in rows, or None."""
+    best = None
+    for r in rows:
+        d = parse_erp_datetime(r.get(column))
+        if d is not None and (best is None or d > best):
+            best = d
+    return best
+
+
+class WatermarkStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._marks = json.load(f)
+            except (OSError, ValueError) as e:
+                print("[WARN] watermark file unreadable, full crawl:", e)
+
+    def get(self, name: str):
+        with self._lock:
+            value = self._marks.get(name)
+        return datetime.fromisoformat(value) if value else None
+
+    def update(self, name: str, value) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self._marks[name] = value.isoformat(timespec="seconds")
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._marks, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,207 @@
+"""
+Row-level change data capture between two raw snapshots.
+
+Diffs the previous snapshot of an endpoint against the one just committed,
+keyed by the table's natural key (`primary_key` in MERCH_CONFIG: a column
+name or a list of them, matched case-insensitively), and writes one
+compact Parquet change set:
+
+    _op        I (insert) / U (update) / D (delete)
+    _key       natural key values joined with "|"
+    _row_hash  blake2b of the canonical row
+    <columns>  the row (current row for I/U, previous row for D), as strings
+
+A key whose rows did not change is not written. When a key has several
+rows (line-item tables) the key is compared as a whole and all of its
+current rows are emitted on change. Tables without a usable key fall back
+to the row hash as key: an edited row then shows up as D + I.
+
+Volatile columns (IGNORE_COLUMNS: the DataTables "Row" number shifts for
+every row after an insert/delete) are left out of the row hash.
+
+Only digests are held in memory (two passes over each file), so the cost
+is proportional to the number of keys, not to the row width. Change
+records are written in Parquet row groups of CHANGE_BATCH_ROWS as they
+are found; the columns (every column of either snapshot) are collected
+by the first pass.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+
+from ingestion.raw_storage.json_writer import canonical_json, iter_snapshot_rows
+
+CHANGE_OPS = ("I", "U", "D")
+CHANGE_META = ("_op", "_key", "_row_hash")
+CHANGE_BATCH_ROWS = 10_000
+IGNORE_COLUMNS = ("Row",)
+
+
+def _norm(name: str) -> str:
+    return re.sub(r"[^A-Z0-9]", "", str(name).upper())
+
+
+def canonical_row(row, ignore=IGNORE_COLUMNS) -> str:
+    """Canonical JSON of a row without its volatile columns."""
+    if any(c in row for c in ignore):
+        row = {k: v for k, v in row.items() if k not in ignore}
+    return canonical_json(row)
+
+
+def row_digest(row, ignore=IGNORE_COLUMNS) -> str:
+    return hashlib.blake2b(canonical_row(row, ignore).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def resolve_key_columns(row, key_columns):
+    """Map configured key names onto the row's actual column names (None if missing)."""
+    if not key_columns:
+        return None
+    if isinstance(key_columns, str):
+        key_columns = [key_columns]
+    by_norm = {_norm(c): c for c in row}
+    resolved = [by_norm.get(_norm(k)) for k in key_columns]
+    return None if None in resolved else resolved
+
+
+def _first_row(path):
+    for row in iter_snapshot_rows(path):
+        return row
+    return None
+
+
+class _Keyer:
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __call__(self, row, digest):
+        if self.columns is None:
+            return digest
+        return "|".join("" if row.get(c) is None else str(row.get(c)) for c in self.columns)
+
+
+def _index(path, keyer, columns):
+    """{key: sorted digests} for every row of a snapshot; adds its columns to `columns`."""
+    index = defaultdict(list)
+    for row in iter_snapshot_rows(path):
+        if not columns.keys() >= row.keys():
+            columns.update(dict.fromkeys(row))
+        digest = row_digest(row)
+        index[keyer(row, digest)].append(digest)
+    for digests in index.values():
+        digests.sort()
+    return index
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return str(value)
+
+
+def diff_snapshots(previous_path, current_path, key_columns=None):
+    """
+    Index both snapshots (pass 1). Returns (columns, changes): every row
+    column of either snapshot in first-seen order, and a generator of change
+    records {"_op", "_key", "_row_hash", **row} (pass 2).
+    """
+    sample = _first_row(current_path) or _first_row(previous_path) or {}
+    key = resolve_key_columns(sample, key_columns)
+    if key_columns and key is None:
+        print(f"[CDC] key {key_columns} not found in {os.path.basename(current_path)}, "
+              f"diffing by row hash")
+    keyer = _Keyer(key)
+
+    columns = {}
+    after  = _index(current_path, keyer, columns)
+    before = _index(previous_path, keyer, columns)
+    return list(columns), _changes(previous_path, current_path, keyer, before, after)
+
+
+def _changes(previous_path, current_path, keyer, before, after):
+    # Pass 2 over the current snapshot: inserted / updated keys
+    for row in iter_snapshot_rows(current_path):
+        digest = row_digest(row)
+        key = keyer(row, digest)
+        old = before.get(key)
+        if old is None:
+            op = "I"
+        elif old != after[key]:
+            op = "U"
+        else:
+            continue
+        yield {"_op": op, "_key": key, "_row_hash": digest, **row}
+
+    # Pass 2 over the previous snapshot: deleted keys
+    deleted = before.keys() - after.keys()
+    if deleted:
+        for row in iter_snapshot_rows(previous_path):
+            digest = row_digest(row)
+            key = keyer(row, digest)
+            if key in deleted:
+                yield {"_op": "D", "_key": key, "_row_hash": digest, **row}
+
+
+def write_change_set(columns, changes, out_path: str, batch_rows: int = CHANGE_BATCH_ROWS) -> dict:
+    """
+    Write change records to Parquet (string columns: the change metadata,
+    then `columns`), one row group per `batch_rows` records, so at most one
+    batch is in memory. Nothing is written without changes. Returns counts
+    per op.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    names = list(CHANGE_META) + [c for c in columns if c not in CHANGE_META]
+    schema = pa.schema([(c, pa.string()) for c in names])
+    counts = {op: 0 for op in CHANGE_OPS}
+    tmp_path = out_path + ".part"
+    writer = None
+    batch = []
+
+    def flush():
+        nonlocal writer
+        if writer is None:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            writer = pq.ParquetWriter(tmp_path, schema, compression="snappy")
+        writer.write_table(pa.table(
+            {c: pa.array([_cell(r.get(c)) for r in batch], type=pa.string()) for c in names},
+            schema=schema,
+        ))
+        batch.clear()
+
+    try:
+        for r in changes:
+            counts[r["_op"]] += 1
+            batch.append(r)
+            if len(batch) >= batch_rows:
+                flush()
+        if batch:
+            flush()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, out_path)
+    return counts
+
+
+def capture_changes(previous_path, current_path, out_path, key_columns=None):
+    """
+    Diff two snapshots into `out_path`. Returns counts per op, or None when
+    there is no previous snapshot (first run: consumers do a full load).
+    """
+    if not previous_path or not os.path.exists(previous_path):
+        return None
+    columns, changes = diff_snapshots(previous_path, current_path, key_columns)
+    return write_change_set(columns, changes, out_path)
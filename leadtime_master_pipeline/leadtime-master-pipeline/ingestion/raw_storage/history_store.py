@@ -0,0 +1,271 @@
+"""
+Dated, deduplicated history of raw snapshots.
+
+Every committed snapshot is archived under ERP_RAW/_history by run date.
+Rows are grouped into content-defined chunks (a chunk ends after a row
+whose hash hits a boundary pattern), each stored once, gzip-compressed,
+under its sha256. Rows that did not change between days produce the same
+chunks, so a day costs roughly the size of what changed. Rows are stored
+without the volatile columns CDC ignores (cdc.IGNORE_COLUMNS: the
+DataTables "Row" number shifts for every row after an insert), otherwise
+one inserted row would change every later chunk:
+
+    _history/
+      chunks/ab/ab12....ndjson.gz             canonical NDJSON lines
+      runs/2026-01-05/RAW_DATA/managepurchaseorder.json
+          { "sha256": ..., "rows": 48211, "dropped_columns": ["Row"],
+            "chunks": [[hash, rows], ...] }       sha256: the snapshot file
+
+Retention: `apply_retention()` drops run manifests older than `keep_days`
+(keeping the last run of each month for `keep_months`), `compact()`
+deletes chunks no manifest references any more.
+
+Reading: `iter_rows_as_of(root, group, file_name, as_of)` streams the
+snapshot as it was on the latest run date <= as_of.
+
+    python -m ingestion.raw_storage.history_store --root ERP_RAW --keep-days 30 --keep-months 12
+"""
+
+from __future__ import annotations
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from ingestion.raw_storage.cdc import IGNORE_COLUMNS, canonical_row
+from ingestion.raw_storage.json_codec import loads
+from ingestion.raw_storage.json_writer import canonical_json, is_ndjson, iter_snapshot_rows
+
+HISTORY_DIR = "_history"
+
+# Content-defined chunking on row boundaries: ~512 rows per chunk on average
+CHUNK_AVG_ROWS = 512
+CHUNK_MIN_ROWS = 64
+CHUNK_MAX_ROWS = 4096
+
+
+def history_root(raw_root: str | Path) -> Path:
+    return Path(raw_root) / HISTORY_DIR
+
+
+def _chunk_path(root: Path, digest: str) -> Path:
+    return root / "chunks" / digest[:2] / f"{digest}.ndjson.gz"
+
+
+def _run_path(root: Path, run_date: str, group: str, file_name: str) -> Path:
+    return root / "runs" / run_date / group / file_name
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# A line can only hold an ignored column if it contains its quoted name
+_IGNORE_MARKERS = tuple(json.dumps(c).encode("utf-8") for c in IGNORE_COLUMNS)
+
+
+def _stored_line(line: bytes) -> bytes:
+    """Canonical NDJSON line -> line as stored (without IGNORE_COLUMNS)."""
+    if not any(m in line for m in _IGNORE_MARKERS):
+        return line
+    return (canonical_row(loads(line)) + "\n").encode("utf-8")
+
+
+def _snapshot_lines(snapshot_path):
+    """(snapshot line, stored line) pairs, bytes with newline, of a snapshot."""
+    if is_ndjson(snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    line = line if line.endswith(b"\n") else line + b"\n"
+                    yield line, _stored_line(line)
+    else:
+        for row in iter_snapshot_rows(snapshot_path):
+            line = (canonical_json(row) + "\n").encode("utf-8")
+            yield line, (canonical_row(row) + "\n").encode("utf-8")
+
+
+def _is_boundary(line: bytes, rows_in_chunk: int) -> bool:
+    if rows_in_chunk < CHUNK_MIN_ROWS:
+        return False
+    if rows_in_chunk >= CHUNK_MAX_ROWS:
+        return True
+    h = hashlib.blake2b(line, digest_size=8).digest()
+    return int.from_bytes(h, "big") % CHUNK_AVG_ROWS == 0
+
+
+# ==================== WRITE ====================
+
+def archive_snapshot(raw_root, snapshot_path, group: str, run_date: str) -> dict:
+    """
+    Add one snapshot to the history for `run_date` (a later run on the same
+    day replaces that day's entry). Returns the run manifest.
+    """
+    root = history_root(raw_root)
+    file_name = os.path.basename(snapshot_path)
+
+    chunks = []
+    total = hashlib.sha256()
+    rows = 0
+    new_bytes = 0
+    buf = []
+
+    def flush_chunk():
+        nonlocal new_bytes
+        data = b"".join(buf)
+        digest = hashlib.sha256(data).hexdigest()
+        path = _chunk_path(root, digest)
+        if not path.exists():
+            compressed = gzip.compress(data, compresslevel=6, mtime=0)
+            _atomic_write(path, compressed)
+            new_bytes += len(compressed)
+        chunks.append([digest, len(buf)])
+        buf.clear()
+
+    for snapshot_line, line in _snapshot_lines(snapshot_path):
+        buf.append(line)
+        total.update(snapshot_line)
+        rows += 1
+        if _is_boundary(line, len(buf)):
+            flush_chunk()
+    if buf:
+        flush_chunk()
+
+    manifest = {
+        "run_date": run_date,
+        "group": group,
+        "file": file_name,
+        "sha256": total.hexdigest(),
+        "rows": rows,
+        "dropped_columns": list(IGNORE_COLUMNS),
+        "chunks": chunks,
+    }
+    _atomic_write(
+        _run_path(root, run_date, group, file_name),
+        json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+    )
+    print(f"[HISTORY] {group}/{file_name} @ {run_date}: {len(chunks)} chunks, "
+          f"{new_bytes:,} new bytes")
+    return manifest
+
+
+# ==================== READ ====================
+
+def run_dates(root: Path, group: str | None = None, file_name: str | None = None):
+    """Sorted run dates in the history (optionally only those holding group/file)."""
+    runs_dir = root / "runs"
+    if not runs_dir.exists():
+        return []
+    dates = sorted(p.name for p in runs_dir.iterdir() if p.is_dir())
+    if group and file_name:
+        dates = [d for d in dates if (runs_dir / d / group / file_name).exists()]
+    return dates
+
+
+def resolve_as_of(root: Path, group: str, file_name: str, as_of) -> str | None:
+    """Latest run date <= as_of (date or "YYYY-MM-DD") holding this snapshot."""
+    as_of = as_of.isoformat() if isinstance(as_of, date) else str(as_of)
+    dates = run_dates(root, group, file_name)
+    i = bisect.bisect_right(dates, as_of)
+    return dates[i - 1] if i else None
+
+
+def iter_lines_as_of(root, group: str, file_name: str, as_of):
+    root = Path(root)
+    run_date = resolve_as_of(root, group, file_name, as_of)
+    if run_date is None:
+        raise FileNotFoundError(f"no history for {group}/{file_name} as of {as_of}")
+    with open(_run_path(root, run_date, group, file_name), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for digest, _ in manifest["chunks"]:
+        with gzip.open(_chunk_path(root, digest), "rb") as f:
+            yield from f
+
+
+def iter_rows_as_of(root, group: str, file_name: str, as_of):
+    """Rows of group/file_name as of a date (latest run on or before it)."""
+    for line in iter_lines_as_of(root, group, file_name, as_of):
+        yield loads(line)
+
+
+def locate_snapshot(snapshot_path):
+    """ERP_RAW/<GROUP>/JSON/<file> -> (history root, group, file name)."""
+    p = Path(snapshot_path).resolve()
+    return history_root(p.parents[2]), p.parents[1].name, p.name
+
+
+# ==================== RETENTION / COMPACTION ====================
+
+def apply_retention(raw_root, keep_days: int = 30, keep_months: int = 12, today=None) -> list:
+    """
+    Drop run dates older than `keep_days`, except the last run of each month
+    within `keep_months`. Returns the removed run dates.
+    """
+    root = history_root(raw_root)
+    today = today or date.today()
+    daily_cutoff = (today - timedelta(days=keep_days)).isoformat()
+    monthly_cutoff = (today - timedelta(days=31 * keep_months)).isoformat()
+
+    dates = run_dates(root)
+    last_of_month = {}
+    for d in dates:
+        last_of_month[d[:7]] = d
+
+    removed = []
+    for d in dates:
+        if d >= daily_cutoff:
+            continue
+        if d >= monthly_cutoff and last_of_month[d[:7]] == d:
+            continue
+        _remove_tree(root / "runs" / d)
+        removed.append(d)
+    if removed:
+        print(f"[HISTORY] retention removed {len(removed)} run dates")
+    return removed
+
+
+def compact(raw_root) -> int:
+    """Delete chunks referenced by no remaining run manifest. Returns bytes freed."""
+    root = history_root(raw_root)
+    live = set()
+    for manifest_path in (root / "runs").glob("*/*/*"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            live.update(digest for digest, _ in json.load(f)["chunks"])
+
+    freed = 0
+    for chunk in (root / "chunks").glob("*/*.ndjson.gz"):
+        if chunk.name.split(".")[0] not in live:
+            freed += chunk.stat().st_size
+            chunk.unlink()
+    print(f"[HISTORY] compaction freed {freed:,} bytes")
+    return freed
+
+
+def _remove_tree(path: Path) -> None:
+    for p in sorted(path.rglob("*"), reverse=True):
+        p.rmdir() if p.is_dir() else p.unlink()
+    path.rmdir()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot history retention / compaction")
+    parser.add_argument("--root", required=True, help="ERP_RAW folder")
+    parser.add_argument("--keep-days", type=int, default=30)
+    parser.add_argument("--keep-months", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    apply_retention(args.root, args.keep_days, args.keep_months)
+    compact(args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Pluggable JSON codec for the crawler and the raw loaders.
+
+Uses orjson when it is installed, the stdlib json module otherwise
+(JSON_CODEC=json forces the stdlib). Both produce the same canonical
+snapshot encoding: sorted keys, compact separators, UTF-8 (no \\u escapes);
+only floats in exponent form differ (orjson "1e-7", stdlib "1e-07"), so a
+codec switch can re-hash snapshots that hold such values once.
+
+    loads(data)            bytes / str -> object
+    canonical_bytes(row)   one snapshot row, UTF-8 bytes (no newline)
+    response_json(resp)    replaces resp.json()
+    decode_columns(lines)  NDJSON lines -> {column: [values]} (row dicts live one batch)
+    rows_to_columns(rows)  same for already decoded rows
+
+Values orjson cannot encode (ints beyond 64 bits, non-str keys) fall back
+to the stdlib for that row.
+"""
+
+from __future__ import annotations
+import json
+import os
+from itertools import islice
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rows transposed into column arrays per batch (decode_columns)
+COLUMN_BATCH_ROWS = 2048
+
+CODEC = "orjson" if orjson is not None and os.getenv("JSON_CODEC", "").lower() != "json" else "json"
+
+
+def _std_canonical(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+if CODEC == "orjson":
+    _CANONICAL_OPTS = orjson.OPT_SORT_KEYS
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def canonical_bytes(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=_CANONICAL_OPTS)
+        except TypeError:
+            return _std_canonical(obj)
+else:
+    def loads(data):
+        return json.loads(data)
+
+    canonical_bytes = _std_canonical
+
+
+def response_json(resp):
+    """Decode a (non-streamed) requests response body."""
+    return loads(resp.content)
+
+
+def _to_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _append(data, name, values, n, missing=None):
+    col = data.get(name)
+    if col is None:
+        col = data[name] = [missing] * n
+    elif len(col) < n:
+        col.extend([missing] * (n - len(col)))
+    col.extend(values)
+
+
+def rows_to_columns(rows, columns=None, as_str=False, batch_size=COLUMN_BATCH_ROWS,
+                    missing=None) -> dict:
+    """
+    Column arrays {column: [values]} from rows, in first-seen column order;
+    rows missing a column get `missing` (None; float("nan") gives what
+    pd.DataFrame(rows) holds there). `columns` (raw names, or a predicate
+    on the raw name) keeps only those, `as_str` turns every non-null value
+    into str.
+
+    Rows are taken `batch_size` at a time; a batch whose rows share one key
+    set (the normal case for a snapshot) is transposed with itemgetter/zip
+    instead of walking every row dict.
+    """
+    if columns is None or callable(columns):
+        keep = columns
+    else:
+        keep = set(columns).__contains__
+    data = {}
+    n = 0
+    rows = iter(rows)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        keys = batch[0].keys()
+        if all(r.keys() == keys for r in batch):
+            names = [k for k in keys if keep is None or keep(k)]
+            if len(names) == 1:
+                arrays = [map(itemgetter(names[0]), batch)]
+            elif names:
+                arrays = zip(*map(itemgetter(*names), batch))
+            else:
+                arrays = []
+            for name, values in zip(names, arrays):
+                _append(data, name, map(_to_str, values) if as_str else values, n, missing)
+        else:
+            for i, row in enumerate(batch):
+                for k, v in row.items():
+                    if keep is None or keep(k):
+                        _append(data, k, [_to_str(v) if as_str else v], n + i, missing)
+        n += len(batch)
+        for col in data.values():
+            if len(col) < n:
+                col.extend([missing] * (n - len(col)))
+    return data
+
+
+def decode_columns(lines, columns=None, as_str=False, missing=None) -> dict:
+    """NDJSON lines -> column arrays; row dicts only live for one batch."""
+    return rows_to_columns((loads(line) for line in lines if line.strip()), columns, as_str,
+                           missing=missing)
@@ -1,9 +1,208 @@
 """Raw JSON storage utilities."""
 from __future__ import annotations
-import json
+import hashlib
+import os
+import shutil
 from pathlib import Path
 
-def write_json(path: str | Path, payload) -> None:
-    p = Path(path)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+from ingestion.raw_storage.json_codec import loads, canonical_bytes, rows_to_columns, decode_columns
+
+
+# ==================== NDJSON SNAPSHOT SINK ====================
+
+def canonical_json(row) -> str:
+    """One row in the canonical snapshot encoding (stable across runs)."""
+    return canonical_bytes(row).decode("utf-8")
+
+
+def _hash_file(f, size: int, chunk_size: int = 1 << 20):
+    h = hashlib.sha256()
+    f.seek(0)
+    remaining = size
+    while remaining > 0:
+        block = f.read(min(chunk_size, remaining))
+        if not block:
+            break
+        h.update(block)
+        remaining -= len(block)
+    return h
+
+
+def _keep_previous(path: Path, previous_path: Path) -> None:
+    previous_path.parent.mkdir(parents=True, exist_ok=True)
+    if previous_path.exists():
+        previous_path.unlink()
+    try:
+        os.link(path, previous_path)
+    except OSError:
+        shutil.copy2(path, previous_path)
+
+
+class SnapshotWriter:
+    """
+    Streaming, atomic raw snapshot writer (newline-delimited JSON).
+
+    Rows are appended page by page to `<path>.part`; `commit()` fsyncs and
+    renames it over `path`, so readers never see a half-written snapshot
+    and a failed crawl keeps the previous one.
+
+        with SnapshotWriter(json_path) as sink:
+            for page in pages:
+                sink.write_rows(page)
+        # committed here; aborted (previous snapshot kept) on exception
+
+    Resumable crawls: `keep_partial=True` leaves `<path>.part` on disk when
+    the block fails, and `resume_bytes`/`resume_rows` reopen it, truncated
+    to the last durable `flush()`, to keep appending.
+
+    `previous_path`: on commit the snapshot being replaced is kept there
+    (hard link, copy if linking is not possible), e.g. for change capture.
+
+    Rows are serialized canonically (sorted keys, compact separators), so
+    `sha256` - the digest of the snapshot bytes - only changes when the
+    content does.
+    """
+
+    def __init__(self, path: str | Path, keep_partial: bool = False,
+                 resume_bytes: int = 0, resume_rows: int = 0, previous_path=None):
+        self.path = Path(path)
+        self.previous_path = Path(previous_path) if previous_path else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(self.path.name + ".part")
+        self.keep_partial = keep_partial
+
+        if resume_bytes and self.tmp_path.exists() and self.tmp_path.stat().st_size >= resume_bytes:
+            self._f = open(self.tmp_path, "r+b")
+            self._f.truncate(resume_bytes)
+            self._hash = _hash_file(self._f, resume_bytes)
+            self._f.seek(resume_bytes)
+            self.rows_written = resume_rows
+            self.resumed = True
+        else:
+            self._f = open(self.tmp_path, "wb")
+            self._hash = hashlib.sha256()
+            self.rows_written = 0
+            self.resumed = False
+        self._closed = False
+        self._size = 0
+
+    @property
+    def bytes_written(self) -> int:
+        return self._size if self._closed else self._f.tell()
+
+    @property
+    def sha256(self) -> str:
+        """Hex digest of everything written so far (final after commit)."""
+        return self._hash.hexdigest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        elif self.keep_partial:
+            self.flush()
+            self._f.close()
+            self._closed = True
+        else:
+            self.abort()
+        return False
+
+    def write_rows(self, rows) -> None:
+        lines = [canonical_bytes(r) for r in rows]
+        if not lines:
+            return
+        chunk = b"\n".join(lines) + b"\n"
+        self._f.write(chunk)
+        self._hash.update(chunk)
+        self.rows_written += len(lines)
+
+    def flush(self) -> None:
+        """Make everything written so far durable (checkpoint boundary)."""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def commit(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._size = self._f.tell()
+        self._f.close()
+        self._closed = True
+        if self.previous_path is not None and self.path.exists():
+            _keep_previous(self.path, self.previous_path)
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._closed:
+            return
+        self._f.close()
+        self._closed = True
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+
+
+# ==================== READERS ====================
+
+def _is_legacy_wrapper(obj) -> bool:
+    return isinstance(obj, dict) and (
+        isinstance(obj.get("data"), list)
+        or (isinstance(obj.get("Data"), dict) and "objects" in obj["Data"])
+    )
+
+
+def is_ndjson(path: str | Path) -> bool:
+    """True when the file is one JSON object per line (new snapshot format)."""
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline().strip()
+    if not first.startswith("{"):
+        return False
+    try:
+        obj = loads(first)
+    except ValueError:
+        return False   # pretty-printed legacy dict
+    return not _is_legacy_wrapper(obj)
+
+
+def iter_snapshot_rows(path: str | Path):
+    """
+    Lazily yield rows of a raw snapshot.
+
+    NDJSON is streamed line by line. Legacy shapes are still accepted
+    (loaded whole):
+    1) [ {...}, {...}, ... ]
+    2) { "data": [ {...}, ... ] }
+    3) { "Data": { "objects": [ {...}, ... ] } }
+    """
+    if is_ndjson(path):
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        return
+
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.strip():
+        return
+    data = loads(content)
+
+    if isinstance(data, list):
+        yield from data
+    elif isinstance(data, dict) and "data" in data:
+        yield from data["data"]
+    elif isinstance(data, dict) and isinstance(data.get("Data"), dict):
+        yield from data["Data"].get("objects", [])
+
+
+def read_snapshot_columns(path: str | Path, columns=None, as_str: bool = False, missing=None) -> dict:
+    """
+    Whole snapshot as column arrays {column: [values]} (see
+    json_codec.rows_to_columns). NDJSON lines are decoded straight into
+    the arrays; legacy shapes go through iter_snapshot_rows.
+    """
+    if is_ndjson(path):
+        with open(path, "rb") as f:
+            return decode_columns(f, columns, as_str, missing)
+    return rows_to_columns(iter_snapshot_rows(path), columns, as_str, missing=missing)
@@ -0,0 +1,186 @@
+"""
+Run manifest: content hash of every raw snapshot, written at crawl time.
+
+Stored as ERP_RAW/_state/run_manifest.json and keyed by "<GROUP>/<file>":
+
+    {
+      "run_date": "2026-01-05",
+      "updated_at": "2026-01-05T06:41:10",
+      "snapshots": {
+        "RAW_DATA/managepurchaseorder.json": {
+          "endpoint": "purchaseorder",
+          "path": ".../ERP_RAW/RAW_DATA/JSON/managepurchaseorder.json",
+          "sha256": "9f2c...",
+          "previous_sha256": "9f2c...",
+          "changed": false,
+          "rows": 48211,
+          "bytes": 61234567,
+          "run_date": "2026-01-05"
+        }
+      },
+      "uploads": {
+        "<lakehouse>/Files/RAW_LEADTIME/RAW_DATA/PURCHASE_ORDER/raw_managepurchaseorder.parquet": {
+          "fingerprint": {"inputs": {"RAW_DATA/managepurchaseorder.json": "9f2c..."}, ...},
+          "uploaded_at": "2026-01-05T06:52:40"
+        }
+      }
+    }
+
+Downstream steps (supervisor, uploader) compare these hashes with the ones
+they last processed and skip work whose inputs did not change.
+"""
+
+from __future__ import annotations
+import fnmatch
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+MANIFEST_FILE = "run_manifest.json"
+LOCK_TIMEOUT = 30   # seconds; an older lock file was left by a killed process
+
+
+def snapshot_key(group: str, path: str) -> str:
+    return f"{group}/{os.path.basename(path)}"
+
+
+def manifest_path(raw_root: str) -> str:
+    return os.path.join(raw_root, "_state", MANIFEST_FILE)
+
+
+def _atomic_dump(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] {os.path.basename(path)} unreadable, ignoring:", e)
+        return {}
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Cross-process lock: `<path>.lock`, created exclusively."""
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+class RunManifest:
+
+    def __init__(self, path: str, run_date: str | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = _load(path)
+        self._data.setdefault("snapshots", {})
+        if run_date:
+            self._data["run_date"] = run_date
+
+    def get(self, key: str) -> dict:
+        with self._lock:
+            return dict(self._data["snapshots"].get(key, {}))
+
+    def record(self, key: str, endpoint: str, path: str, sha256: str,
+               rows: int, nbytes: int) -> bool:
+        """Store a freshly committed snapshot. Returns True if its content changed."""
+        with self._lock:
+            previous = self._data["snapshots"].get(key, {}).get("sha256")
+            changed = previous != sha256
+            self._data["snapshots"][key] = {
+                "endpoint": endpoint,
+                "path": path,
+                "sha256": sha256,
+                "previous_sha256": previous,
+                "changed": changed,
+                "rows": rows,
+                "bytes": nbytes,
+                "run_date": self._data.get("run_date"),
+            }
+        return changed
+
+    def fingerprint(self, patterns) -> dict:
+        """{key: sha256} of every snapshot matching the glob `patterns`."""
+        with self._lock:
+            snapshots = dict(self._data["snapshots"])
+        return {
+            key: entry["sha256"]
+            for key, entry in sorted(snapshots.items())
+            if any(fnmatch.fnmatch(key, p) for p in patterns)
+        }
+
+    def save(self) -> None:
+        with self._lock, _file_lock(self.path):
+            # Uploads are recorded by other processes (record_upload): keep theirs
+            uploads = _load(self.path).get("uploads")
+            if uploads:
+                self._data.setdefault("uploads", {}).update(uploads)
+            self._data["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            _atomic_dump(self.path, self._data)
+
+    def uploaded(self, dest_path: str):
+        """Fingerprint `dest_path` was last uploaded with, or None."""
+        with self._lock:
+            return self._data.get("uploads", {}).get(dest_path, {}).get("fingerprint")
+
+    def record_upload(self, dest_path: str, fingerprint) -> None:
+        """
+        Store the fingerprint of an upload. Modules upload from parallel
+        processes: the file is re-read under a lock and only this entry changes.
+        """
+        entry = {
+            "fingerprint": fingerprint,
+            "uploaded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock, _file_lock(self.path):
+            data = _load(self.path)
+            data.setdefault("snapshots", {})
+            data.setdefault("uploads", {})[dest_path] = entry
+            _atomic_dump(self.path, data)
+            self._data = data
+
+
+class HashLedger:
+    """
+    What a consumer last processed: { name: fingerprint }.
+    Used by the supervisor (per module) to skip unchanged inputs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = _load(path)
+
+    def is_current(self, name: str, fingerprint) -> bool:
+        return bool(fingerprint) and self._data.get(name) == fingerprint
+
+    def update(self, name: str, fingerprint) -> None:
+        self._data[name] = fingerprint
+        _atomic_dump(self.path, self._data)
+
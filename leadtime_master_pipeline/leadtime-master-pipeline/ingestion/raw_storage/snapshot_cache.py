@@ -0,0 +1,159 @@
+"""
+Run-scoped cache of parsed raw snapshots.
+
+The first loader in a run that reads a snapshot stores it parsed, as an
+uncompressed Arrow IPC file. Every later read memory-maps that file
+(zero-copy Arrow buffers) instead of decoding the JSON again, whether it
+comes from another spec, another warm worker or a subprocess:
+
+    <SNAPSHOT_CACHE_DIR>/<key>.typed.arrow     key: path, size, mtime, content sha256
+
+The supervisor points SNAPSHOT_CACHE_DIR at ERP_RAW/_cache/<run> for its
+run and removes the folder afterwards. Without SNAPSHOT_CACHE_DIR nothing
+is cached.
+
+The frame is typed as pd.DataFrame(rows) types it (`read_frame`), and
+only stored where the round trip through Arrow is exact: a snapshot with
+nested values, mixed-type columns or NaN nulls in an object column (rows
+missing a key) would not come back the same; it is not stored
+(<key>.typed.skip) and each read decodes the JSON. The whole snapshot is
+stored; callers' column filters select from the mapped table.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from ingestion.raw_storage.json_writer import iter_snapshot_rows, read_snapshot_columns
+
+CACHE_ENV = "SNAPSHOT_CACHE_DIR"
+CACHE_VERSION = 1   # bump when the cached layout changes
+HASH_CHUNK = 1 << 20
+
+_digests = {}   # (path, size, mtime_ns) -> content sha256, per process
+_tables = {}    # cache file -> memory-mapped table, per process
+_lock = threading.Lock()
+
+
+def cache_dir():
+    return os.getenv(CACHE_ENV) or None
+
+
+def content_sha256(path: str, st: os.stat_result) -> str:
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _lock:
+        digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _lock:
+            _digests[key] = digest
+    return digest
+
+
+def cache_key(snapshot_path) -> str:
+    path = os.path.abspath(snapshot_path)
+    st = os.stat(path)
+    ident = f"{CACHE_VERSION}|{path}|{st.st_size}|{st.st_mtime_ns}|{content_sha256(path, st)}"
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()[:32]
+
+
+def _select(table: pa.Table, columns) -> pa.Table:
+    if columns is None:
+        return table
+    keep = columns if callable(columns) else set(columns).__contains__
+    return table.select([n for n in table.column_names if keep(n)])
+
+
+def _decode_frame(snapshot_path, columns=None) -> pd.DataFrame:
+    """
+    pd.DataFrame(rows) of the snapshot. Only `columns`: decoded into column
+    arrays (rows missing a key get NaN, as in the frame of rows).
+    """
+    if columns is None:
+        return pd.DataFrame(list(iter_snapshot_rows(snapshot_path)))
+    return pd.DataFrame(read_snapshot_columns(snapshot_path, columns, missing=float("nan")))
+
+
+def _typed_table(df: pd.DataFrame):
+    """Arrow table giving back exactly `df`, or None."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    if any(pa.types.is_nested(field.type) for field in table.schema):
+        return None
+    # Arrow nulls come back as None in object columns: NaN ones would not
+    for name in df.columns[df.dtypes == object]:
+        col = df[name]
+        if any(v is not None for v in col[col.isna()]):
+            return None
+    return table if table.to_pandas().equals(df) else None
+
+
+def _store(table: pa.Table, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with ipc.new_file(tmp, table.schema) as writer:
+        writer.write_table(table)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another process stored it first (and has it mapped, on Windows)
+        os.remove(tmp)
+        if not os.path.exists(path):
+            raise
+
+
+def _mapped(path: str) -> pa.Table:
+    with _lock:
+        table = _tables.get(path)
+    if table is None:
+        table = ipc.open_file(pa.memory_map(path)).read_all()
+        with _lock:
+            _tables[path] = table
+    return table
+
+
+def read_frame(snapshot_path, columns=None) -> pd.DataFrame:
+    """
+    DataFrame of a snapshot typed as pd.DataFrame(rows) types it
+    (`columns`: raw names or a predicate on the raw name). With a cache:
+    the typed cache file, built on first use, when the snapshot round-trips
+    through Arrow. Otherwise the JSON is decoded, only for `columns`.
+    """
+    root = cache_dir()
+    if root is None:
+        return _decode_frame(snapshot_path, columns)
+
+    base = os.path.join(root, cache_key(snapshot_path) + ".typed")
+    path, skip = base + ".arrow", base + ".skip"
+    if os.path.exists(path):
+        print(f"[CACHE] hit {os.path.basename(snapshot_path)} (typed)")
+        return _select(_mapped(path), columns).to_pandas()
+    if os.path.exists(skip):
+        return _decode_frame(snapshot_path, columns)
+
+    t0 = time.perf_counter()
+    os.makedirs(root, exist_ok=True)
+    df = _decode_frame(snapshot_path)
+    table = _typed_table(df)
+    if table is None:
+        open(skip, "w").close()
+        print(f"[CACHE] {os.path.basename(snapshot_path)} not cached (typed values do not round-trip)")
+    else:
+        _store(table, path)
+        print(f"[CACHE] parsed {os.path.basename(snapshot_path)} (typed): "
+              f"{table.num_rows:,} rows in {time.perf_counter() - t0:.2f}s")
+    if columns is None:
+        return df
+    keep = columns if callable(columns) else set(columns).__contains__
+    return df[[c for c in df.columns if keep(c)]]
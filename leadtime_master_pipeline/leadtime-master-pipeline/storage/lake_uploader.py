@@ -10,9 +10,16 @@ Required env vars:
 - ONELAKE_LAKEHOUSE_ID
 Optional:
 - ONELAKE_BASE_FOLDER (default: RAW_LEADTIME)
+- PIPELINE_FORCE=1 (re-upload even if the file is unchanged)
 
 Auth:
 - DefaultAzureCredential (Azure CLI / Managed Identity / etc.)
+
+Unchanged files are not re-uploaded: `upload_file(..., fingerprint, manifest)`
+records what a file was built from (the supervisor's task fingerprint: raw
+snapshot hashes of the run manifest + spec / engine / registry hashes) in
+the run manifest, and skips the next upload to the same destination with
+the same fingerprint. Without a fingerprint the file is always uploaded.
 """
 
 from __future__ import annotations
@@ -25,7 +32,17 @@ def build_destination_path(group_name: str, table_name: str, file_name: str) ->
         raise RuntimeError("Missing env var: ONELAKE_LAKEHOUSE_ID")
     return f"{lakehouse_id}/Files/{base_folder}/{group_name}/{table_name}/{file_name}"
 
-def upload_file(local_path: str, dest_path: str) -> None:
+
+def force_enabled() -> bool:
+    return os.getenv("PIPELINE_FORCE", "").strip().lower() in ("1", "true", "yes")
+
+
+def upload_file(local_path: str, dest_path: str, fingerprint=None, manifest=None,
+                force: bool | None = None) -> bool:
+    """
+    Upload unless `manifest` (ingestion.raw_storage.run_manifest.RunManifest)
+    says dest_path already got a file with this fingerprint. Returns True if uploaded.
+    """
     dfs_url = os.getenv("ONELAKE_DFS_URL")
     file_system = os.getenv("ONELAKE_FILE_SYSTEM")
     if not dfs_url:
@@ -33,6 +50,13 @@ def upload_file(local_path: str, dest_path: str) -> None:
     if not file_system:
         raise RuntimeError("Missing env var: ONELAKE_FILE_SYSTEM")
 
+    if force is None:
+        force = force_enabled()
+    tracked = bool(fingerprint) and manifest is not None
+    if tracked and not force and manifest.uploaded(dest_path) == fingerprint:
+        print("[SKIP] inputs unchanged since last upload:", dest_path)
+        return False
+
     try:
         from azure.identity import DefaultAzureCredential
         from azure.storage.filedatalake import DataLakeFileClient
@@ -51,3 +75,7 @@ def upload_file(local_path: str, dest_path: str) -> None:
 
     with open(local_path, "rb") as f:
         file_client.upload_data(f, overwrite=True)
+
+    if tracked:
+        manifest.record_upload(dest_path, fingerprint)
+    return True
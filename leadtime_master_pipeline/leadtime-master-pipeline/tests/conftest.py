@@ -0,0 +1,71 @@
+"""
+Shared fixtures. Run from the pipeline root:
+
+    python -m pytest -q tests
+
+The crawler is imported with RAW_OUTPUT_PATH pointing at a temp folder, so
+no test writes into ingestion/crawler/ERP_RAW.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+PIPELINE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CRAWLER_DIR = os.path.join(PIPELINE_ROOT, "ingestion", "crawler")
+for path in (PIPELINE_ROOT, CRAWLER_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Read by erp_cralwer at import time
+RAW_ROOT = tempfile.mkdtemp(prefix="erp_raw_test_")
+os.environ["RAW_OUTPUT_PATH"] = RAW_ROOT
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(RAW_ROOT, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def crawler():
+    import erp_cralwer
+    return erp_cralwer
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    """Mock ERP (benchmarks/mock_erp.py) with 5,000 rows per endpoint, no latency."""
+    from benchmarks import mock_erp
+
+    server = mock_erp.serve(port=0, rows=5000, latency=0)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def erp_session(mock_server):
+    import requests
+    from benchmarks import mock_erp
+
+    session = requests.Session()
+    session.cookies.set(mock_erp.SESSION_COOKIE, mock_erp.SESSION_VALUE)
+    return session
+
+
+@pytest.fixture
+def write_snapshot():
+    """write_snapshot(path, rows): snapshot file in the crawler's canonical NDJSON."""
+    from ingestion.raw_storage.json_writer import canonical_json
+
+    def _write(path, rows):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(canonical_json(row) + "\n")
+        return str(path)
+
+    return _write
@@ -0,0 +1,81 @@
+import pyarrow.parquet as pq
+
+from ingestion.raw_storage import cdc
+
+
+def _po(row, code, sku, qty=1):
+    return {"Row": row, "PoCode": code, "SkuNo": sku, "Qty": qty}
+
+
+PREVIOUS = [_po(1, "A", "1"), _po(2, "A", "2"), _po(3, "B", "1"), _po(4, "C", "1")]
+# New PO first (shifts every Row number), B edited, C deleted, A unchanged
+CURRENT = [_po(1, "N", "1"), _po(2, "A", "1"), _po(3, "A", "2"), _po(4, "B", "1", qty=9)]
+
+
+def _changes(tmp_path, write_snapshot, previous, current, key):
+    prev = write_snapshot(tmp_path / "prev.json", previous)
+    cur = write_snapshot(tmp_path / "cur.json", current)
+    columns, changes = cdc.diff_snapshots(prev, cur, key)
+    return columns, list(changes)
+
+
+def test_diff_by_primary_key(tmp_path, write_snapshot):
+    columns, changes = _changes(tmp_path, write_snapshot, PREVIOUS, CURRENT, "PoCode")
+    assert columns == ["PoCode", "Qty", "Row", "SkuNo"]
+    assert [(c["_op"], c["_key"]) for c in changes] == [("I", "N"), ("U", "B"), ("D", "C")]
+    assert changes[1]["Qty"] == 9
+    assert changes[2]["Qty"] == 1   # deletes carry the previous row
+
+
+def test_key_matched_case_insensitively(tmp_path, write_snapshot):
+    _, changes = _changes(tmp_path, write_snapshot, PREVIOUS, CURRENT, "po_code")
+    assert [c["_key"] for c in changes] == ["N", "B", "C"]
+
+
+def test_composite_key_and_line_items(tmp_path, write_snapshot):
+    current = [_po(1, "A", "1"), _po(2, "A", "2", qty=5)]
+    _, by_po = _changes(tmp_path, write_snapshot, PREVIOUS[:2], current, "PoCode")
+    _, by_line = _changes(tmp_path, write_snapshot, PREVIOUS[:2], current, ["PoCode", "SkuNo"])
+    # A PO key is compared as a whole: all of its current rows are emitted
+    assert [(c["_op"], c["_key"], c["SkuNo"]) for c in by_po] == [("U", "A", "1"), ("U", "A", "2")]
+    assert [(c["_op"], c["_key"]) for c in by_line] == [("U", "A|2")]
+
+
+def test_missing_key_falls_back_to_row_hash(tmp_path, write_snapshot):
+    _, changes = _changes(tmp_path, write_snapshot, PREVIOUS, CURRENT, "NoSuchColumn")
+    ops = sorted(c["_op"] for c in changes)
+    # the edited B row shows up as delete + insert
+    assert ops == ["D", "D", "I", "I"]
+    assert all(c["_key"] == c["_row_hash"] for c in changes)
+
+
+def test_row_number_is_ignored(tmp_path, write_snapshot):
+    shifted = [{**r, "Row": r["Row"] + 10} for r in PREVIOUS]
+    _, changes = _changes(tmp_path, write_snapshot, PREVIOUS, shifted, "PoCode")
+    assert changes == []
+
+
+def test_change_set_written_in_row_groups(tmp_path, write_snapshot):
+    prev = write_snapshot(tmp_path / "prev.json", PREVIOUS)
+    cur = write_snapshot(tmp_path / "cur.json", CURRENT)
+    out = tmp_path / "_cdc" / "changes.parquet"
+
+    columns, changes = cdc.diff_snapshots(prev, cur, ["PoCode", "SkuNo"])
+    counts = cdc.write_change_set(columns, changes, str(out), batch_rows=2)
+
+    assert counts == {"I": 1, "U": 1, "D": 1}
+    parquet = pq.ParquetFile(out)
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.column_names == ["_op", "_key", "_row_hash", "PoCode", "Qty", "Row", "SkuNo"]
+    assert table.column("_op").to_pylist() == ["I", "U", "D"]
+    assert table.column("_key").to_pylist() == ["N|1", "B|1", "C|1"]
+    assert table.column("Qty").to_pylist() == ["1", "9", "1"]
+
+
+def test_no_change_set_without_changes(tmp_path, write_snapshot):
+    prev = write_snapshot(tmp_path / "prev.json", PREVIOUS)
+    out = tmp_path / "_cdc" / "changes.parquet"
+    assert cdc.capture_changes(prev, prev, str(out), "PoCode") == {"I": 0, "U": 0, "D": 0}
+    assert not out.exists()
+    assert cdc.capture_changes(str(tmp_path / "missing.json"), prev, str(out)) is None
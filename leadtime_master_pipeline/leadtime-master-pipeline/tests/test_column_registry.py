@@ -0,0 +1,51 @@
+import fnmatch
+
+import pytest
+
+from config.column_registry import clean_column_name, module_columns, module_snapshots, snapshot_columns
+from config.transform_specs import TRANSFORM_SPECS
+from endpoint_spec import compile_endpoint, endpoint_spec
+from ingestion.raw_storage.run_manifest import snapshot_key
+
+
+def _datatables_endpoints(crawler):
+    """(cfg, snapshot key) of every endpoint sending a DataTables columns[]."""
+    return [
+        (cfg, snapshot_key(cfg["group"], crawler.get_snapshot_path(cfg)))
+        for cfg in crawler.MERCH_CONFIG
+        if "columns" in endpoint_spec(cfg)
+    ]
+
+
+def _requested(crawler, cfg, full_fidelity=False):
+    column_filter = None if full_fidelity else crawler.endpoint_column_filter(cfg)
+    endpoint = compile_endpoint(cfg, "session", column_filter=column_filter)
+    return {clean_column_name(c) for c in endpoint.columns}
+
+
+def test_requested_columns_cover_selected_columns(crawler):
+    checked = 0
+    for cfg, key in _datatables_endpoints(crawler):
+        requested = _requested(crawler, cfg)
+        for name, spec in TRANSFORM_SPECS.items():
+            if spec.get("select") != "registry":
+                continue
+            if not any(fnmatch.fnmatch(key, p) for p in module_snapshots(name)):
+                continue
+            missing = set(module_columns(name)) - requested
+            assert not missing, f"{cfg['name']} does not request {sorted(missing)} ({name})"
+            checked += 1
+    assert checked   # managepurchaseorder / managecostingsheetclient read PURCHASEORDER
+
+
+@pytest.mark.parametrize("full_fidelity", [False, True])
+def test_pruning_keeps_every_registry_column_of_the_spec(crawler, full_fidelity):
+    for cfg, key in _datatables_endpoints(crawler):
+        used = snapshot_columns(key)
+        if used is None:
+            continue
+        spec_columns = {clean_column_name(c) for c in endpoint_spec(cfg)["columns"]}
+        requested = _requested(crawler, cfg, full_fidelity)
+        assert spec_columns & used <= requested, cfg["name"]
+        if full_fidelity:
+            assert requested == spec_columns
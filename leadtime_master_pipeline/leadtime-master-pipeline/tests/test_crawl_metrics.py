@@ -0,0 +1,141 @@
+import json
+import os
+
+import pytest
+import requests
+
+from crawl_metrics import CrawlMetrics, EndpointMetrics, current, percentile, prometheus_text, \
+    write_json_report, write_prometheus
+from crawl_planner import CrawlStats
+
+HANDLER = "ManagePrintingsOfMer"
+
+
+@pytest.fixture
+def cfg(mock_server):
+    return {
+        "name": "test_treatment",
+        "group": "TREATMENT",
+        "page_url": f"{mock_server.base_url}/app",
+        "json_url": f"{mock_server.base_url}/?_n=Core.Sites.Apps&_o=Mock.{HANDLER}&_m=LoadData",
+        "spec": "TREATMENT",
+    }
+
+
+@pytest.fixture
+def metrics(crawler, monkeypatch):
+    metrics = CrawlMetrics()
+    monkeypatch.setattr(crawler, "METRICS", metrics)
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    return metrics
+
+
+def test_percentile_is_nearest_rank():
+    values = [5, 1, 4, 2, 3, 10, 9, 8, 7, 6]
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.9) == 9
+    assert percentile(values, 0.99) == 10
+    assert percentile([0.2], 0.5) == 0.2
+    assert percentile([], 0.5) is None
+
+
+# ==================== ATTRIBUTION ====================
+
+def test_page_threads_record_to_their_endpoint(crawler, cfg, erp_session, metrics):
+    endpoint = crawler.compile_endpoint(cfg)
+    assert current() is None
+
+    with metrics.endpoint(cfg["name"]) as m:
+        assert current() is m
+        crawler.fetch_datatables_parallel(
+            erp_session, cfg["json_url"], endpoint, lambda rows: None, page_size=1000, concurrency=4,
+        )
+    assert current() is None
+
+    summary = m.summary()
+    assert (summary["requests"], summary["errors"], summary["retries"]) == (5, 0, 0)
+    assert summary["bytes"] > 0
+    assert summary["decode_seconds"] > 0
+    assert summary["latency_s"]["p50"] <= summary["latency_s"]["max"]
+
+
+def test_crawl_result_is_recorded(crawler, cfg, erp_session, metrics, tmp_path):
+    stats = CrawlStats(str(tmp_path / "crawl_stats.json"))
+    rows = crawler.crawl_and_record(stats, cfg, erp_session, full_fidelity=True)
+    snapshot_path = crawler.get_snapshot_path(cfg)
+    try:
+        summary = metrics.for_endpoint(cfg["name"]).summary()
+        assert summary["status"] == "ok"
+        assert summary["rows"] == rows == stats.get(cfg["name"])["rows"]
+        assert summary["snapshot_bytes"] == os.path.getsize(snapshot_path)
+        assert summary["requests"] == -(-rows // crawler.PAGE_SIZE)
+    finally:
+        os.remove(snapshot_path)
+
+
+def test_failed_crawl_is_recorded(crawler, cfg, erp_session, metrics, monkeypatch, tmp_path):
+    def dropped(*args, **kwargs):
+        raise requests.ConnectionError("connection dropped")
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", dropped)
+    with pytest.raises(requests.ConnectionError):
+        crawler.crawl_and_record(CrawlStats(str(tmp_path / "crawl_stats.json")), cfg, erp_session)
+    assert metrics.for_endpoint(cfg["name"]).summary()["status"] == "failed"
+
+
+# ==================== EXPORT ====================
+
+@pytest.fixture
+def report():
+    metrics = CrawlMetrics()
+    po = metrics.for_endpoint("purchaseorder")
+    for latency in (0.1, 0.2, 0.4):
+        po.record_request(latency)
+    po.record_request(1.0, ok=False)
+    po.record_retry(2.0)
+    po.record_throttle(0.5)
+    po.record_throttle(0.0)                       # no wait: not throttled
+    po.record_bytes(1000)
+    po.record_result("ok", 3.0, rows=48211, snapshot_bytes=61234567)
+    metrics.for_endpoint('odd "name"').record_result("needs_browser", 0.5)
+    return metrics.report("2026-01-05", "060003", status="failed")
+
+
+def test_report_summarises_each_endpoint(report):
+    po = report["endpoints"]["purchaseorder"]
+    assert (po["requests"], po["errors"], po["retries"], po["throttled"]) == (4, 1, 1, 1)
+    assert po["latency_s"] == {"p50": 0.2, "p90": 1.0, "p99": 1.0, "max": 1.0}
+    assert po["request_seconds"] == 1.7
+    assert (po["retry_wait_seconds"], po["throttle_wait_seconds"]) == (2.0, 0.5)
+    assert report["endpoints"]['odd "name"']["latency_s"]["p50"] is None
+    assert list(report["endpoints"]) == ['odd "name"', "purchaseorder"]
+
+
+def test_prometheus_text(report):
+    lines = prometheus_text(report).splitlines()
+    assert "erp_crawl_run_success 0" in lines
+    assert 'erp_crawl_endpoint_success{endpoint="purchaseorder"} 1' in lines
+    assert 'erp_crawl_endpoint_success{endpoint="odd \\"name\\""} 0' in lines
+    assert 'erp_crawl_request_latency_seconds{endpoint="purchaseorder",quantile="0.5"} 0.2' in lines
+    assert 'erp_crawl_request_latency_seconds_count{endpoint="purchaseorder"} 4' in lines
+    assert 'erp_crawl_rows{endpoint="purchaseorder"} 48211' in lines
+    # Requests are only exported as the latency summary's _count
+    assert not any(l.startswith("erp_crawl_requests_total") for l in lines)
+    # Every sample has a HELP / TYPE header
+    declared = {l.split()[2] for l in lines if l.startswith("# TYPE")}
+    for line in lines:
+        if not line.startswith("#"):
+            name = line.split("{")[0].split()[0]
+            assert name in declared or name.rsplit("_", 1)[0] in declared, line
+
+
+def test_reports_are_written(report, tmp_path):
+    json_path = tmp_path / "_metrics" / "2026-01-05" / "crawl_060003.json"
+    prom_path = tmp_path / "_metrics" / "crawl.prom"
+    write_json_report(report, str(json_path))
+    write_prometheus(report, str(prom_path))
+
+    assert json.loads(json_path.read_text(encoding="utf-8")) == report
+    assert prom_path.read_text(encoding="utf-8") == prometheus_text(report)
+    assert sorted(os.listdir(tmp_path / "_metrics")) == ["2026-01-05", "crawl.prom"]
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+from crawl_scheduler import CrawlScheduler, host_slot
+
+URL = "http://erp.local/?_m=LoadData"
+
+
+def request():
+    with host_slot(URL):
+        return "ok"
+
+
+def test_second_scheduler_keeps_the_first_schedulers_slots():
+    held, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with host_slot(URL):
+            held.set()
+            release.wait(5)
+
+    with CrawlScheduler(max_workers=2, per_host=1) as first:
+        first.submit("holder", hold_slot)
+        assert held.wait(5)
+
+        # e.g. the fallback pass: its own slots, free while the first is busy
+        with CrawlScheduler(max_workers=1, per_host=1) as second:
+            second.submit("fallback", request)
+            assert second.join() == {"fallback": "ok"}
+
+        # ... and the first scheduler's only slot for the host is still taken
+        assert not first.host_slots.slot_for(URL).acquire(timeout=0.05)
+        release.set()
+        first.join()
+    assert first.host_slots.slot_for(URL).acquire(timeout=0.05)
+
+
+def test_page_threads_share_the_endpoint_schedulers_slots():
+    with CrawlScheduler(max_workers=1, per_host=1) as scheduler:
+        slot = scheduler.host_slots.slot_for(URL)
+
+        def endpoint():
+            # Page pool as in fetch_datatables_parallel
+            def page():
+                with host_slot(URL):
+                    return slot.acquire(blocking=False)
+
+            with ThreadPoolExecutor(2) as pages:
+                return pages.submit(copy_context().run, page).result()
+
+        scheduler.submit("endpoint", endpoint)
+        assert scheduler.join() == {"endpoint": False}   # the page held the only slot
+
+
+def test_first_failure_is_raised():
+    def boom():
+        raise ValueError("page lost")
+
+    with pytest.raises(RuntimeError, match="endpoint: bad"):
+        with CrawlScheduler(max_workers=2) as scheduler:
+            scheduler.submit("bad", boom)
+            scheduler.join()
@@ -0,0 +1,208 @@
+import json
+import os
+import time
+
+import pytest
+import requests
+
+HANDLER = "ManagePrintingsOfMer"   # DataTables endpoint of the mock
+
+
+@pytest.fixture
+def cfg(mock_server):
+    return {
+        "name": "test_treatment",
+        "group": "TREATMENT",
+        "page_url": f"{mock_server.base_url}/app",
+        "json_url": f"{mock_server.base_url}/?_n=Core.Sites.Apps&_o=Mock.{HANDLER}&_m=LoadData",
+        "spec": "TREATMENT",
+    }
+
+
+@pytest.fixture
+def mock_rows(mock_server):
+    return mock_server.erp.endpoints[HANDLER]["rows"]
+
+
+@pytest.fixture
+def slow_first_pages(crawler, monkeypatch):
+    """Later offsets answer first, so pages complete out of order."""
+    fetch_page = crawler.fetch_datatables_page
+
+    def fetch(session, json_url, endpoint, draw, start, page_size):
+        time.sleep(max(0.0, 0.05 - start / 100_000))
+        return fetch_page(session, json_url, endpoint, draw, start, page_size)
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", fetch)
+
+
+# ==================== PARALLEL PAGES ====================
+
+def test_parallel_pages_keep_offset_order(crawler, cfg, erp_session, mock_rows, slow_first_pages):
+    endpoint = crawler.compile_endpoint(cfg)
+    rows = []
+    fetched = crawler.fetch_datatables_parallel(
+        erp_session, cfg["json_url"], endpoint, rows.extend, page_size=300, concurrency=4,
+    )
+    assert fetched == len(mock_rows)
+    assert rows == mock_rows
+
+
+def test_parallel_pages_match_sequential(crawler, cfg, erp_session):
+    endpoint = crawler.compile_endpoint(cfg)
+    sequential, parallel = [], []
+    crawler.fetch_datatables_all(erp_session, cfg["json_url"], endpoint, sequential.extend,
+                                 page_size=700, concurrency=1)
+    crawler.fetch_datatables_all(erp_session, cfg["json_url"], endpoint, parallel.extend,
+                                 page_size=700, concurrency=3)
+    assert parallel == sequential
+
+
+def test_parallel_row_count_mismatch_raises(crawler, cfg, erp_session, monkeypatch):
+    fetch_page = crawler.fetch_datatables_page
+
+    def short_page(session, json_url, endpoint, draw, start, page_size):
+        rows, total = fetch_page(session, json_url, endpoint, draw, start, page_size)
+        return (rows[:-1] if start == 600 else rows), total
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", short_page)
+    endpoint = crawler.compile_endpoint(cfg)
+    with pytest.raises(RuntimeError, match="Row count mismatch"):
+        crawler.fetch_datatables_parallel(
+            erp_session, cfg["json_url"], endpoint, lambda rows: None,
+            page_size=300, concurrency=4,
+        )
+
+
+def test_parallel_page_error_cancels_queued_pages(crawler, monkeypatch):
+    requested = []
+
+    def fetch(session, json_url, endpoint, draw, start, page_size):
+        requested.append(start)
+        if start == 10:
+            raise requests.ConnectionError("page lost")
+        time.sleep(0.02)
+        return [start] * page_size, 1000
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", fetch)
+    with pytest.raises(requests.ConnectionError):
+        crawler.fetch_datatables_parallel(None, "url", None, lambda rows: None,
+                                          page_size=10, concurrency=2)
+    assert len(requested) < 100
+
+
+def test_parallel_progress_printed_once_per_page(crawler, cfg, erp_session, slow_first_pages, capsys):
+    endpoint = crawler.compile_endpoint(cfg)
+    crawler.fetch_datatables_parallel(
+        erp_session, cfg["json_url"], endpoint, lambda rows: None, page_size=1000, concurrency=4,
+    )
+    lines = [l.strip() for l in capsys.readouterr().out.splitlines() if "fetched" in l]
+    assert lines == [f"fetched {n} / 5000" for n in range(1000, 5001, 1000)]
+
+
+# ==================== CRAWL PLAN ====================
+
+def test_size_probe_measures_the_pruned_row(crawler, cfg, erp_session, monkeypatch):
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    rows, row_bytes = crawler.probe_endpoint_size(cfg, erp_session)
+    _, full_row_bytes = crawler.probe_endpoint_size(cfg, erp_session, full_fidelity=True)
+    assert row_bytes < full_row_bytes
+
+    # Same columns as the snapshot the crawl writes
+    assert crawler.crawl_endpoint(cfg, erp_session) == rows
+    snapshot_path = crawler.get_snapshot_path(cfg)
+    try:
+        assert rows * row_bytes == pytest.approx(os.path.getsize(snapshot_path), rel=0.1)
+    finally:
+        os.remove(snapshot_path)
+
+
+# ==================== RESUME FROM CHECKPOINT ====================
+
+def test_resume_continues_from_last_committed_page(crawler, cfg, erp_session, mock_rows,
+                                                   monkeypatch, tmp_path):
+    monkeypatch.setattr(crawler, "PAGE_CONCURRENCY", 1)
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    snapshot_path = crawler.get_snapshot_path(cfg)
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    fetch_page = crawler.fetch_datatables_page
+    requested = []
+
+    def failing_third_page(session, json_url, endpoint, draw, start, page_size):
+        if start == 2 * crawler.PAGE_SIZE:
+            raise requests.ConnectionError("connection dropped")
+        return fetch_page(session, json_url, endpoint, draw, start, page_size)
+
+    def recording(session, json_url, endpoint, draw, start, page_size):
+        requested.append(start)
+        return fetch_page(session, json_url, endpoint, draw, start, page_size)
+
+    # First run dies on the third page: two pages committed, no snapshot yet
+    monkeypatch.setattr(crawler, "fetch_datatables_page", failing_third_page)
+    checkpoint = crawler.CrawlCheckpoint(checkpoint_path, "2026-01-05")
+    with pytest.raises(requests.ConnectionError):
+        crawler.crawl_endpoint(cfg, erp_session, checkpoint=checkpoint, full_fidelity=True)
+
+    entry = checkpoint.get(cfg["name"])
+    assert entry["status"] == "in_progress"
+    assert entry["next_start"] == entry["rows"] == 2 * crawler.PAGE_SIZE
+    assert not os.path.exists(snapshot_path)
+
+    # --resume only asks for the remaining page
+    monkeypatch.setattr(crawler, "fetch_datatables_page", recording)
+    checkpoint = crawler.CrawlCheckpoint(checkpoint_path, "2026-01-05", resume=True)
+    rows = crawler.crawl_endpoint(cfg, erp_session, checkpoint=checkpoint, full_fidelity=True)
+
+    assert requested == [2 * crawler.PAGE_SIZE]
+    assert rows == len(mock_rows)
+    assert list(crawler.iter_snapshot_rows(snapshot_path)) == mock_rows
+    assert checkpoint.is_done(cfg["name"])
+
+
+def test_checkpoint_of_another_day_is_not_resumed(crawler, cfg, erp_session, mock_rows,
+                                                  monkeypatch, tmp_path):
+    monkeypatch.setattr(crawler, "PAGE_CONCURRENCY", 1)
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    fetch_page = crawler.fetch_datatables_page
+    requested = []
+
+    def failing_third_page(session, json_url, endpoint, draw, start, page_size):
+        if start == 2 * crawler.PAGE_SIZE:
+            raise requests.ConnectionError("connection dropped")
+        return fetch_page(session, json_url, endpoint, draw, start, page_size)
+
+    def recording(session, json_url, endpoint, draw, start, page_size):
+        requested.append(start)
+        return fetch_page(session, json_url, endpoint, draw, start, page_size)
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", failing_third_page)
+    checkpoint = crawler.CrawlCheckpoint(checkpoint_path, "2026-01-05")
+    with pytest.raises(requests.ConnectionError):
+        crawler.crawl_endpoint(cfg, erp_session, checkpoint=checkpoint, full_fidelity=True)
+
+    # Next day's --resume: yesterday's pages are dropped, the crawl starts over
+    monkeypatch.setattr(crawler, "fetch_datatables_page", recording)
+    checkpoint = crawler.CrawlCheckpoint(checkpoint_path, "2026-01-06", resume=True)
+    assert checkpoint.get(cfg["name"]) == {}
+    with open(checkpoint_path, encoding="utf-8") as f:
+        assert json.load(f)["run_date"] == "2026-01-06"
+
+    rows = crawler.crawl_endpoint(cfg, erp_session, checkpoint=checkpoint, full_fidelity=True)
+
+    assert requested == [0, crawler.PAGE_SIZE, 2 * crawler.PAGE_SIZE]
+    assert rows == len(mock_rows)
+    assert list(crawler.iter_snapshot_rows(crawler.get_snapshot_path(cfg))) == mock_rows
+
+
+def test_login_page_requires_browser(crawler, cfg):
+    # The probe treats a login page as "needs browser", not as a transient error
+    endpoint = crawler.compile_endpoint(cfg)
+    resp = crawler.erp_post(requests.Session(), cfg["json_url"], **endpoint.request_kwargs(1, 0, 10))
+    with pytest.raises(crawler.InvalidResponse) as err:
+        crawler.decode_json(resp)
+    assert crawler.requires_browser(err.value)
+    assert not crawler.requires_browser(requests.ConnectionError("timeout"))
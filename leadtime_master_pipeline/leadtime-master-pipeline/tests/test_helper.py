@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import helper
+
+BRANDS = [
+    "REISS LTD", "Reiss Ltd.", "  reiss  ltd ", "J. BARBOUR & SONS", "J.Barbour & Sons Ltd",
+    "KITH", "Kith NYC", "STUSSY", "Golf Wang LLC", "PALACE", "", "Ünïcode Brand", "123",
+]
+
+
+def test_normalize_brand_column_matches_apply():
+    rng = np.random.default_rng(7)
+    values = pd.Series(rng.choice(np.array(BRANDS, dtype=object), 2000), name="BRAND_NAME")
+    values[::97] = None
+    values[::101] = np.nan
+
+    expected = values.apply(helper.normalize_brand)
+    result = helper.normalize_brand_column(values)
+
+    pd.testing.assert_series_equal(result, expected.astype(object))
+
+
+def test_normalize_brand_column_keeps_index_and_nulls():
+    values = pd.Series(["Kith", None, "KITH", np.nan], index=[10, 20, 30, 40])
+    result = helper.normalize_brand_column(values)
+    assert list(result.index) == [10, 20, 30, 40]
+    assert result[10] == result[30] == helper.normalize_brand("Kith")
+    assert result[20] is None
+    assert pd.isna(result[40])
+
+
+def test_clean_drop_column_matches_apply():
+    values = pd.Series(["Drop 1, Drop (2)", "DROP 3", None, "Drop 1, Drop (2)", ""] * 50)
+    pd.testing.assert_series_equal(
+        helper.clean_drop_column(values),
+        values.apply(helper.clean_drop).astype(object),
+    )
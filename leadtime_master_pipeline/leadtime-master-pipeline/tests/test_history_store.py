@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from ingestion.raw_storage import history_store
+
+
+def _rows(n, first=0):
+    return [{"Row": i + 1, "PoCode": f"PO-{first + i:06d}", "Qty": i} for i in range(n)]
+
+
+@pytest.fixture
+def raw_root(tmp_path):
+    return tmp_path / "ERP_RAW"
+
+
+@pytest.fixture
+def snapshot(raw_root):
+    return raw_root / "PO_LIST" / "JSON" / "fabricpotabsofpurpoitems.json"
+
+
+def _as_of(raw_root, as_of):
+    root = history_store.history_root(raw_root)
+    return list(history_store.iter_rows_as_of(root, "PO_LIST", "fabricpotabsofpurpoitems.json", as_of))
+
+
+def test_round_trip_as_of(raw_root, snapshot, write_snapshot):
+    day1 = _rows(3000)
+    day2 = _rows(2000, first=5000)
+    write_snapshot(snapshot, day1)
+    history_store.archive_snapshot(raw_root, snapshot, "PO_LIST", "2026-01-05")
+    write_snapshot(snapshot, day2)
+    history_store.archive_snapshot(raw_root, snapshot, "PO_LIST", "2026-01-07")
+
+    def without_row(rows):
+        return [{k: v for k, v in r.items() if k != "Row"} for r in rows]
+
+    assert _as_of(raw_root, "2026-01-05") == without_row(day1)
+    assert _as_of(raw_root, date(2026, 1, 6)) == without_row(day1)
+    assert _as_of(raw_root, "2026-01-31") == without_row(day2)
+    with pytest.raises(FileNotFoundError):
+        _as_of(raw_root, "2026-01-01")
+
+
+def test_insert_keeps_later_chunks(raw_root, snapshot, write_snapshot):
+    rows = _rows(5000)
+    write_snapshot(snapshot, rows)
+    day1 = history_store.archive_snapshot(raw_root, snapshot, "PO_LIST", "2026-01-05")
+
+    # One row inserted at the top renumbers every "Row" below it
+    inserted = [{"PoCode": "PO-NEW", "Qty": -1}] + rows
+    write_snapshot(snapshot, [{**r, "Row": i + 1} for i, r in enumerate(inserted)])
+    day2 = history_store.archive_snapshot(raw_root, snapshot, "PO_LIST", "2026-01-06")
+
+    before = {digest for digest, _ in day1["chunks"]}
+    reused = [digest for digest, _ in day2["chunks"] if digest in before]
+    assert len(reused) == len(day2["chunks"]) - 1
+    assert day2["rows"] == 5001
+    assert day2["dropped_columns"] == ["Row"]
+
+
+def test_retention_and_compaction(raw_root, snapshot, write_snapshot):
+    for day, first in (("2025-11-03", 0), ("2025-11-20", 100), ("2026-01-02", 200), ("2026-01-05", 300)):
+        write_snapshot(snapshot, _rows(100, first))
+        history_store.archive_snapshot(raw_root, snapshot, "PO_LIST", day)
+
+    removed = history_store.apply_retention(raw_root, keep_days=30, keep_months=12, today=date(2026, 1, 10))
+    assert removed == ["2025-11-03"]   # 2025-11-20 is the last run of its month
+    assert history_store.compact(raw_root) > 0
+    assert _as_of(raw_root, "2025-11-30") == _as_of(raw_root, "2025-11-20")
+    assert len(_as_of(raw_root, "2026-01-05")) == 100
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+import requests
+
+from watermarks import WatermarkStore
+
+
+def _row(code, updated, qty=1):
+    return {"RequestCode": code, "UpdatedDate": f"2026-01-{updated:02d}T08:00:00", "Qty": qty}
+
+
+@pytest.fixture
+def cfg():
+    return {
+        "name": "test_incremental",
+        "group": "TREATMENT",
+        "page_url": "http://erp.local/app",
+        "json_url": "http://erp.local/?_n=Core.Sites.Apps&_o=Mock.IncrementalOfMer&_m=LoadData",
+        "spec": "TREATMENT",
+        "primary_key": "RequestCode",
+        "watermark_column": "UpdatedDate",
+    }
+
+
+@pytest.fixture
+def erp(crawler, cfg, monkeypatch):
+    """Fake DataTables endpoint: `erp.rows` sorted by UpdatedDate desc."""
+    class FakeERP:
+        rows = []
+        starts = []
+        fail_at = None
+
+    def fetch(session, json_url, endpoint, draw, start, page_size):
+        FakeERP.starts.append(start)
+        if FakeERP.fail_at is not None and start >= FakeERP.fail_at:
+            raise requests.ConnectionError("connection dropped")
+        return [dict(r) for r in FakeERP.rows[start:start + page_size]], len(FakeERP.rows)
+
+    monkeypatch.setattr(crawler, "fetch_datatables_page", fetch)
+    monkeypatch.setattr(crawler, "PAGE_CONCURRENCY", 1)
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    path = crawler.get_snapshot_path(cfg)
+    yield FakeERP
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _crawl(crawler, cfg, watermarks):
+    return crawler.crawl_endpoint(cfg, None, watermarks=watermarks, full_fidelity=True)
+
+
+def _snapshot(crawler, cfg):
+    return [(r["RequestCode"], r["Qty"]) for r in crawler.iter_snapshot_rows(crawler.get_snapshot_path(cfg))]
+
+
+def test_first_run_is_a_full_crawl_and_sets_the_watermark(crawler, cfg, erp, tmp_path):
+    erp.rows = [_row("C", 3), _row("B", 2), _row("A", 1)]
+    watermarks = WatermarkStore(str(tmp_path / "watermarks.json"))
+
+    assert _crawl(crawler, cfg, watermarks) == 3
+    assert _snapshot(crawler, cfg) == [("C", 1), ("B", 1), ("A", 1)]
+    assert watermarks.get(cfg["name"]).isoformat() == "2026-01-03T08:00:00"
+
+
+def test_changed_rows_replace_their_previous_version(crawler, cfg, erp, tmp_path):
+    erp.rows = [_row("C", 3), _row("B", 2), _row("A", 1)]
+    watermarks = WatermarkStore(str(tmp_path / "watermarks.json"))
+    _crawl(crawler, cfg, watermarks)
+
+    # D is new, B was edited; A and C are older than the watermark
+    erp.rows = [_row("D", 6), _row("B", 5, qty=9), _row("C", 3), _row("A", 1)]
+    erp.starts.clear()
+    assert _crawl(crawler, cfg, watermarks) == 4
+
+    # Fetched rows first, then the untouched rows of the previous snapshot
+    assert _snapshot(crawler, cfg) == [("D", 1), ("B", 9), ("C", 1), ("A", 1)]
+    assert erp.starts == [0]
+    assert watermarks.get(cfg["name"]).isoformat() == "2026-01-06T08:00:00"
+
+
+def test_watermark_only_advances_after_the_commit(crawler, cfg, erp, tmp_path):
+    erp.rows = [_row("B", 2), _row("A", 1)]
+    watermarks = WatermarkStore(str(tmp_path / "watermarks.json"))
+    _crawl(crawler, cfg, watermarks)
+
+    erp.rows = [_row("C", 7)] + erp.rows
+    erp.fail_at = 0
+    with pytest.raises(requests.ConnectionError):
+        _crawl(crawler, cfg, watermarks)
+
+    assert watermarks.get(cfg["name"]).isoformat() == "2026-01-02T08:00:00"
+    assert _snapshot(crawler, cfg) == [("B", 1), ("A", 1)]   # previous snapshot kept
+
+
+def test_missing_snapshot_falls_back_to_a_full_crawl(crawler, cfg, erp, tmp_path):
+    erp.rows = [_row("B", 2), _row("A", 1)]
+    watermarks = WatermarkStore(str(tmp_path / "watermarks.json"))
+    watermarks.update(cfg["name"], crawler.parse_erp_datetime("2026-01-02T08:00:00"))
+
+    # The watermark alone would skip A: without a snapshot to merge into, fetch everything
+    assert _crawl(crawler, cfg, watermarks) == 2
+    assert _snapshot(crawler, cfg) == [("B", 1), ("A", 1)]
+
+
+def test_paging_stops_at_the_first_page_older_than_the_watermark(crawler, cfg, erp):
+    erp.rows = [_row("F", 9), {"RequestCode": "X", "UpdatedDate": "n/a", "Qty": 1},
+                _row("E", 8), _row("D", 4), _row("C", 3), _row("B", 2), _row("A", 1)]
+    since = crawler.parse_erp_datetime("2026-01-05T00:00:00")
+    fresh = []
+
+    changed = crawler.fetch_datatables_since(None, cfg["json_url"], None, fresh.extend, since,
+                                             "UpdatedDate", page_size=2)
+
+    # Unparseable dates are kept; the page [C, B] is all older, paging stops there
+    assert [r["RequestCode"] for r in fresh] == ["F", "X", "E"]
+    assert changed == 3
+    assert erp.starts == [0, 2, 4]
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from transformation import transform_engine
+from transformation.module_runner import ModuleContext, WarmWorkerPool
+
+# Forked workers inherit the patched run_spec (forkserver / spawn ones would not)
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method"
+)
+
+
+def fake_run_spec(name, context):
+    """Modules by name: `context.raw_dir` is a temp folder the test reads."""
+    with open(os.path.join(context.raw_dir, f"{name}.pid"), "w") as f:
+        f.write(str(os.getpid()))
+    if name.startswith("ok"):
+        return "out.parquet"
+    if name == "exit3":
+        raise SystemExit(3)
+    if name == "boom":
+        raise ValueError("bad spec")
+    if name == "crash":
+        os._exit(7)
+    if name == "hang":
+        time.sleep(60)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(transform_engine, "run_spec", fake_run_spec)
+    with WarmWorkerPool(size=2, start_method="fork") as pool:
+        yield pool
+
+
+def _run(pool, name, tmp_path, cancel=None):
+    return pool.run(name, ModuleContext(name, str(tmp_path)), cancel)
+
+
+def _pid(tmp_path, name):
+    return int((tmp_path / f"{name}.pid").read_text())
+
+
+def test_exit_codes(pool, tmp_path):
+    assert _run(pool, "ok", tmp_path) == 0
+    assert _run(pool, "exit3", tmp_path) == 3
+    assert _run(pool, "boom", tmp_path) == 1
+
+
+def test_worker_is_reused_after_a_module(pool, tmp_path):
+    assert _run(pool, "ok-1", tmp_path) == 0
+    assert _run(pool, "boom", tmp_path) == 1      # an exception does not kill the worker
+    assert _run(pool, "ok-2", tmp_path) == 0
+    assert _pid(tmp_path, "ok-1") == _pid(tmp_path, "boom") == _pid(tmp_path, "ok-2")
+
+
+def test_crashed_worker_is_replaced(pool, tmp_path):
+    assert _run(pool, "ok-1", tmp_path) == 0
+    assert _run(pool, "crash", tmp_path) == 7
+    assert _run(pool, "ok-2", tmp_path) == 0
+
+    crashed = _pid(tmp_path, "crash")
+    assert crashed == _pid(tmp_path, "ok-1")
+    assert _pid(tmp_path, "ok-2") != crashed
+
+
+def test_cancel_terminates_the_running_module(pool, tmp_path):
+    cancel = threading.Event()
+    rc = []
+    runner = threading.Thread(target=lambda: rc.append(_run(pool, "hang", tmp_path, cancel)))
+    runner.start()
+
+    deadline = time.monotonic() + 10
+    while not (tmp_path / "hang.pid").exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    t0 = time.monotonic()
+    cancel.set()
+    runner.join(10)
+
+    assert rc == [1]
+    assert time.monotonic() - t0 < 5
+    hung = _pid(tmp_path, "hang")
+    with pytest.raises(ProcessLookupError):
+        os.kill(hung, 0)                         # terminated and reaped
+
+    # The pool goes on with a fresh worker
+    assert _run(pool, "ok", tmp_path) == 0
+    assert _pid(tmp_path, "ok") != hung
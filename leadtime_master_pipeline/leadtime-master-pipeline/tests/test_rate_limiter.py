@@ -0,0 +1,153 @@
+import itertools
+
+import pytest
+import requests
+
+import rate_limiter
+from rate_limiter import HostLimiter, retry_delay
+
+
+class Clock:
+    """Fake time.monotonic / time.sleep: sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+# ==================== HOST LIMITER ====================
+
+def test_burst_then_one_token_per_interval(clock):
+    limiter = HostLimiter(rate=2.0, burst=3)
+    waits = [limiter.acquire() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Tokens are reserved ahead: each caller queues behind the previous one
+    assert waits[3] == pytest.approx(0.5)
+    assert waits[4] == pytest.approx(0.5)
+    assert limiter.stats()["throttled"] == 2
+
+
+def test_rate_adapts_to_latency_and_errors(clock):
+    limiter = HostLimiter(rate=4.0, min_rate=0.5, max_rate=5.0, target_latency=1.0,
+                          increase_step=0.5)
+    limiter.record_success(0.2)
+    assert limiter.rate == 4.5
+    limiter.record_success(0.2)
+    limiter.record_success(0.2)
+    assert limiter.rate == 5.0                    # max_rate
+    for _ in range(10):
+        limiter.record_success(10.0)              # smoothed latency over 2x target
+    assert limiter.rate < 5.0 * 0.9
+    rate = limiter.rate
+    limiter.record_error()
+    assert limiter.rate == pytest.approx(max(0.5, rate * 0.5))
+    for _ in range(10):
+        limiter.record_error()
+    assert limiter.rate == 0.5                    # min_rate
+    assert limiter.stats()["errors"] == 11
+
+
+def test_retry_delay_backoff_and_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+    assert [retry_delay(a, 1.0, 30.0) for a in range(6)] == [1, 2, 4, 8, 16, 30]
+    assert retry_delay(0, 1.0, 30.0, retry_after="12") == 12
+    assert retry_delay(0, 1.0, 30.0, retry_after="600") == 30
+    assert retry_delay(3, 1.0, 30.0, retry_after="soon") == 8
+
+
+# ==================== erp_post RETRIES ====================
+
+def _response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp.url = "http://retry.local/?_m=LoadData"
+    resp._content = b"{}"
+    resp._content_consumed = True
+    return resp
+
+
+class FakeSession:
+    def __init__(self, *answers):
+        self.answers = iter(answers)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        answer = next(self.answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+_hosts = itertools.count()
+
+
+@pytest.fixture
+def url():
+    # A host of its own: RATE_LIMITER keeps per-host state for the whole session
+    return f"http://retry-{next(_hosts)}.local/?_m=LoadData"
+
+
+@pytest.fixture
+def sleeps(crawler, monkeypatch):
+    """Backoff delays chosen by erp_post; throttle waits are not counted, nothing sleeps."""
+    delays = []
+
+    def backoff(*args):
+        delays.append(retry_delay(*args))
+        return delays[-1]
+
+    monkeypatch.setattr(crawler.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(crawler, "retry_delay", backoff)
+    return delays
+
+
+def test_transient_failures_are_retried(crawler, url, sleeps):
+    session = FakeSession(
+        _response(503, {"Retry-After": "7"}),
+        requests.ConnectionError("reset"),
+        _response(200),
+    )
+    resp = crawler.erp_post(session, url)
+
+    assert resp.status_code == 200
+    assert session.calls == 3
+    assert sleeps[0] >= 7                         # Retry-After honoured
+    stats = crawler.RATE_LIMITER.for_url(url).stats()
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (3, 2, 2)
+
+
+def test_client_errors_are_not_retried(crawler, url, sleeps):
+    session = FakeSession(_response(404), _response(200))
+    with pytest.raises(requests.HTTPError):
+        crawler.erp_post(session, url)
+    assert session.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("failure, error", [
+    (lambda: _response(502), requests.HTTPError),
+    (lambda: requests.Timeout("read timeout"), requests.Timeout),
+])
+def test_retries_give_up_after_max_retries(crawler, url, sleeps, failure, error):
+    session = FakeSession(*(failure() for _ in range(crawler.MAX_RETRIES + 1)))
+    with pytest.raises(error):
+        crawler.erp_post(session, url)
+    assert session.calls == crawler.MAX_RETRIES + 1
+    assert len(sleeps) == crawler.MAX_RETRIES
@@ -0,0 +1,143 @@
+import os
+import sys
+import types
+
+import pytest
+
+from ingestion.raw_storage.run_manifest import RunManifest, manifest_path
+from storage import lake_uploader
+from transformation import supervisor
+
+HANDLER = "ManagePrintingsOfMer"   # read by the treatment task as TREATMENT/*
+
+
+@pytest.fixture
+def cfg(crawler, mock_server, monkeypatch):
+    monkeypatch.setattr(crawler, "CDC_ENABLED", False)
+    monkeypatch.setattr(crawler, "HISTORY_ENABLED", False)
+    cfg = {
+        "name": "test_treatment",
+        "group": "TREATMENT",
+        "page_url": f"{mock_server.base_url}/app",
+        "json_url": f"{mock_server.base_url}/?_n=Core.Sites.Apps&_o=Mock.{HANDLER}&_m=LoadData",
+        "spec": "TREATMENT",
+    }
+    yield cfg
+    path = crawler.get_snapshot_path(cfg)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@pytest.fixture
+def ran(monkeypatch, tmp_path):
+    """Supervisor on a raw root of its own; `ran` lists the tasks it started."""
+    ran = []
+
+    def run_task(name, cancel=None):
+        ran.append(name)
+        return 0
+
+    monkeypatch.setattr(supervisor, "RAW_DIR", str(tmp_path))
+    monkeypatch.setattr(supervisor, "STATE_PATH", str(tmp_path / "_state" / "supervisor_state.json"))
+    monkeypatch.setattr(supervisor, "run_task", run_task)
+    monkeypatch.delenv("PIPELINE_FORCE", raising=False)
+    return ran
+
+
+def _supervise(ran, *args):
+    ran.clear()
+    supervisor.main(["--runner", "subprocess", "--no-cache", "--jobs", "1", *args])
+    return list(ran)
+
+
+def test_crawler_and_supervisor_share_the_raw_root(crawler):
+    assert crawler.MANIFEST_PATH == manifest_path(supervisor.RAW_DIR)
+
+
+def test_unchanged_snapshot_is_skipped(crawler, cfg, erp_session, ran, mock_server, tmp_path):
+    manifest_file = manifest_path(str(tmp_path))
+
+    def crawl():
+        manifest = RunManifest(manifest_file, "2026-01-05")
+        crawler.crawl_endpoint(cfg, erp_session, manifest=manifest, full_fidelity=True)
+        return manifest.get(f"TREATMENT/{os.path.basename(crawler.get_snapshot_path(cfg))}")
+
+    assert crawl()["changed"]
+    assert "treatment" in _supervise(ran)
+
+    # Same rows again: same hash, the task is not run
+    assert not crawl()["changed"]
+    assert "treatment" not in _supervise(ran)
+    assert "treatment" in _supervise(ran, "--force")
+
+    rows = mock_server.erp.endpoints[HANDLER]["rows"]
+    first = rows[0]
+    rows[0] = {**first, "RequestCode": "CHANGED"}
+    try:
+        assert crawl()["changed"]
+        assert "treatment" in _supervise(ran)
+    finally:
+        rows[0] = first
+
+
+# ==================== UPLOADER ====================
+
+@pytest.fixture
+def azure(monkeypatch):
+    """Fake azure SDK; `azure.uploads` lists the destination paths written."""
+    uploads = []
+
+    class DataLakeFileClient:
+        def __init__(self, account_url, file_system_name, file_path, credential):
+            self.file_path = file_path
+
+        def upload_data(self, f, overwrite):
+            uploads.append(self.file_path)
+
+    identity = types.ModuleType("azure.identity")
+    identity.DefaultAzureCredential = lambda: None
+    datalake = types.ModuleType("azure.storage.filedatalake")
+    datalake.DataLakeFileClient = DataLakeFileClient
+    for name, module in [("azure", types.ModuleType("azure")),
+                         ("azure.storage", types.ModuleType("azure.storage")),
+                         ("azure.identity", identity),
+                         ("azure.storage.filedatalake", datalake)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setenv("ONELAKE_DFS_URL", "https://onelake.local")
+    monkeypatch.setenv("ONELAKE_FILE_SYSTEM", "workspace")
+    monkeypatch.delenv("PIPELINE_FORCE", raising=False)
+    return types.SimpleNamespace(uploads=uploads)
+
+
+def test_upload_is_skipped_while_the_fingerprint_is_unchanged(azure, tmp_path):
+    parquet = tmp_path / "raw_treatment.parquet"
+    parquet.write_bytes(b"PAR1")
+    dest = "lakehouse/Files/RAW_LEADTIME/TREATMENT/TREATMENT/raw_treatment.parquet"
+    fingerprint = {"inputs": {"TREATMENT/manageprintingsofmer.json": "aa"}, "spec": "s"}
+    manifest = RunManifest(manifest_path(str(tmp_path)))
+
+    assert lake_uploader.upload_file(str(parquet), dest, fingerprint, manifest)
+    # Recorded in the run manifest file, not next to the parquet
+    assert RunManifest(manifest.path).uploaded(dest) == fingerprint
+    assert sorted(os.listdir(tmp_path)) == ["_state", "raw_treatment.parquet"]
+
+    assert not lake_uploader.upload_file(str(parquet), dest, fingerprint, manifest)
+    assert lake_uploader.upload_file(str(parquet), dest, fingerprint, manifest, force=True)
+    changed = {**fingerprint, "inputs": {"TREATMENT/manageprintingsofmer.json": "bb"}}
+    assert lake_uploader.upload_file(str(parquet), dest, changed, manifest)
+    # No fingerprint (e.g. a subprocess task): always uploaded
+    assert lake_uploader.upload_file(str(parquet), dest, None, manifest)
+    assert azure.uploads == [dest] * 4
+
+
+def test_recorded_uploads_survive_the_next_crawl(tmp_path):
+    path = manifest_path(str(tmp_path))
+    crawl = RunManifest(path, "2026-01-05")      # crawler's copy, loaded first
+    RunManifest(path).record_upload("dest.parquet", {"inputs": {"A/a.json": "aa"}})
+
+    crawl.record("A/a.json", "a", "a.json", "aa", rows=1, nbytes=10)
+    crawl.save()
+
+    manifest = RunManifest(path)
+    assert manifest.uploaded("dest.parquet") == {"inputs": {"A/a.json": "aa"}}
+    assert manifest.get("A/a.json")["sha256"] == "aa"
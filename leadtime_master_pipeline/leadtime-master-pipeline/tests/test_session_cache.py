@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+session_cache = pytest.importorskip("session_cache")
+if session_cache.Fernet is None:
+    pytest.skip("cryptography not installed", allow_module_level=True)
+
+COOKIES = [{"name": "ASP.NET_SessionId", "value": "abc", "expires": -1}]
+
+
+@pytest.fixture(autouse=True)
+def no_keyring(monkeypatch):
+    monkeypatch.setattr(session_cache, "keyring", None)
+    monkeypatch.delenv(session_cache.KEY_ENV, raising=False)
+
+
+def test_round_trip_with_key_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv(session_cache.KEY_ENV, session_cache.Fernet.generate_key().decode())
+    path = str(tmp_path / "_state" / "erp_session.bin")
+
+    session_cache.save_session(path, COOKIES, "sid-1", max_age_seconds=3600)
+    cached = session_cache.load_session(path)
+
+    assert cached["cookies"] == COOKIES
+    assert cached["session_id"] == "sid-1"
+    assert os.listdir(tmp_path / "_state") == ["erp_session.bin"]   # no key next to it
+
+
+def test_without_key_nothing_is_cached(tmp_path):
+    path = str(tmp_path / "_state" / "erp_session.bin")
+    session_cache.save_session(path, COOKIES, "sid-1", max_age_seconds=3600)
+    assert not os.path.exists(tmp_path / "_state")
+    assert session_cache.load_session(path) is None
+
+
+def test_key_from_keyring(tmp_path, monkeypatch):
+    key = session_cache.Fernet.generate_key().decode()
+
+    class Keyring:
+        @staticmethod
+        def get_password(service, user):
+            assert (service, user) == (session_cache.KEYRING_SERVICE, session_cache.KEYRING_USER)
+            return key
+
+    monkeypatch.setattr(session_cache, "keyring", Keyring)
+    path = str(tmp_path / "erp_session.bin")
+    session_cache.save_session(path, COOKIES, "sid-2", max_age_seconds=3600)
+    assert session_cache.load_session(path)["session_id"] == "sid-2"
+
+
+def test_other_key_cannot_read_the_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / "erp_session.bin")
+    monkeypatch.setenv(session_cache.KEY_ENV, session_cache.Fernet.generate_key().decode())
+    session_cache.save_session(path, COOKIES, "sid-1", max_age_seconds=3600)
+
+    monkeypatch.setenv(session_cache.KEY_ENV, session_cache.Fernet.generate_key().decode())
+    assert session_cache.load_session(path) is None
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from ingestion.raw_storage import snapshot_cache
+
+ROWS = [
+    {"Code": "A", "CFC": 12345, "Qty": 1.5, "IsActive": True, "Note": None},
+    {"Code": "B", "CFC": None, "Qty": 2, "IsActive": False, "Note": "late"},
+    {"Code": "C", "CFC": 12347, "Qty": None, "IsActive": None, "Note": None},
+]
+# Snapshot rows are written with sorted keys
+EXPECTED = pd.DataFrame(ROWS)[sorted(ROWS[0])]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    root = tmp_path / "_cache"
+    monkeypatch.setenv(snapshot_cache.CACHE_ENV, str(root))
+    return root
+
+
+def test_typed_frame_matches_dataframe_of_rows(tmp_path, write_snapshot, cache_dir):
+    path = write_snapshot(tmp_path / "po.json", ROWS)
+
+    built = snapshot_cache.read_frame(path)
+    assert list(cache_dir.glob("*.typed.arrow"))
+    hit = snapshot_cache.read_frame(path)
+
+    for df in (built, hit):
+        pd.testing.assert_frame_equal(df, EXPECTED)
+        assert df.astype(str).equals(EXPECTED.astype(str))   # CFC "12345.0", Note "None"
+    assert list(snapshot_cache.read_frame(path, ["Code", "CFC"]).columns) == ["CFC", "Code"]
+
+
+def test_missing_keys_are_not_cached(tmp_path, write_snapshot, cache_dir):
+    rows = [{"Code": "A", "Note": "x"}, {"Code": "B"}, {"Code": "C", "Note": None}]
+    path = write_snapshot(tmp_path / "po.json", rows)
+
+    for _ in range(2):
+        df = snapshot_cache.read_frame(path)
+        # NaN for the missing key, None for the null: Arrow would merge them
+        assert df["Note"].astype(str).tolist() == ["x", "nan", "None"]
+    assert not list(cache_dir.glob("*.typed.arrow"))
+    assert list(cache_dir.glob("*.typed.skip"))
+
+
+def test_without_cache_dir_decodes_the_json(tmp_path, write_snapshot, monkeypatch):
+    monkeypatch.delenv(snapshot_cache.CACHE_ENV, raising=False)
+    path = write_snapshot(tmp_path / "po.json", ROWS)
+    pd.testing.assert_frame_equal(snapshot_cache.read_frame(path), EXPECTED)
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+
+def _url(mock_server, handler):
+    return f"{mock_server.base_url}/?_n=Core.Sites.Apps&_o=Mock.{handler}&_m=LoadData"
+
+
+def _response(body: bytes):
+    resp = requests.Response()
+    resp.raw = HTTPResponse(body=io.BytesIO(body), preload_content=False)
+    resp.status_code = 200
+    resp.url = "http://erp.local/?_m=LoadData"
+    return resp
+
+
+def _stream(crawler, resp, batch_size):
+    batches = []
+    count = crawler.stream_json_rows(resp, batches.append, batch_size=batch_size)
+    return count, batches
+
+
+@pytest.mark.parametrize("handler", ["StyleProductOfPlanning", "ManageFabricDevelopmentsOfMer"])
+def test_rows_arrive_in_batches(crawler, mock_server, erp_session, handler):
+    # "Data.objects" and "data" response shapes
+    rows = mock_server.erp.endpoints[handler]["rows"]
+    resp = erp_session.post(_url(mock_server, handler), stream=True)
+
+    count, batches = _stream(crawler, resp, batch_size=1200)
+
+    assert count == len(rows)
+    assert [len(b) for b in batches] == [1200, 1200, 1200, 1200, 200]
+    assert [r for b in batches for r in b] == rows
+
+
+def test_streamed_rows_match_the_whole_body_decode(crawler, mock_server, erp_session, monkeypatch):
+    url = _url(mock_server, "StyleProductOfPlanning")
+    _, streamed = _stream(crawler, erp_session.post(url, stream=True), batch_size=1000)
+
+    monkeypatch.setattr(crawler, "ijson", None)
+    _, decoded = _stream(crawler, erp_session.post(url, stream=True), batch_size=1000)
+
+    assert [r for b in streamed for r in b] == [r for b in decoded for r in b]
+
+
+def test_values_keep_their_json_types(crawler):
+    body = {"Data": {"objects": [{"q": 1.5, "n": 2, "s": "x", "z": None, "t": True,
+                                  "nested": {"k": [1, 2.25]}}, "scalar"]}}
+    count, batches = _stream(crawler, _response(json.dumps(body).encode()), batch_size=10)
+    assert count == 2
+    assert batches == [body["Data"]["objects"]]
+    assert type(batches[0][0]["q"]) is float
+
+
+def test_truncated_body_is_an_invalid_response(crawler):
+    batches = []
+    resp = _response(b'{"data": [{"Code": "A"}, {"Code": "B"}, {"Code": ')
+    with pytest.raises(crawler.InvalidResponse):
+        crawler.stream_json_rows(resp, batches.append, batch_size=1)
+    assert batches == [[{"Code": "A"}], [{"Code": "B"}]]   # callers abort the snapshot
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from transformation.task_graph import TaskGraph, TaskResult, print_timing
+
+
+def test_dependencies_run_first_and_independent_tasks_overlap():
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def run(name, cancel):
+        if name in ("a", "b"):
+            both_running.wait()            # a and b are in flight together
+        order.append(name)
+        return 0
+
+    graph = TaskGraph(["a", "b", "c"], {"c": ["a", "b"]})
+    result = graph.run(run, workers=2)
+
+    assert result.ok
+    assert order[-1] == "c"
+    assert result.returncodes == {"a": 0, "b": 0, "c": 0}
+
+
+def test_first_failure_cancels_running_and_pending_tasks():
+    b_started = threading.Event()
+    cancelled_b = []
+
+    def run(name, cancel):
+        if name == "a":
+            assert b_started.wait(5)
+            return 3
+        if name == "b":
+            b_started.set()
+            cancelled_b.append(cancel.wait(5))
+            return -15                     # terminated
+        return 0
+
+    graph = TaskGraph(["a", "b", "c", "d"], {"d": ["a"]})
+    result = graph.run(run, workers=2)
+
+    assert result.failed == "a"
+    assert result.returncodes == {"a": 3, "b": -15}
+    assert cancelled_b == [True]
+    assert result.cancelled == {"b", "c", "d"}
+
+
+def test_exception_in_a_task_is_a_failure():
+    def run(name, cancel):
+        raise RuntimeError("worker died")
+
+    result = TaskGraph(["a", "b"], {"b": ["a"]}).run(run)
+    assert (result.failed, result.returncodes) == ("a", {"a": 1})
+    assert result.cancelled == {"b"}
+
+
+def test_skipped_tasks_release_their_dependents():
+    ran = []
+
+    def run(name, cancel):
+        ran.append(name)
+        return 0
+
+    graph = TaskGraph(["a", "b", "c"], {"b": ["a"], "c": ["b"]})
+    result = graph.run(run, skip=lambda name: name in ("a", "b"))
+
+    assert ran == ["c"]
+    assert result.skipped == {"a", "b"}
+    assert result.duration("a") == 0
+
+
+@pytest.mark.parametrize("deps, message", [
+    ({"a": ["b"], "b": ["a"]}, "dependency cycle"),
+    ({"a": ["z"]}, "unknown task dependencies"),
+])
+def test_invalid_graphs_are_rejected(deps, message):
+    with pytest.raises(ValueError, match=message):
+        TaskGraph(["a", "b"], deps)
+
+
+# ==================== CRITICAL PATH ====================
+
+def _result(spans):
+    result = TaskResult()
+    for name, (start, end) in spans.items():
+        result.started[name], result.finished[name] = start, end
+        result.returncodes[name] = 0
+    return result
+
+
+def test_critical_path_is_the_longest_dependent_chain():
+    graph = TaskGraph(["a", "b", "c", "d"], {"b": ["a"], "d": ["b", "c"]})
+    # a -> b -> d takes 3 + 1 + 1 = 5s, c -> d takes 5 + 1 = 6s
+    result = _result({"a": (0, 3), "b": (3, 4), "c": (0, 5), "d": (5, 6)})
+    assert graph.critical_path(result) == ["c", "d"]
+
+    result = _result({"a": (0, 3), "b": (3, 6), "c": (0, 5), "d": (6, 7)})
+    assert graph.critical_path(result) == ["a", "b", "d"]
+
+
+def test_critical_path_of_a_graph_without_dependencies():
+    graph = TaskGraph(["a", "b"])
+    assert graph.critical_path(_result({"a": (0, 1), "b": (0, 2)})) == ["b"]
+    assert graph.critical_path(TaskResult()) == ["a"]      # nothing ran: 0s each
+
+
+def test_timing_table(capsys):
+    graph = TaskGraph(["a", "b", "c", "d"], {"b": ["a"]})
+    result = _result({"a": (0, 3), "b": (3, 4)})
+    result.returncodes["b"] = 2
+    result.failed = "b"
+    result.skipped.add("c")
+    result.started["c"] = result.finished["c"] = 0.0
+    result.cancelled.add("d")
+
+    print_timing(graph, result)
+    out = capsys.readouterr().out
+    statuses = {line.split()[0]: line.rsplit("  ", 1)[-1] for line in out.splitlines()
+                if line.split() and line.split()[0] in graph.tasks}
+    assert statuses == {"a": "ok", "b": "failed (2)", "c": "skipped", "d": "cancelled"}
+    assert "critical path: a -> b (4.0s)" in out
@@ -0,0 +1,235 @@
+"""
+Pre-warmed worker processes for the transformation tasks.
+
+Each task is a spec of config/transform_specs.py, built by
+`transform_engine.run_spec(name, context)`. Instead of a fresh interpreter
+per task - re-importing pandas, pyarrow, the azure SDK and helper every
+time - the supervisor keeps up to `--jobs` worker processes that import
+PREWARM_IMPORTS once and then run tasks one after another:
+
+- forkserver (Linux / macOS): the fork server preloads PREWARM_IMPORTS,
+  workers are forked from it already warm
+- spawn (Windows): each worker imports them once when it starts
+
+Module output is prefixed with the module name, as in subprocess mode.
+A worker whose module gets cancelled (another module failed) or dies is
+terminated and replaced by a new one on demand.
+
+    with WarmWorkerPool(size=4) as pool:
+        rc = pool.run("treatment", ModuleContext("treatment", raw_dir), cancel)
+"""
+
+from __future__ import annotations
+import gc
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+PIPELINE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# helper.py / helper_phase1.py, imported by the engine as top-level modules
+HELPER_DIR = os.path.join(PIPELINE_ROOT, "ingestion", "crawler")
+
+PREWARM_IMPORTS = [
+    "pandas",
+    "pyarrow",
+    "pyarrow.parquet",
+    "azure.core.credentials",
+    "azure.identity",
+    "azure.storage.filedatalake",
+    "helper",
+    "helper_phase1",
+    "transformation.transform_engine",
+]
+
+POLL_SECONDS = 0.5
+
+
+class ModuleContext:
+    """What run_spec() gets from the supervisor."""
+
+    def __init__(self, name: str, raw_dir: str, force: bool = False, fingerprint=None):
+        self.name = name
+        self.raw_dir = raw_dir
+        self.force = force
+        # Supervisor's task fingerprint; the uploader skips a re-upload with the same one
+        self.fingerprint = fingerprint
+
+
+def default_start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def ensure_helper_path() -> None:
+    # Appended, not inserted: the crawler folder must not shadow anything
+    if HELPER_DIR not in sys.path:
+        sys.path.append(HELPER_DIR)
+    if PIPELINE_ROOT not in sys.path:
+        sys.path.insert(0, PIPELINE_ROOT)
+
+
+def prewarm() -> None:
+    """Import the heavy libraries once; missing optional ones are skipped."""
+    ensure_helper_path()
+    for name in PREWARM_IMPORTS:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+# ==================== WORKER PROCESS ====================
+
+class _PrefixWriter:
+    """Text stream that prefixes every line with `[tag] `."""
+
+    def __init__(self, stream, tag: str):
+        self.stream = stream
+        self.tag = tag
+        self._at_line_start = True
+
+    def write(self, text: str) -> int:
+        out = []
+        for line in text.splitlines(keepends=True):
+            if self._at_line_start:
+                out.append(f"[{self.tag}] ")
+            out.append(line)
+            self._at_line_start = line.endswith("\n")
+        self.stream.write("".join(out))
+        if "\n" in text:
+            self.stream.flush()   # modules of other workers print in between
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def run_module(name: str, context: ModuleContext) -> int:
+    """Build spec `name` with transform_engine.run_spec(); exit code."""
+    out = _PrefixWriter(sys.stdout, name)
+    try:
+        with redirect_stdout(out), redirect_stderr(out):
+            try:
+                engine = importlib.import_module("transformation.transform_engine")
+                engine.run_spec(name, context)
+                return 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    return e.code or 0
+                print(e.code)
+                return 1
+            except Exception:
+                traceback.print_exc()
+                return 1
+    finally:
+        out.flush()
+        gc.collect()
+
+
+def _worker_main(conn) -> None:
+    prewarm()
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+        name, context = msg
+        conn.send(run_module(name, context))
+
+
+# ==================== POOL ====================
+
+class _Worker:
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, terminate=False) -> None:
+        if not terminate:
+            try:
+                self.conn.send(None)
+            except OSError:
+                terminate = True
+        if terminate:
+            self.process.terminate()
+        self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WarmWorkerPool:
+    """
+    Up to `size` warm workers, started on demand. `run()` is called from the
+    supervisor's scheduler threads, one module per call.
+    """
+
+    def __init__(self, size: int, start_method: str | None = None):
+        ensure_helper_path()
+        self.size = max(1, int(size))
+        self.start_method = start_method or default_start_method()
+        self._ctx = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            self._ctx.set_forkserver_preload(PREWARM_IMPORTS)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _take(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self._ctx)
+
+    def _give_back(self, worker: _Worker) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def run(self, name: str, context: ModuleContext, cancel: threading.Event | None = None) -> int:
+        """Run one module in a warm worker; the worker is killed if `cancel` is set meanwhile."""
+        worker = self._take()
+        worker.conn.send((name, context))
+        while True:
+            if worker.conn.poll(POLL_SECONDS):
+                try:
+                    rc = worker.conn.recv()
+                except (EOFError, OSError):
+                    break
+                self._give_back(worker)
+                return rc
+            if not worker.process.is_alive():
+                break
+            if cancel is not None and cancel.is_set():
+                print(f"[CANCEL] {name}: another module failed, terminating")
+                worker.stop(terminate=True)
+                return 1
+
+        # Worker died (os._exit, crash): do not reuse it
+        worker.stop(terminate=True)
+        rc = worker.process.exitcode
+        print(f"[ERROR] {name}: worker exited with code {rc}")
+        return rc or 1
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
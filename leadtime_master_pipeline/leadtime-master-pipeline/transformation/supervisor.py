@@ -1,43 +1,246 @@
 """
 Supervisor Transformation (Portfolio Version)
 
-Orchestrates transformation modules in deterministic order.
-Runs each module in a separate process and stops on first failure.
+Builds the bronze tables declared in config/transform_specs.py (one task
+per spec, run by transformation/transform_engine.py) along a declared
+dependency graph (TASK_DEPS). Independent modules run concurrently (`--jobs`, default:
+cores capped by available memory / MODULE_MEMORY_MB). On the first failure
+no further module is started and the running ones are terminated. A
+timing table with the critical path is printed at the end.
+
+Tasks run through `run_spec(name, context)` in pre-warmed worker processes
+(transformation/module_runner.py) that import pandas / pyarrow / azure /
+helper once. Tasks in ISOLATED_TASKS, `--isolate NAME` or everything with
+`--runner subprocess` run in a fresh interpreter.
+
+A task is skipped when its raw inputs (content hashes from the crawler's
+run manifest), its spec and the engine source are the same as at its last
+successful run. A task's upload is skipped when the run manifest records
+the same fingerprint for its destination (warm workers only; a subprocess
+task always uploads). `--force` (or PIPELINE_FORCE=1) runs everything and
+re-uploads.
+
+Snapshots are parsed once per run: the first task that reads one stores it
+in ERP_RAW/_cache/<run> (ingestion/raw_storage/snapshot_cache.py), later
+tasks memory-map it. The folder is removed when the run ends.
 """
 
 from __future__ import annotations
+import argparse
+import hashlib
+import os
+import shutil
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
-MODULE_DIR = Path(__file__).parent / "modules"
-
-TASKS = [
-    "manageliststyleoforder.py",
-    "managepurchaseorder.py",
-    "styleproductofplanning.py",
-    "mastergroupfabricpotabsofplanning_mastergrouppoitems.py",
-    "fabric_trim.py",
-    "treatment.py",
-    "technical.py",
-    "costing.py",
-    "cuttingdocket.py",
-    "managecostingsheetclient.py",
-]
-
-def run_task(name: str) -> int:
-    path = MODULE_DIR / name
+PIPELINE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PIPELINE_ROOT))
+
+from ingestion.raw_storage.run_manifest import RunManifest, HashLedger, manifest_path
+from ingestion.raw_storage.snapshot_cache import CACHE_ENV
+from config.column_registry import module_snapshots
+from config.paths import RAW_ROOT
+from config.transform_specs import TRANSFORM_SPECS
+from transformation.task_graph import TaskGraph, default_workers, print_timing
+from transformation.module_runner import WarmWorkerPool, ModuleContext, HELPER_DIR
+
+RAW_DIR = RAW_ROOT
+STATE_PATH = os.path.join(RAW_DIR, "_state", "supervisor_state.json")
+CACHE_ROOT = os.path.join(RAW_DIR, "_cache")
+
+TASKS = list(TRANSFORM_SPECS)
+
+# Modules that must finish before another one starts. Modules read disjoint
+# raw groups and write disjoint ERP_PARQUET/<GROUP>/<TABLE> folders except:
+TASK_DEPS = {
+    # Both write RAW_DATA/PURCHASE_ORDER/raw_managepurchaseorder.parquet;
+    # the costing sheet version is the one that ends up uploaded
+    "managecostingsheetclient": ["managepurchaseorder"],
+}
+
+# Peak memory budget of one module process (pandas frame + parquet write)
+MODULE_MEMORY_MB = int(os.getenv("SUPERVISOR_MODULE_MEMORY_MB", "1500"))
+TERMINATE_TIMEOUT = 10   # seconds between terminate() and kill() on cancel
+
+# Modules that always get their own interpreter (subprocess), e.g. one that
+# leaks memory or changes global state other modules would see
+ISOLATED_TASKS: set[str] = set()
+
+# Raw snapshots each module reads ("<GROUP>/<file>" keys of the run manifest)
+TASK_INPUTS = {t: module_snapshots(t) for t in TASKS}
+
+def spec_sha256(name: str) -> str:
+    return hashlib.sha256(repr(TRANSFORM_SPECS[name]).encode("utf-8")).hexdigest()
+
+def source_sha256(*parts: str) -> str:
+    return hashlib.sha256(PIPELINE_ROOT.joinpath(*parts).read_bytes()).hexdigest()
+
+# Select lists live in the column registry, the steps in the engine: a
+# change there reruns the tasks too
+REGISTRY_SHA256 = source_sha256("config", "column_registry.py")
+ENGINE_SHA256 = source_sha256("transformation", "transform_engine.py")
+
+def task_fingerprint(name: str, manifest: RunManifest) -> dict | None:
+    """Input hashes + spec / engine / registry hash; None when the inputs are unknown."""
+    inputs = manifest.fingerprint(TASK_INPUTS.get(name, []))
+    if not inputs:
+        return None
+    return {
+        "inputs": inputs,
+        "spec": spec_sha256(name),
+        "engine": ENGINE_SHA256,
+        "registry": REGISTRY_SHA256,
+    }
+
+def _forward_output(proc, tag: str) -> None:
+    # One module's output, line by line, prefixed (modules run interleaved)
+    for line in proc.stdout:
+        print(f"[{tag}] {line}", end="", flush=True)
+
+def _banner(name: str, how: str) -> None:
     print(f"\n============================")
-    print(f"[RUN] {name}")
-    print(f"============================")
-    return subprocess.run([sys.executable, str(path)]).returncode
-
-def main() -> None:
-    for t in TASKS:
-        rc = run_task(t)
-        if rc != 0:
-            print("\n[STOP] Supervisor halted due to failure:", t)
-            raise SystemExit(rc)
+    print(f"[RUN] {name} ({how})")
+    print(f"============================", flush=True)
+
+def run_task(name: str, cancel: threading.Event | None = None) -> int:
+    """Run one task as a process; terminated if `cancel` is set meanwhile."""
+    _banner(name, "subprocess")
+
+    # helper / helper_phase1 live in ingestion/crawler
+    pythonpath = os.pathsep.join(p for p in (os.getenv("PYTHONPATH"), HELPER_DIR) if p)
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-m", "transformation.transform_engine", name],
+        cwd=str(PIPELINE_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env={**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONPATH": pythonpath,
+             "RAW_OUTPUT_PATH": RAW_DIR},
+    )
+    reader = threading.Thread(target=_forward_output, args=(proc, name), daemon=True)
+    reader.start()
+
+    while True:
+        try:
+            rc = proc.wait(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel is None or not cancel.is_set():
+                continue
+        print(f"[CANCEL] {name}: another module failed, terminating")
+        proc.terminate()
+        try:
+            rc = proc.wait(timeout=TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            rc = proc.wait()
+        break
+
+    reader.join()
+    return rc
+
+def module_runner(pool: WarmWorkerPool | None, isolated: set, force: bool,
+                  fingerprints: dict | None = None):
+    """run_fn for TaskGraph: warm worker, or a subprocess for isolated tasks."""
+    fingerprints = fingerprints or {}
+
+    def run(name: str, cancel: threading.Event) -> int:
+        if pool is None or name in isolated:
+            return run_task(name, cancel)
+        _banner(name, f"warm worker, {pool.start_method}")
+        context = ModuleContext(name, RAW_DIR, force, fingerprints.get(name))
+        return pool.run(name, context, cancel)
+    return run
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the bronze tables (config/transform_specs.py)")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every module and re-upload, even if inputs are unchanged",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=int(os.getenv("SUPERVISOR_JOBS", "0")),
+        help="Modules run at the same time (1 = one after another; "
+             "default: cores, capped by available memory / MODULE_MEMORY_MB)",
+    )
+    parser.add_argument(
+        "--runner",
+        choices=["warm", "subprocess"],
+        default=os.getenv("SUPERVISOR_RUNNER", "warm"),
+        help="warm: run(context) in pre-warmed worker processes (default); "
+             "subprocess: a fresh interpreter per module",
+    )
+    parser.add_argument(
+        "--isolate",
+        nargs="*",
+        default=[],
+        metavar="MODULE",
+        help="Tasks (e.g. treatment) run in a fresh interpreter even with --runner warm",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every snapshot in each task instead of sharing one parsed copy per run",
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    force = args.force or os.getenv("PIPELINE_FORCE", "").strip().lower() in ("1", "true", "yes")
+    if force:
+        # Inherited by the module processes (lake_uploader re-uploads too)
+        os.environ["PIPELINE_FORCE"] = "1"
+
+    manifest = RunManifest(manifest_path(RAW_DIR))
+    ledger = HashLedger(STATE_PATH)
+    fingerprints = {t: task_fingerprint(t, manifest) for t in TASKS}
+
+    def skip(t):
+        if not force and ledger.is_current(t, fingerprints[t]):
+            print(f"\n[SKIP] {t}: inputs unchanged since last successful run")
+            return True
+        return False
+
+    graph = TaskGraph(TASKS, TASK_DEPS)
+    jobs = args.jobs if args.jobs > 0 else default_workers(MODULE_MEMORY_MB, len(TASKS))
+    isolated = ISOLATED_TASKS | {n[:-len(".py")] if n.endswith(".py") else n for n in args.isolate}
+    print(f"[INFO] running up to {jobs} module(s) at a time ({args.runner})")
+
+    # Run-scoped snapshot cache, inherited by workers and subprocesses. A
+    # SNAPSHOT_CACHE_DIR set by the caller is used as is and kept.
+    own_cache = None
+    if args.no_cache:
+        os.environ.pop(CACHE_ENV, None)
+    elif not os.getenv(CACHE_ENV):
+        own_cache = os.path.join(CACHE_ROOT, f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+        os.environ[CACHE_ENV] = own_cache
+
+    pool = WarmWorkerPool(jobs) if args.runner == "warm" else None
+    try:
+        result = graph.run(module_runner(pool, isolated, force, fingerprints), workers=jobs, skip=skip)
+    finally:
+        if pool is not None:
+            pool.close()
+        if own_cache is not None:
+            shutil.rmtree(own_cache, ignore_errors=True)
+
+    # Ledger is only touched from this thread
+    for t, rc in result.returncodes.items():
+        if rc == 0 and fingerprints[t] is not None:
+            ledger.update(t, fingerprints[t])
+
+    print_timing(graph, result)
+    if not result.ok:
+        print("\n[STOP] Supervisor halted due to failure:", result.failed)
+        raise SystemExit(result.returncodes[result.failed])
     print("\n[DONE] All transformation modules completed successfully.")
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""
+Dependency-aware runner for the transformation modules.
+
+Tasks form a DAG (`deps`: task -> tasks that must finish first). Ready
+tasks are started as soon as a worker is free, in declaration order;
+on the first failure nothing new is started, running siblings are
+cancelled through `cancel` (an Event the task function must honour) and
+the failure is returned.
+
+    graph = TaskGraph(TASKS, TASK_DEPS)
+    result = graph.run(run_fn, workers=4)       # run_fn(name, cancel) -> exit code
+    print_timing(graph, result)
+
+Worker count: `default_workers()` = min(cores, available memory / per-module budget).
+"""
+
+from __future__ import annotations
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def available_memory_bytes():
+    """Memory available for new processes (None if unknown)."""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_workers(module_memory_mb: int, max_tasks: int) -> int:
+    """Cores, capped by how many modules fit in the available memory."""
+    workers = os.cpu_count() or 1
+    available = available_memory_bytes()
+    if available is not None and module_memory_mb > 0:
+        workers = min(workers, available // (module_memory_mb * 1024 * 1024))
+    return max(1, min(int(workers), max_tasks))
+
+
+class TaskResult:
+    """Outcome of TaskGraph.run: per-task timings, exit codes, first failure."""
+
+    def __init__(self):
+        self.started = {}     # name -> seconds since run start
+        self.finished = {}
+        self.returncodes = {}
+        self.skipped = set()
+        self.cancelled = set()
+        self.failed = None    # name of the first failed task
+
+    @property
+    def ok(self) -> bool:
+        return self.failed is None
+
+    def duration(self, name) -> float:
+        return self.finished.get(name, 0.0) - self.started.get(name, 0.0)
+
+
+class TaskGraph:
+
+    def __init__(self, tasks, deps=None):
+        self.tasks = list(tasks)
+        self.deps = {t: list((deps or {}).get(t, [])) for t in self.tasks}
+        unknown = {d for ds in self.deps.values() for d in ds} - set(self.tasks)
+        if unknown:
+            raise ValueError(f"unknown task dependencies: {sorted(unknown)}")
+        self.topological_order()   # raises on cycles
+
+    def topological_order(self) -> list:
+        order, state = [], {}
+
+        def visit(t, path):
+            if state.get(t) == "done":
+                return
+            if state.get(t) == "visiting":
+                raise ValueError(f"dependency cycle: {' -> '.join(path + [t])}")
+            state[t] = "visiting"
+            for d in self.deps[t]:
+                visit(d, path + [t])
+            state[t] = "done"
+            order.append(t)
+
+        for t in self.tasks:
+            visit(t, [])
+        return order
+
+    def run(self, run_fn, workers=1, skip=None) -> TaskResult:
+        """
+        Run every task once its dependencies succeeded. `skip(name)` -> True
+        marks a task done without running it (unchanged inputs).
+        """
+        result = TaskResult()
+        cancel = threading.Event()
+        done = set()
+        pending = list(self.tasks)
+        running = {}
+        t0 = time.perf_counter()
+
+        def now():
+            return time.perf_counter() - t0
+
+        def ready(t):
+            return all(d in done for d in self.deps[t])
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="module") as pool:
+            while pending or running:
+                if not result.ok:
+                    result.cancelled.update(pending)
+                    pending.clear()
+
+                # Skipped tasks count as done at once and may release others
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for t in [t for t in pending if ready(t)]:
+                        if skip is not None and skip(t):
+                            pending.remove(t)
+                            done.add(t)
+                            result.skipped.add(t)
+                            result.started[t] = result.finished[t] = now()
+                            progressed = True
+                        elif len(running) < workers:
+                            pending.remove(t)
+                            result.started[t] = now()
+                            running[pool.submit(run_fn, t, cancel)] = t
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    t = running.pop(fut)
+                    result.finished[t] = now()
+                    try:
+                        rc = fut.result()
+                    except Exception as e:
+                        print(f"[ERROR] {t}: {e!r}")
+                        rc = 1
+                    result.returncodes[t] = rc
+                    if rc == 0:
+                        done.add(t)
+                    elif cancel.is_set():
+                        result.cancelled.add(t)
+                    else:
+                        result.failed = t
+                        cancel.set()
+        return result
+
+    # ==================== CRITICAL PATH ====================
+
+    def critical_path(self, result: TaskResult) -> list:
+        """Longest chain of dependent tasks by measured duration."""
+        best = {}   # task -> (chain seconds, chain)
+        for t in self.topological_order():
+            before = max((best[d] for d in self.deps[t]), key=lambda b: b[0], default=(0.0, []))
+            best[t] = (before[0] + result.duration(t), before[1] + [t])
+        return max(best.values(), key=lambda b: b[0], default=(0.0, []))[1]
+
+
+def print_timing(graph: TaskGraph, result: TaskResult) -> None:
+    """Start / end offsets per task and the critical path."""
+    print("\n===== TRANSFORMATION TIMING =====")
+    print(f"{'module':<58}{'start s':>9}{'end s':>9}{'took s':>9}  status")
+    for t in sorted(graph.tasks, key=lambda t: result.started.get(t, float("inf"))):
+        if t in result.skipped:
+            status = "skipped"
+        elif t in result.cancelled:
+            status = "cancelled"
+        elif t not in result.returncodes:
+            status = "not run"
+        else:
+            status = "ok" if result.returncodes[t] == 0 else f"failed ({result.returncodes[t]})"
+        if t in result.started:
+            print(f"{t:<58}{result.started[t]:>9.1f}{result.finished.get(t, 0.0):>9.1f}"
+                  f"{result.duration(t):>9.1f}  {status}")
+        else:
+            print(f"{t:<58}{'':>9}{'':>9}{'':>9}  {status}")
+
+    path = graph.critical_path(result)
+    wall = max(result.finished.values(), default=0.0)
+    serial = sum(result.duration(t) for t in graph.tasks)
+    print(f"critical path: {' -> '.join(path) or '-'} "
+          f"({sum(result.duration(t) for t in path):.1f}s)")
+    print(f"wall {wall:.1f}s, sum of modules {serial:.1f}s")
@@ -0,0 +1,206 @@
+"""
+Runs the bronze tables declared in config/transform_specs.py.
+
+One code path for every table: load -> select -> rename -> dates ->
+normalize -> explode -> map -> constants -> derive -> string-cast -> write
+parquet -> upload (storage.lake_uploader, optional).
+
+Vectorized where the modules went row by row:
+- normalizers / splitters run once per distinct value (helper.map_unique:
+  pd.factorize, then broadcast through the codes); brands, drops and colors
+  have a few hundred distinct values in a million rows. Brand names are
+  also memoized across tables (helper.normalize_brand_column)
+- explode is one DataFrame.explode per column
+- the string cast hands str columns to Arrow as they are (nulls -> "");
+  only columns holding other types go through fillna("").astype(str)
+
+Loads keep the modules' typing: pd.DataFrame(rows) for a snapshot, the
+pd.read_json(dtype=str) strings for the phase-1 folders. On the fixture
+snapshots of tests/test_transform_specs.py every table matches what its
+module wrote.
+
+    python -m transformation.transform_engine treatment costing
+    python -m transformation.transform_engine --list
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PIPELINE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# helper.py / helper_phase1.py live in ingestion/crawler (appended: must not shadow)
+HELPER_DIR = os.path.join(PIPELINE_ROOT, "ingestion", "crawler")
+if PIPELINE_ROOT not in sys.path:
+    sys.path.insert(0, PIPELINE_ROOT)
+if HELPER_DIR not in sys.path:
+    sys.path.append(HELPER_DIR)
+
+from config.transform_specs import TRANSFORM_SPECS
+from config.paths import RAW_ROOT
+from helper import (
+    load_json_to_df,
+    normalize_brand_column,
+    clean_drop_column,
+    split_and_clean_drop,
+    map_unique,
+    get_parquet_output_path,
+    module_columns,
+)
+from helper_phase1 import load_base_and_date_columns
+
+BASE_DIR = RAW_ROOT
+PARQUET_COMPRESSION = "snappy"
+
+# column -> column
+NORMALIZERS = {
+    "brand": normalize_brand_column,
+    "drop": clean_drop_column,
+}
+
+# value -> list of values (one output row each)
+SPLITTERS = {
+    "drop": split_and_clean_drop,
+}
+
+
+# ==================== DERIVED COLUMNS ====================
+
+def derive_yymmdd(values: pd.Series) -> pd.Series:
+    """'PO-250314-001' -> 2025-03-14; NaT without a valid -yymmdd- part."""
+    date6 = values.str.extract(r"-(\d{6})-", expand=False)
+    return pd.to_datetime("20" + date6, format="%Y%m%d", errors="coerce")
+
+
+DERIVERS = {
+    "yymmdd": derive_yymmdd,
+}
+
+
+# ==================== STEPS ====================
+
+def load_source(name: str, spec: dict, base_dir: str) -> pd.DataFrame:
+    source = spec["source"]
+    folder = os.path.join(base_dir, source["group"], "JSON")
+    if source.get("phase1"):
+        print("JSON root folder:", folder)
+        return load_base_and_date_columns(folder)
+
+    path = os.path.join(folder, source["file"])
+    print("JSON path:", path)
+    return load_json_to_df(path, clean_columns=True)
+
+
+def transform(name: str, spec: dict, df: pd.DataFrame) -> pd.DataFrame:
+    """Every step of `spec` after the load (the loaded frame may be modified)."""
+    select = spec.get("select")
+    if select == "registry":
+        select = module_columns(name)   # config/column_registry.py
+    if select:
+        df = df[select].copy()
+
+    if spec.get("rename"):
+        df = df.rename(columns=spec["rename"])
+
+    for col in spec.get("dates", []):
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    for col, normalizer in spec.get("normalize", {}).items():
+        df[col] = NORMALIZERS[normalizer](df[col])
+
+    for col, splitter in spec.get("explode", {}).items():
+        df[col] = map_unique(df[col], SPLITTERS[splitter])
+        df = df.explode(col, ignore_index=True)
+
+    for col, mapping in spec.get("map", {}).items():
+        df[col] = df[col].map(mapping)
+
+    for col, value in spec.get("constants", {}).items():
+        df[col] = value
+
+    for col, (deriver, source_col) in spec.get("derive", {}).items():
+        df[col] = DERIVERS[deriver](df[source_col])
+
+    return df
+
+
+def _string_column(values: pd.Series) -> pa.Array:
+    # Same strings as values.fillna("").astype(str)
+    if values.dtype == object:
+        try:
+            return pa.array(values, type=pa.string(), from_pandas=True).fill_null("")
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass   # non-str objects (ints, dicts, ...): str() each value
+    return pa.array(values.fillna("").astype(str), type=pa.string())
+
+
+def to_string_table(df: pd.DataFrame) -> pa.Table:
+    """Arrow table of `df` with every column as non-null strings."""
+    schema = pa.schema([(str(col), pa.string()) for col in df.columns])
+    return pa.Table.from_arrays([_string_column(df[col]) for col in df.columns], schema=schema)
+
+
+def upload(parquet_path: str, group: str, table: str, file_name: str,
+           base_dir: str = BASE_DIR, fingerprint=None) -> None:
+    # Tenant-specific identifiers are injected via environment variables.
+    try:
+        from storage.lake_uploader import build_destination_path, upload_file
+        from ingestion.raw_storage.run_manifest import RunManifest, manifest_path
+
+        dest_path = build_destination_path(group, table, file_name)
+        print("[INFO] uploading:", file_name, "->", dest_path)
+        manifest = RunManifest(manifest_path(base_dir))
+        if upload_file(parquet_path, dest_path, fingerprint, manifest):
+            print("[OK] uploaded:", file_name)
+    except Exception as e:
+        print("[SKIP] upload step (not configured):", e)
+
+
+# ==================== ENTRY POINT ====================
+
+def run_spec(name: str, context=None) -> str:
+    """Build one table; `context`: ModuleContext from the supervisor (raw_dir, fingerprint)."""
+    spec = TRANSFORM_SPECS[name]
+    base_dir = context.raw_dir if context is not None else BASE_DIR
+
+    df = load_source(name, spec, base_dir)
+    print(f"loaded: {df.shape[0]:,} rows x {df.shape[1]} columns")
+
+    df = transform(name, spec, df)
+    print("=== TRANSFORMED ===")
+    print(df)
+
+    group, table, file_name = spec["output"]
+    parquet_path = get_parquet_output_path(group, table, file_name)
+    pq.write_table(to_string_table(df), parquet_path, compression=PARQUET_COMPRESSION)
+    print(f"[OK] Parquet saved: {parquet_path}")
+
+    fingerprint = context.fingerprint if context is not None else None
+    upload(parquet_path, group, table, file_name, base_dir, fingerprint)
+    return parquet_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build bronze tables from config/transform_specs.py")
+    parser.add_argument("tables", nargs="*", help="spec names (default: all, in order)")
+    parser.add_argument("--list", action="store_true", help="print the spec names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, spec in TRANSFORM_SPECS.items():
+            print(f"{name:<58}-> {'/'.join(spec['output'])}")
+        return
+
+    unknown = [t for t in args.tables if t not in TRANSFORM_SPECS]
+    if unknown:
+        parser.error(f"unknown tables: {unknown} (see --list)")
+    for name in args.tables or TRANSFORM_SPECS:
+        run_spec(name)
+
+
+if __name__ == "__main__":
+    main()